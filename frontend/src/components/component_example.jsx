@@ -1,6 +1,11 @@
 import React from "react";
 import BaseComponent from "./base_component";
 
+// Examples from a directory are previewed with thumbnails served by the app
+export function isThumbnail(value) {
+  return typeof value === "string" && value.startsWith("thumbnail/");
+}
+
 export default class ComponentExample extends React.Component {
   render() {
     return <div>{this.props.value}</div>;
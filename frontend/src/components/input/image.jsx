@@ -1,6 +1,6 @@
 import React from "react";
 import BaseComponent from "../base_component";
-import { DataURLComponentExample } from "../component_example";
+import { DataURLComponentExample, isThumbnail } from "../component_example";
 import Webcam from "react-webcam";
 import { SketchField, Tools } from "../../vendor/ReactSketch";
 import { getObjectFitSize, paintSaliency } from "../../utils";
@@ -288,7 +288,11 @@ class ImageInputExample extends DataURLComponentExample {
     return (
       <img
         className="input_image_example"
-        src={this.props.examples_dir + "/" + this.props.value}
+        src={
+          isThumbnail(this.props.value)
+            ? this.props.root + this.props.value
+            : this.props.examples_dir + "/" + this.props.value
+        }
         alt=""
       />
     );
@@ -1,6 +1,6 @@
 import React from "react";
 import BaseComponent from "../base_component";
-import { FileComponentExample } from "../component_example";
+import { FileComponentExample, isThumbnail } from "../component_example";
 import { isPlayable } from "../../utils";
 import clear_icon from "../../static/img/clear.svg";
 
@@ -192,7 +192,19 @@ class VideoInputExample extends FileComponentExample {
     this.video = React.createRef();
   }
   render() {
-    if (isPlayable("video", this.props.value)) {
+    if (isThumbnail(this.props.value)) {
+      return (
+        <div className="input_video_example">
+          <div className="video_holder">
+            <img
+              className="video_preview"
+              src={this.props.root + this.props.value}
+              alt=""
+            />
+          </div>
+        </div>
+      );
+    } else if (isPlayable("video", this.props.value)) {
       return (
         <div className="input_video_example">
           <div className="video_holder">
@@ -88,6 +88,11 @@ export class GradioInterface extends React.Component {
     this.state = this.get_default_state();
     this.pending_response = false;
     this.state["examples_page"] = 0;
+    // Examples from a directory are fetched page by page, see loadExamplesPage
+    this.state["examples"] =
+      this.props.examples_count > 0
+        ? new Array(this.props.examples_count)
+        : this.props.examples;
     this.state["avg_duration"] = Array.isArray(this.props.avg_durations)
       ? this.props.avg_durations[0]
       : null;
@@ -313,9 +318,39 @@ export class GradioInterface extends React.Component {
       this.setState(state_change);
     }
   };
+  componentDidMount() {
+    if (this.props.examples_count > 0) {
+      this.loadExamplesPage(0);
+    }
+  }
+  loadExamplesPage = (page) => {
+    let start = page * this.props.examples_per_page;
+    if (!this.props.examples_count || this.state.examples[start] !== undefined) {
+      return;
+    }
+    fetch(this.props.root + "api/examples/?page=" + page)
+      .then((response) => response.json())
+      .then((output) => {
+        let examples = this.state.examples.slice();
+        output.data.forEach((example, i) => {
+          examples[start + i] = example;
+        });
+        this.setState({ examples: examples });
+      });
+  };
   handleExampleChange = (example_id) => {
     this.setState({ example_id: example_id });
-    for (let [i, item] of this.props.examples[example_id].entries()) {
+    if (this.props.examples_count > 0) {
+      // The gallery only holds thumbnails, so the full example is fetched
+      fetch(this.props.root + "api/examples/" + example_id + "/")
+        .then((response) => response.json())
+        .then((output) => this.loadExample(example_id, output.data));
+    } else {
+      this.loadExample(example_id, this.state.examples[example_id]);
+    }
+  };
+  loadExample = (example_id, example) => {
+    for (let [i, item] of example.entries()) {
       let ExampleComponent;
       if (i < this.props.input_components.length) {
         let component_name = this.props.input_components[i].name;
@@ -514,15 +549,17 @@ export class GradioInterface extends React.Component {
             </div>
           </div>
         </div>
-        {this.props.examples ? (
+        {this.state.examples && this.state.examples[0] !== undefined ? (
           <MemoizedGradioInterfaceExamples
-            examples={this.props.examples}
+            examples={this.state.examples}
             examples_dir={this.examples_dir}
             example_id={this.state.example_id}
             examples_per_page={this.props.examples_per_page}
             input_components={this.props.input_components}
             output_components={this.props.output_components}
             handleExampleChange={this.handleExampleChange}
+            loadExamplesPage={this.loadExamplesPage}
+            root={this.props.root}
           />
         ) : (
           false
@@ -538,6 +575,7 @@ class GradioInterfaceExamples extends React.Component {
     this.state = { page: 0 };
   }
   set_page(page) {
+    this.props.loadExamplesPage(page);
     this.setState({ page: page });
   }
   render() {
@@ -591,7 +629,7 @@ class GradioInterfaceExamples extends React.Component {
               </tr>
             </thead>
             <tbody>
-              {selected_examples.map((example_row, page_i) => {
+              {selected_examples.filter((example_row) => example_row !== undefined).map((example_row, page_i) => {
                 let i = page_i + this.state.page * this.props.examples_per_page;
                 return (
                   <tr
@@ -608,6 +646,7 @@ class GradioInterfaceExamples extends React.Component {
                       return (
                         <td>
                           <ExampleComponent
+                            root={this.props.root}
                             examples_dir={this.props.examples_dir}
                             value={example_data}
                             key={j}
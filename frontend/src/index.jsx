@@ -19,6 +19,66 @@ let postData = async (url, body) => {
   return output;
 };
 
+let updateQueueCallback = (status_obj, queue_callback) => {
+  if (status_obj["status"] === "QUEUED") {
+    queue_callback(status_obj["data"]);
+  } else if (status_obj["status"] === "PENDING") {
+    queue_callback(null);
+  }
+};
+
+// Waits for a queued job using server-sent events. Resolves to null if the
+// event stream is unavailable or the browser stops reconnecting to it, in
+// which case the caller should poll instead.
+let streamStatus = (api_endpoint, hash, queue_callback) => {
+  return new Promise((resolve) => {
+    if (typeof EventSource === "undefined") {
+      resolve(null);
+      return;
+    }
+    const source = new EventSource(api_endpoint + "queue/events/" + hash + "/");
+    let received = false;
+    source.onmessage = (event) => {
+      received = true;
+      const status_obj = JSON.parse(event.data);
+      if (["COMPLETE", "FAILED"].includes(status_obj["status"])) {
+        source.close();
+        resolve(status_obj);
+      } else {
+        updateQueueCallback(status_obj, queue_callback);
+      }
+    };
+    source.onerror = () => {
+      // While the stream is CONNECTING again, the browser retries by itself
+      if (!received || source.readyState === EventSource.CLOSED) {
+        source.close();
+        resolve(null);
+      }
+    };
+  });
+};
+
+let pollStatus = async (api_endpoint, hash, queue_callback) => {
+  let status = "UNKNOWN";
+  let status_obj;
+  while (status != "COMPLETE" && status != "FAILED") {
+    if (status != "UNKNOWN") {
+      await delay(1);
+    }
+    const status_response = await postData(api_endpoint + "queue/status/", {
+      hash: hash
+    });
+    if (status_response.status === 404) {
+      // The job was pruned, so its status will never change
+      return { status: "FAILED", data: "Hash not found." };
+    }
+    status_obj = await status_response.json();
+    status = status_obj["status"];
+    updateQueueCallback(status_obj, queue_callback);
+  }
+  return status_obj;
+};
+
 let fn = async (api_endpoint, data, action, queue, queue_callback) => {
   if (queue && ["predict", "interpret"].includes(action)) {
     data["action"] = action;
@@ -29,22 +89,11 @@ let fn = async (api_endpoint, data, action, queue, queue_callback) => {
       output_json["queue_position"]
     ];
     queue_callback(queue_position, /*is_initial=*/ true);
-    let status = "UNKNOWN";
-    while (status != "COMPLETE" && status != "FAILED") {
-      if (status != "UNKNOWN") {
-        await delay(1);
-      }
-      const status_response = await postData(api_endpoint + "queue/status/", {
-        hash: hash
-      });
-      var status_obj = await status_response.json();
-      status = status_obj["status"];
-      if (status === "QUEUED") {
-        queue_callback(status_obj["data"]);
-      } else if (status === "PENDING") {
-        queue_callback(null);
-      }
+    let status_obj = await streamStatus(api_endpoint, hash, queue_callback);
+    if (status_obj === null) {
+      status_obj = await pollStatus(api_endpoint, hash, queue_callback);
     }
+    let status = status_obj["status"];
     if (status == "FAILED") {
       throw new Error(status);
     } else {
@@ -1,24 +1,31 @@
 """Implements a FastAPI server to run the gradio interface."""
 
 from __future__ import annotations
+import asyncio
 from fastapi import FastAPI, Request, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, HTMLResponse, FileResponse
+from fastapi.responses import (
+    JSONResponse, HTMLResponse, FileResponse, Response, StreamingResponse)
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.templating import Jinja2Templates
 import inspect
+import json
+import mimetypes
 import os
 import posixpath
 import pkg_resources
+import re
 import secrets
 from starlette.responses import RedirectResponse
+import time
 import traceback
-from typing import List, Optional, Type
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
 import urllib
 import uvicorn
 
-from gradio import utils, queueing
+from gradio import file_store, temp_files, utils, queueing
 from gradio.process_examples import load_from_cache, process_example
+from gradio.thumbnails import THUMBNAIL_MAX_AGE
 
 
 STATIC_TEMPLATE_LIB = pkg_resources.resource_filename("gradio", "templates/")
@@ -28,6 +35,10 @@ VERSION_FILE = pkg_resources.resource_filename("gradio", "version.txt")
 with open(VERSION_FILE) as version_file:
     VERSION = version_file.read()
 GRADIO_STATIC_ROOT = "https://gradio.s3-us-west-2.amazonaws.com/{}/static/".format(VERSION)
+# Seconds between keep-alive comments on an idle queue event stream.
+QUEUE_EVENTS_KEEPALIVE = 15
+# Number of bytes read at a time when streaming part of an output file.
+FILE_CHUNK_SIZE = 64 * 1024
 
 app = FastAPI()
 app.add_middleware(
@@ -116,6 +127,46 @@ def static_resource(path: str):
     raise HTTPException(status_code=404, detail="Static file not found")
 
 
+@app.get("/file/{token}", dependencies=[Depends(login_check)])
+def file(token: str, request: Request):
+    """
+    Serves an output file by the token in its URL. Supports single byte range
+    requests, so that audio and video can be streamed.
+    """
+    path = None
+    if file_store.store is not None:
+        path = file_store.store.get_path(token)
+    if path is None or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="File not found")
+    media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    headers = {"Accept-Ranges": "bytes"}
+    byte_range = parse_range(request.headers.get("range"), 
+                             os.path.getsize(path))
+    if byte_range is None:
+        return FileResponse(path, media_type=media_type, headers=headers)
+    start, end = byte_range
+    if start > end:
+        return Response(status_code=416, headers={
+            "Content-Range": "bytes */{}".format(os.path.getsize(path))})
+
+    def read_range():
+        with open(path, "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(FILE_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    headers["Content-Range"] = "bytes {}-{}/{}".format(
+        start, end, os.path.getsize(path))
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(read_range(), status_code=206, 
+                             media_type=media_type, headers=headers)
+
+
 @app.get('/favicon.ico')
 async def favicon():
     if app.favicon_path:
@@ -167,38 +218,18 @@ async def predict(
     request: Request, 
     username: str = Depends(get_current_user)
 ):
-    body = await request.json()
-    flag_index = None
-    
-    if body.get("example_id") != None:
-        example_id = body["example_id"]
-        if app.interface.cache_examples:
-            prediction = load_from_cache(app.interface, example_id)
-            durations = None
-        else:
-            prediction, durations = process_example(app.interface, example_id)
+    body = await get_predict_body(request)
+    if app.interface.show_error:
+        try:
+            output = await run_in_executor(run_predict, body, username)
+        except HTTPException:
+            raise
+        except BaseException as error:
+            traceback.print_exc()
+            return JSONResponse(content={"error": str(error)}, 
+                                status_code=500)
     else:
-        raw_input = body["data"]
-        if app.interface.show_error:
-            try:
-                prediction, durations = app.interface.process(raw_input)
-            except BaseException as error:
-                traceback.print_exc()
-                return JSONResponse(content={"error": str(error)}, 
-                                    status_code=500)
-        else:
-            prediction, durations = app.interface.process(raw_input)
-        if app.interface.allow_flagging == "auto":
-            flag_index = app.interface.flagging_callback.flag(
-                app.interface, raw_input, prediction,
-                flag_option="" if app.interface.flagging_options else None, 
-                username=username)
-    output = {
-        "data": prediction, 
-        "durations": durations, 
-        "avg_durations": app.interface.config.get("avg_durations"),
-        "flag_index": flag_index
-    }    
+        output = await run_in_executor(run_predict, body, username)
     return output
 
 
@@ -211,7 +242,7 @@ async def flag(
         await utils.log_feature_analytics(app.interface.ip_address, 'flag')
     body = await request.json()
     data = body['data']
-    app.interface.flagging_callback.flag(
+    app.interface.flagger.flag(
         app.interface, data['input_data'], data['output_data'], 
         flag_option=data.get("flag_option"), flag_index=data.get("flag_index"),
         username=username)
@@ -223,13 +254,7 @@ async def interpret(request: Request):
     if app.interface.analytics_enabled:
         await utils.log_feature_analytics(app.interface.ip_address, 'interpret')
     body = await request.json()
-    raw_input = body["data"]
-    interpretation_scores, alternative_outputs = app.interface.interpret(
-        raw_input)
-    return {
-        "interpretation_scores": interpretation_scores,
-        "alternative_outputs": alternative_outputs
-    }
+    return await run_in_executor(run_interpret, body)
 
 
 @app.post("/api/queue/push/", dependencies=[Depends(login_check)])
@@ -245,15 +270,279 @@ async def queue_push(request: Request):
 async def queue_status(request: Request):
     body = await request.json()
     hash = body['hash']
-    status, data = queueing.get_status(hash)
+    try:
+        status, data = queueing.get_status(hash)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Hash not found.")
     return {"status": status, "data": data}
 
 
+@app.get("/api/queue/events/{hash}/", dependencies=[Depends(login_check)])
+async def queue_events(hash: str):
+    """
+    Streams the status of a queued job as Server-Sent Events, so that clients
+    don't need to poll /api/queue/status/. An event with the same format as 
+    the /api/queue/status/ response is sent every time the status changes, 
+    and the stream ends once the job is complete or has failed.
+    """
+    loop = asyncio.get_running_loop()
+    changed = asyncio.Event()
+
+    def on_change():
+        loop.call_soon_threadsafe(changed.set)
+
+    # Registered before the status is read, so that no change is missed
+    queueing.add_listener(hash, on_change)
+    try:
+        status, data = queueing.get_status(hash)
+    except ValueError:
+        queueing.remove_listener(hash, on_change)
+        raise HTTPException(status_code=404, detail="Hash not found.")
+
+    async def event_stream(status, data):
+        try:
+            last_event = None
+            while True:
+                event = json.dumps({"status": status, "data": data})
+                if event != last_event:
+                    yield "data: {}\n\n".format(event)
+                    last_event = event
+                if status in ("COMPLETE", "FAILED"):
+                    break
+                try:
+                    await asyncio.wait_for(
+                        changed.wait(), timeout=QUEUE_EVENTS_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                changed.clear()
+                try:
+                    status, data = queueing.get_status(hash)
+                except ValueError as error:  # The job was pruned
+                    status, data = "FAILED", str(error)
+        finally:
+            queueing.remove_listener(hash, on_change)
+    
+    return StreamingResponse(event_stream(status, data), 
+                             media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+
+@app.get("/api/examples/", dependencies=[Depends(login_check)])
+def get_examples_page(page: int = 0):
+    """
+    Returns a page of the examples of an interface whose examples are a 
+    directory, restoring them the first time the page is requested.
+    """
+    example_pages = app.interface.example_pages
+    if example_pages is None:
+        raise HTTPException(status_code=404, detail="No examples directory")
+    try:
+        examples = example_pages.get_page(page)
+    except IndexError:
+        raise HTTPException(status_code=404, detail="Examples page not found")
+    return {
+        "data": examples,
+        "page": page,
+        "page_count": example_pages.get_page_count(),
+        "examples_count": example_pages.get_count()
+    }
+
+
+@app.get("/api/examples/{example_id}/", dependencies=[Depends(login_check)])
+def get_example(example_id: int):
+    """
+    Returns an example of an interface whose examples are a directory at full 
+    size, e.g. when it is selected in the gallery.
+    """
+    example_pages = app.interface.example_pages
+    if example_pages is None:
+        raise HTTPException(status_code=404, detail="No examples directory")
+    try:
+        return {"data": example_pages.get_example(example_id)}
+    except IndexError:
+        raise HTTPException(status_code=404, detail="Example not found")
+
+
+@app.get("/thumbnail/{name}", dependencies=[Depends(login_check)])
+def thumbnail(name: str):
+    path = None
+    if app.interface.example_pages is not None:
+        path = app.interface.example_pages.thumbnails.get_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Thumbnail not found")
+    return FileResponse(path, headers={
+        "Cache-Control": "public, max-age={}, immutable".format(
+            THUMBNAIL_MAX_AGE)})
+
+
+@app.get("/api/temp_files/", dependencies=[Depends(login_check)])
+def get_temp_files():
+    """
+    Reports the number of temporary files held by the server and their size.
+    """
+    return temp_files.get_stats()
+
+
+@app.get("/api/queue/workers/", dependencies=[Depends(login_check)])
+def queue_workers():
+    now = time.time()
+    workers = []
+    for stats in app.queue_worker_stats:
+        busy_time = stats["busy_time"]
+        if stats["busy_since"] is not None:
+            busy_time += now - stats["busy_since"]
+        workers.append({
+            "busy": stats["busy_since"] is not None,
+            "jobs_processed": stats["jobs_processed"],
+            "utilization": busy_time / max(now - stats["started"], 1e-6)
+        })
+    return {"workers": workers}
+
+
 ########
 # Helper functions
 ########
 
 
+def run_predict(
+    body: Dict[str, Any], 
+    username: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Runs the interface on the body of a request to /api/predict/. Used both
+    by the route and by the queue worker.
+    Returns:
+    (Dict[str, Any]): the JSON-serializable response
+    """
+    with temp_files.scope():  # Deletes temporary files after the request
+        return process_predict(body, username)
+
+
+def process_predict(
+    body: Dict[str, Any], 
+    username: Optional[str] = None
+) -> Dict[str, Any]:
+    flag_index = None
+    if body.get("example_id") != None:
+        example_id = body["example_id"]
+        if app.interface.cache_examples and app.interface.example_cache.ready:
+            prediction = load_from_cache(app.interface, example_id)
+            durations = None
+        else:
+            prediction, durations = process_example(app.interface, example_id)
+    else:
+        raw_input = body["data"]
+        prediction, durations = app.interface.process(raw_input)
+        if app.interface.allow_flagging == "auto":
+            flag_index = app.interface.flagger.flag(
+                app.interface, raw_input, prediction,
+                flag_option="" if app.interface.flagging_options else None, 
+                username=username)
+    output = {
+        "data": prediction, 
+        "durations": durations, 
+        "avg_durations": app.interface.config.get("avg_durations"),
+        "flag_index": flag_index
+    }
+    if app.interface.cache is not None:
+        output["cache_hits"] = app.interface.cache.hits
+        output["cache_misses"] = app.interface.cache.misses
+    if app.interface.batch:
+        output["avg_batch_durations"] = [
+            batcher.total_duration / max(batcher.num_batches, 1)
+            for batcher in app.interface.batchers]
+        output["avg_batch_sizes"] = [
+            batcher.num_calls / max(batcher.num_batches, 1)
+            for batcher in app.interface.batchers]
+    return output
+
+
+async def get_predict_body(request: Request) -> Dict[str, Any]:
+    """
+    Parses the body of a request to /api/predict/. Besides JSON, accepts 
+    multipart/form-data with the JSON body in a "data" field and the raw 
+    contents of media inputs as files named after the index of their input,
+    e.g. "0", so that large files don't have to be encoded as base64.
+    """
+    content_type = request.headers.get("content-type", "")
+    if not content_type.startswith("multipart/form-data"):
+        return await request.json()
+    form = await request.form()
+    body = json.loads(form["data"]) if "data" in form else {}
+    input_components = app.interface.input_components
+    data = body.setdefault("data", [])
+    data.extend([None] * (len(input_components) - len(data)))
+    for index, component in enumerate(input_components):
+        uploads = form.getlist(str(index))
+        if uploads:
+            files = [(upload.filename, await upload.read()) 
+                     for upload in uploads]
+            try:
+                data[index] = component.preprocess_upload(data[index], files)
+            except ValueError as error:
+                raise HTTPException(status_code=400, detail=str(error))
+    return body
+
+
+async def run_in_executor(fn: Callable, *args) -> Any:
+    """
+    Runs a blocking function in the executor created at launch, so that the 
+    event loop stays responsive while it runs. Responds with a 503 error if 
+    too many requests are already waiting for the executor.
+    """
+    if app.max_backlog is not None and (
+            app.backlog >= app.interface.max_threads + app.max_backlog):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please try again later.",
+            headers={"Retry-After": "1"})
+    app.backlog += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(app.executor, fn, *args)
+    finally:
+        app.backlog -= 1
+
+
+def run_interpret(body: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Runs the interpretation on the body of a request to /api/interpret/.
+    Returns:
+    (Dict[str, Any]): the JSON-serializable response
+    """
+    raw_input = body["data"]
+    with temp_files.scope():
+        interpretation_scores, alternative_outputs = app.interface.interpret(
+            raw_input)
+    return {
+        "interpretation_scores": interpretation_scores,
+        "alternative_outputs": alternative_outputs
+    }
+
+
+def parse_range(
+    range_header: Optional[str], 
+    file_size: int
+) -> Optional[Tuple[int, int]]:
+    """
+    Parses the Range header of a request for a file.
+    Returns:
+    (Tuple[int, int]): the first and last byte requested, or None if the whole 
+    file should be sent. The first byte is after the last byte if the range 
+    cannot be satisfied.
+    """
+    if range_header is None:
+        return None
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", range_header.strip())
+    if match is None or match.groups() == ("", ""):
+        return None  # Multiple or malformed ranges, so send the whole file
+    start, end = match.groups()
+    if start == "":  # The last `end` bytes
+        return max(file_size - int(end), 0), file_size - 1
+    end = file_size - 1 if end == "" else min(int(end), file_size - 1)
+    return int(start), end
+
+
 def safe_join(directory: str, path: str) -> Optional[str]:
     """Safely path to a base directory to avoid escaping the base directory.
     Borrowed from: werkzeug.security.safe_join"""
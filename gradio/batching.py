@@ -0,0 +1,138 @@
+"""
+Implements dynamic micro-batching, which collects concurrent calls to a
+prediction function and runs them through the function as a single batch.
+"""
+from __future__ import annotations
+import threading
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+
+class BatchRequest():
+    """A single call waiting to be run as part of a batch."""
+    def __init__(self, args: List[Any]):
+        self.args = args
+        self.done = threading.Event()
+        self.output = None
+        self.error = None
+        self.batch_duration = None
+        self.batch_size = None
+
+
+class Batcher():
+    """
+    Collects calls made from different threads and runs them through `fn`
+    together. `fn` is called with one list per argument, holding that
+    argument's values for every call in the batch, and must return a list
+    with one output per call (or, if `num_outputs` > 1, a list of such lists,
+    one per output). A batch is run once `max_batch_size` calls are waiting,
+    or `max_batch_delay_ms` after the first call in the batch arrived.
+    """
+    def __init__(
+        self,
+        fn: Callable,
+        max_batch_size: int = 32,
+        max_batch_delay_ms: float = 10,
+        num_outputs: int = 1
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1.")
+        self.fn = fn
+        self.max_batch_size = max_batch_size
+        self.max_batch_delay = max_batch_delay_ms / 1000
+        self.num_outputs = num_outputs
+        self.lock = threading.Lock()
+        self.request_available = threading.Condition(self.lock)
+        self.requests: List[BatchRequest] = []
+        self.thread: Optional[threading.Thread] = None
+        self.num_batches = 0
+        self.num_calls = 0
+        self.total_duration = 0
+
+    def submit(self, args: List[Any]) -> Tuple[Any, float, int]:
+        """
+        Adds a call to the next batch and waits for its result.
+        Parameters:
+        args (List[Any]): the arguments of this call.
+        Returns:
+        output (Any): the output of `fn` for this call.
+        batch_duration (float): how long it took to run the whole batch.
+        batch_size (int): the number of calls in the batch.
+        """
+        return self.submit_many([args])[0]
+
+    def submit_many(self, args_list: List[List[Any]]) -> List[Tuple[Any, float, int]]:
+        """
+        Adds several calls at once, e.g. all the perturbed inputs of an 
+        interpretation, so that they are run in as few batches as possible.
+        Parameters:
+        args_list (List[List[Any]]): the arguments of each call.
+        Returns:
+        (List[Tuple[Any, float, int]]): what submit() would have returned for 
+        each call.
+        """
+        requests = [BatchRequest(args) for args in args_list]
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+            self.requests.extend(requests)
+            self.request_available.notify()
+        results = []
+        for request in requests:
+            request.done.wait()
+            if request.error is not None:
+                raise request.error
+            results.append(
+                (request.output, request.batch_duration, request.batch_size))
+        return results
+
+    def next_batch(self) -> List[BatchRequest]:
+        with self.lock:
+            self.request_available.wait_for(lambda: self.requests)
+            deadline = time.time() + self.max_batch_delay
+            while len(self.requests) < self.max_batch_size:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self.request_available.wait(remaining)
+            batch = self.requests[:self.max_batch_size]
+            del self.requests[:self.max_batch_size]
+        return batch
+
+    def run(self):
+        while True:
+            batch = self.next_batch()
+            self.run_batch(batch)
+
+    def run_batch(self, batch: List[BatchRequest]):
+        try:
+            batched_args = [list(arg) for arg in zip(
+                *[request.args for request in batch])]
+            start = time.time()
+            outputs = self.fn(*batched_args)
+            duration = time.time() - start
+            if self.num_outputs == 1:
+                outputs = [outputs]
+            if len(outputs) != self.num_outputs or any(
+                    len(output) != len(batch) for output in outputs):
+                raise ValueError(
+                    "A batched function must return one output per input in "
+                    "the batch (expected {} outputs for each of {} output "
+                    "components).".format(len(batch), self.num_outputs))
+        except BaseException as error:
+            for request in batch:
+                request.error = error
+                request.done.set()
+            return
+        self.num_batches += 1
+        self.num_calls += len(batch)
+        self.total_duration += duration
+        for i, request in enumerate(batch):
+            if self.num_outputs == 1:
+                request.output = outputs[0][i]
+            else:
+                request.output = [output[i] for output in outputs]
+            request.batch_duration = duration
+            request.batch_size = len(batch)
+            request.done.set()
@@ -1,11 +1,85 @@
 import os
 import shutil
-from gradio import processing_utils
+import threading
+from typing import Dict
+
+from gradio import file_store, processing_utils
+
+
+# The files flagged under each label are spread over subdirectories holding at 
+# most this many files each: files 0 to 999 are saved in the directory of the 
+# label itself, files 1000 to 1999 in its "1" subdirectory, and so on.
+FLAGGED_FILES_PER_DIR = 1000
+
+
+class FlaggedFileCounter():
+    """
+    Hands out the names of flagged files, so that saving a file doesn't 
+    require listing the directory it is saved to. The counter of each 
+    directory starts after the highest index found in it, the first time it 
+    is used.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.next_indices: Dict[str, int] = {}
+
+    def next_index(self, output_dir: str) -> int:
+        output_dir = os.path.abspath(output_dir)
+        with self.lock:
+            if output_dir not in self.next_indices:
+                self.next_indices[output_dir] = self.find_next_index(output_dir)
+            index = self.next_indices[output_dir]
+            self.next_indices[output_dir] += 1
+            return index
+
+    def reserve_file_name(self, output_dir: str, extension: str) -> str:
+        """
+        Creates an empty file with the next name in the directory, so that 
+        other processes flagging to the same directory can't use it as well.
+        Parameters:
+        output_dir (str): the directory of the label.
+        extension (str): the extension of the file, including the dot.
+        Returns:
+        (str): the path of the reserved file, relative to output_dir.
+        """
+        while True:
+            index = self.next_index(output_dir)
+            file_name = str(index) + extension
+            if index >= FLAGGED_FILES_PER_DIR:
+                file_name = str(index // FLAGGED_FILES_PER_DIR) + "/" + file_name
+            file_path = os.path.join(output_dir, file_name)
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            try:
+                os.close(os.open(file_path, os.O_CREAT | os.O_EXCL))
+            except FileExistsError:
+                continue
+            return file_name
+
+    @staticmethod
+    def find_next_index(output_dir: str) -> int:
+        if not os.path.isdir(output_dir):
+            return 0
+        next_index = 0
+        for entry in os.scandir(output_dir):
+            names = [sub_entry.name for sub_entry in os.scandir(entry.path)] \
+                if entry.is_dir() else [entry.name]
+            for name in names:
+                prefix = name.split(".")[0]
+                if prefix.isdigit():
+                    next_index = max(next_index, int(prefix) + 1)
+        return next_index
+
+
+flagged_file_counter = FlaggedFileCounter()
+
 
 class Component():
     """
     A class for defining the methods that all gradio input and output components should have.
     """
+    # The kind of thumbnail ("image" or "video") that examples of this 
+    # component are previewed with in example galleries, if any.
+    thumbnail_kind = None
 
     def __init__(self, label, requires_permissions=False):
         self.label = label
@@ -48,20 +122,21 @@ class Component():
     def save_flagged_file(self, dir, label, data, encryption_key):
         if data is None:
             return None
-        file = processing_utils.decode_base64_to_file(data, encryption_key)
+        served_file_path = file_store.resolve_url(data)
+        if served_file_path is not None:
+            file = processing_utils.create_tmp_copy_of_file(
+                served_file_path, encryption_key)
+        else:
+            file = processing_utils.decode_base64_to_file(data, encryption_key)
         label = "".join([char for char in label if char.isalnum() or char in "._- "])
         old_file_name = file.name
-        output_dir = os.path.join(dir, label)
-        if os.path.exists(output_dir):
-            file_index = len(os.listdir(output_dir))
-        else:
-            os.makedirs(output_dir)
-            file_index = 0
-        new_file_name = str(file_index)
+        extension = ""
         if "." in old_file_name:
-            uploaded_format = old_file_name.split(".")[-1].lower()
-            new_file_name +=  "." + uploaded_format
+            extension = "." + old_file_name.split(".")[-1].lower()
+        new_file_name = flagged_file_counter.reserve_file_name(
+            os.path.join(dir, label), extension)
         file.close()
+        # Replaces the empty file that reserved the name
         shutil.move(old_file_name, os.path.join(dir, label, new_file_name))
         return label + "/" + new_file_name
 
@@ -2,6 +2,14 @@ from Crypto.Cipher import AES
 from Crypto.Hash import SHA256
 from Crypto import Random
 
+# Encrypted records are prefixed with their length as a big-endian integer.
+RECORD_LENGTH_BYTES = 4
+RECORD_NONCE_BYTES = 12
+RECORD_TAG_BYTES = 16
+# The amount of data that the streaming functions read at a time, a multiple 
+# of AES.block_size.
+STREAM_CHUNK_SIZE = 64 * 1024
+
 def get_key(password):
     key = SHA256.new(password.encode()).digest()
     return key
@@ -21,4 +29,99 @@ def decrypt(key, source):
     padding = data[-1]  # pick the padding value from the end; Python 2.x: ord(data[-1])
     if data[-padding:] != bytes([padding]) * padding:  # Python 2.x: chr(padding) * padding
         raise ValueError("Invalid padding...")
-    return data[:-padding]  # remove the padding
\ No newline at end of file
+    return data[:-padding]  # remove the padding
+
+def encrypt_stream(key, source, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Encrypts a binary file object chunk by chunk, in the same format as 
+    encrypt(). Yields the encrypted data, so that at most `chunk_size` bytes 
+    are held in memory at a time.
+    """
+    IV = Random.new().read(AES.block_size)
+    encryptor = AES.new(key, AES.MODE_CBC, IV)
+    yield IV
+    while True:
+        chunk = source.read(chunk_size)
+        if len(chunk) < chunk_size:  # Last chunk, which is padded
+            padding = AES.block_size - len(chunk) % AES.block_size
+            yield encryptor.encrypt(chunk + bytes([padding]) * padding)
+            return
+        yield encryptor.encrypt(chunk)
+
+def decrypt_stream(key, source, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Decrypts a binary file object written by encrypt() or encrypt_stream() 
+    chunk by chunk. Yields the decrypted data.
+    """
+    IV = source.read(AES.block_size)
+    decryptor = AES.new(key, AES.MODE_CBC, IV)
+    # The last block is held back until the end of the file is reached, since 
+    # it holds the padding.
+    data = b""
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        data += decryptor.decrypt(chunk)
+        yield data[:-AES.block_size]
+        data = data[-AES.block_size:]
+    if len(data) != AES.block_size:
+        raise ValueError("Invalid padding...")
+    padding = data[-1]
+    if padding < 1 or data[-padding:] != bytes([padding]) * padding:
+        raise ValueError("Invalid padding...")
+    yield data[:-padding]
+
+def encrypt_file(key, source, target, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Encrypts the binary file object `source` into the binary file object 
+    `target`, chunk by chunk.
+    """
+    for chunk in encrypt_stream(key, source, chunk_size):
+        target.write(chunk)
+
+def decrypt_file(key, source, target, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Decrypts the binary file object `source` into the binary file object 
+    `target`, chunk by chunk.
+    """
+    for chunk in decrypt_stream(key, source, chunk_size):
+        target.write(chunk)
+
+
+def encrypt_record(key, source):
+    """
+    Encrypts a single record with AES-GCM, so that it can be appended to a file 
+    of records and decrypted (and authenticated) independently of the others.
+    Returns the nonce, ciphertext and tag, prefixed with their total length.
+    """
+    nonce = Random.new().read(RECORD_NONCE_BYTES)
+    cipher = AES.new(key, AES.MODE_GCM, nonce=nonce)
+    ciphertext, tag = cipher.encrypt_and_digest(source)
+    record = nonce + ciphertext + tag
+    return len(record).to_bytes(RECORD_LENGTH_BYTES, "big") + record
+
+def decrypt_record(key, record):
+    """
+    Decrypts a record written by encrypt_record(), without its length prefix.
+    Raises ValueError if the record was tampered with or the key is wrong.
+    """
+    nonce = record[:RECORD_NONCE_BYTES]
+    ciphertext = record[RECORD_NONCE_BYTES:-RECORD_TAG_BYTES]
+    tag = record[-RECORD_TAG_BYTES:]
+    cipher = AES.new(key, AES.MODE_GCM, nonce=nonce)
+    return cipher.decrypt_and_verify(ciphertext, tag)
+
+def read_records(file):
+    """
+    Reads the records written by encrypt_record() from a binary file, starting 
+    at its current position. Yields the offset of each record (including its 
+    length prefix) and the encrypted record.
+    """
+    while True:
+        offset = file.tell()
+        length = file.read(RECORD_LENGTH_BYTES)
+        if len(length) < RECORD_LENGTH_BYTES:
+            return
+        record = file.read(int.from_bytes(length, "big"))
+        yield offset, record
@@ -0,0 +1,124 @@
+"""
+Serves the examples of an interface whose examples are a directory one page
+at a time, so that the examples don't all have to be loaded (and e.g. base64
+encoded) into the config of the interface.
+"""
+from __future__ import annotations
+import csv
+import os
+import threading
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+
+from gradio.thumbnails import ThumbnailCache
+
+if TYPE_CHECKING:  # Only import for type checking (is False at runtime).
+    from gradio import Interface
+
+
+def load_examples_dir(interface: Interface) -> List[List[str]]:
+    """
+    Reads the rows of the examples directory of an interface, as they are
+    stored in its log.csv file (or the paths of its files, if the interface has
+    a single input and the directory has no log.csv file).
+    """
+    if not os.path.exists(interface.examples):
+        raise FileNotFoundError(
+            "Could not find examples directory: " + interface.examples)
+    log_file = os.path.join(interface.examples, "log.csv")
+    if not os.path.exists(log_file):
+        if len(interface.input_components) == 1:
+            return [[os.path.join(interface.examples, item)]
+                    for item in os.listdir(interface.examples)]
+        raise FileNotFoundError(
+            "Could not find log file (required for multiple inputs): " + log_file)
+    with open(log_file) as logs:
+        return list(csv.reader(logs))[1:]  # remove header
+
+
+class ExamplePages():
+    """
+    Restores the examples of a page (see Component.restore_flagged()) the first
+    time the page is requested, and keeps them for later requests. Images and 
+    videos are replaced by the URLs of their thumbnails, so that they are only 
+    loaded at full size (with get_example()) when an example is selected. The 
+    examples directory itself is only read once.
+    """
+    def __init__(self, interface: Interface):
+        self.interface = interface
+        self.lock = threading.Lock()
+        self.rows: Optional[List[List[str]]] = None
+        self.pages: Dict[int, List[List[Any]]] = {}
+        self.thumbnails = ThumbnailCache()
+
+    def get_rows(self) -> List[List[str]]:
+        with self.lock:
+            if self.rows is None:
+                self.rows = load_examples_dir(self.interface)
+            return self.rows
+
+    def get_count(self) -> int:
+        return len(self.get_rows())
+
+    def get_page_count(self) -> int:
+        return -(-self.get_count() // self.interface.examples_per_page)
+
+    def get_page(self, page: int) -> List[List[Any]]:
+        """
+        Parameters:
+        page (int): the index of the page, starting at 0.
+        Returns:
+        (List[List[Any]]): the restored examples on the page.
+        """
+        if page < 0 or page >= self.get_page_count():
+            raise IndexError("No examples page {}".format(page))
+        with self.lock:
+            if page in self.pages:
+                return self.pages[page]
+        per_page = self.interface.examples_per_page
+        rows = self.get_rows()[page * per_page:(page + 1) * per_page]
+        examples = [self.restore_example(row, thumbnails=True) for row in rows]
+        with self.lock:
+            self.pages[page] = examples
+        return examples
+
+    def get_example(self, example_id: int) -> List[Any]:
+        """
+        Returns the example with the given index at full size, i.e. without
+        replacing images and videos with thumbnails. Not kept after the request.
+        """
+        rows = self.get_rows()
+        if example_id < 0 or example_id >= len(rows):
+            raise IndexError("No example {}".format(example_id))
+        return self.restore_example(rows[example_id], thumbnails=False)
+
+    def restore_example(self, row: List[str], thumbnails: bool) -> List[Any]:
+        encryption_key = self.interface.encryption_key \
+            if self.interface.encrypt else None
+        components = self.interface.input_components + \
+            self.interface.output_components
+        example = []
+        for component, cell in zip(components, row):
+            thumbnail = None
+            if thumbnails and component.thumbnail_kind is not None \
+                    and encryption_key is None:
+                path = self.get_file_path(cell)
+                if path is not None:
+                    thumbnail = self.thumbnails.get_thumbnail(
+                        path, component.thumbnail_kind)
+            example.append(thumbnail or component.restore_flagged(
+                self.interface.flagging_dir, cell, encryption_key))
+        return example + row[len(components):]
+
+    def get_file_path(self, cell: str) -> Optional[str]:
+        # Examples files are relative to the examples directory, or to the
+        # flagging directory if the examples were flagged.
+        for path in [cell, os.path.join(self.interface.examples, cell),
+                     os.path.join(self.interface.flagging_dir, cell)]:
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def clear(self):
+        with self.lock:
+            self.rows = None
+            self.pages.clear()
@@ -1,7 +1,6 @@
 import json
-import tempfile
 import requests
-from gradio import inputs, outputs
+from gradio import inputs, outputs, temp_files
 import re
 import base64
 
@@ -23,7 +22,7 @@ def get_huggingface_interface(model_name, api_key, alias):
 
     # convert from binary to base64
     def post_process_binary_body(r: requests.Response):
-        with tempfile.NamedTemporaryFile(delete=False) as fp:
+        with temp_files.create_file() as fp:
             fp.write(r.content)
             return fp.name
 
@@ -0,0 +1,112 @@
+"""
+Keeps track of output files that are served by URL from the /file/ route,
+instead of being inlined into prediction responses as base64 data.
+"""
+from __future__ import annotations
+from collections import OrderedDict
+import os
+import secrets
+import threading
+import time
+from typing import Optional, Tuple
+
+from gradio import temp_files
+
+
+FILE_URL_PREFIX = "file/"
+
+
+class FileStore():
+    """
+    Maps opaque tokens to files on disk. Each file can be fetched for `ttl`
+    seconds after it was added, after which its token expires. Files that the
+    store owns (i.e. temporary files created to serve an output) are deleted
+    when their token expires, while other files are left in place.
+    """
+    def __init__(self, ttl: float = 3600):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        # token -> (path, owned, expiry time), in order of expiry
+        self.files: OrderedDict[str, Tuple[str, bool, float]] = OrderedDict()
+
+    def add(self, path: str, owned: bool = False) -> str:
+        """
+        Adds a file to the store.
+        Parameters:
+        path (str): path to the file.
+        owned (bool): whether the file should be deleted once it expires.
+        Returns:
+        (str): the URL of the file, relative to the root of the app.
+        """
+        token = secrets.token_urlsafe(16)
+        temp_files.keep(path)  # Needed after the request that created it
+        with self.lock:
+            self.remove_expired()
+            self.files[token] = (
+                os.path.abspath(path), owned, time.time() + self.ttl)
+        return FILE_URL_PREFIX + token
+
+    def get_path(self, token: str) -> Optional[str]:
+        """
+        Returns the path of the file with the given token, or None if the token
+        is unknown or has expired.
+        """
+        with self.lock:
+            self.remove_expired()
+            if token not in self.files:
+                return None
+            return self.files[token][0]
+
+    def resolve_url(self, url: str) -> Optional[str]:
+        """
+        Returns the path of the file that a URL returned by add() refers to,
+        or None if it isn't such a URL.
+        """
+        if not isinstance(url, str) or not url.startswith(FILE_URL_PREFIX):
+            return None
+        return self.get_path(url[len(FILE_URL_PREFIX):])
+
+    def remove_expired(self):
+        # Called with the lock held. Files expire in the order they are added.
+        now = time.time()
+        while self.files:
+            token, (path, owned, expiry) = next(iter(self.files.items()))
+            if expiry > now:
+                break
+            del self.files[token]
+            if owned:
+                self.delete_file(path)
+
+    def clear(self):
+        with self.lock:
+            for path, owned, _ in self.files.values():
+                if owned:
+                    self.delete_file(path)
+            self.files.clear()
+
+    @staticmethod
+    def delete_file(path: str):
+        temp_files.registry.delete(path)
+
+
+# The store that outputs are added to, if the launched interface serves files.
+store: Optional[FileStore] = None
+
+
+def start(ttl: float = 3600):
+    global store
+    stop()
+    store = FileStore(ttl)
+
+
+def stop():
+    global store
+    if store is not None:
+        store.clear()
+    store = None
+
+
+def resolve_url(url: str) -> Optional[str]:
+    if store is None:
+        return None
+    return store.resolve_url(url)
@@ -4,7 +4,15 @@ import datetime
 from gradio import encryptor
 import csv
 import io
+import atexit
+import json
+import queue
+import sqlite3
+import threading
+import time
+import traceback
 from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
 
 
 class FlaggingCallback(ABC):
@@ -39,6 +47,27 @@ class FlaggingCallback(ABC):
         """
         pass
 
+    def flag_batch(self, interface, samples):
+        """
+        Flags several samples at once. Subclasses can override this to write 
+        the samples together, e.g. in a single transaction or commit.
+        Parameters:
+        interface: The Interface object that is being used to launch the flagging interface.
+        samples: A list of dictionaries, each holding the keyword arguments of flag() for one sample.
+        Returns:
+        (List[int]) The value that flag() would have returned for each sample.
+        """
+        return [self.flag(interface, **sample) for sample in samples]
+
+    def get_flag_count(self, interface):
+        """
+        Parameters:
+        interface: The Interface object that is being used to launch the flagging interface.
+        Returns:
+        (int) The number of samples that have been flagged so far, or None if unknown.
+        """
+        return None
+
 
 class SimpleCSVLogger(FlaggingCallback):
     """
@@ -79,6 +108,8 @@ class CSVLogger(FlaggingCallback):
     def setup(self, flagging_dir):
         self.flagging_dir = flagging_dir
         os.makedirs(flagging_dir, exist_ok=True)
+        # (size of the encrypted log, number of flagged samples in it)
+        self.encrypted_row_count = None
 
     def flag(self, interface, input_data, output_data, flag_option=None, flag_index=None, username=None):
         flagging_dir = self.flagging_dir
@@ -88,34 +119,12 @@ class CSVLogger(FlaggingCallback):
         output_only_mode = input_data is None
 
         if flag_index is None:
-            csv_data = []
-            if not output_only_mode:
-                for i, input in enumerate(interface.input_components):
-                    csv_data.append(input.save_flagged(
-                        flagging_dir, interface.config["input_components"][i]["label"], input_data[i], encryption_key))
-            for i, output in enumerate(interface.output_components):
-                csv_data.append(output.save_flagged(
-                    flagging_dir, interface.config["output_components"][i]["label"], output_data[i], encryption_key) if
-                                output_data[i] is not None else "")
-            if not output_only_mode:
-                if flag_option is not None:
-                    csv_data.append(flag_option)
-                if username is not None:
-                    csv_data.append(username)
-                csv_data.append(str(datetime.datetime.now()))
+            csv_data = get_flagged_row(
+                interface, flagging_dir, input_data, output_data, flag_option, 
+                username, encryption_key)
             if is_new:
-                headers = []
-                if not output_only_mode:
-                    headers += [interface["label"]
-                            for interface in interface.config["input_components"]]
-                headers += [interface["label"]
-                            for interface in interface.config["output_components"]]
-                if not output_only_mode:
-                    if interface.flagging_options is not None:
-                        headers.append("flag")
-                    if username is not None:
-                        headers.append("username")
-                    headers.append("timestamp")
+                headers = get_flagged_headers(
+                    interface, output_only_mode, username)
 
         def replace_flag_at_index(file_content):
             file_content = io.StringIO(file_content)
@@ -129,41 +138,195 @@ class CSVLogger(FlaggingCallback):
             return output.getvalue()
 
         if interface.encrypt:
-            output = io.StringIO()
-            if not is_new:
-                with open(log_fp, "rb") as csvfile:
-                    encrypted_csv = csvfile.read()
-                    decrypted_csv = encryptor.decrypt(
-                        interface.encryption_key, encrypted_csv)
-                    file_content = decrypted_csv.decode()
-                    if flag_index is not None:
-                        file_content = replace_flag_at_index(file_content)
-                    output.write(file_content)
-            writer = csv.writer(output)
-            if flag_index is None:
+            return self.flag_encrypted(
+                log_fp, interface.encryption_key, 
+                headers if flag_index is None and is_new else None, 
+                csv_data if flag_index is None else None, 
+                flag_option, flag_index)
+        if flag_index is None:
+            with open(log_fp, "a", newline="") as csvfile:
+                writer = csv.writer(csvfile)
                 if is_new:
                     writer.writerow(headers)
                 writer.writerow(csv_data)
-            with open(log_fp, "wb") as csvfile:
-                csvfile.write(encryptor.encrypt(
-                    interface.encryption_key, output.getvalue().encode()))
         else:
-            if flag_index is None:
-                with open(log_fp, "a", newline="") as csvfile:
-                    writer = csv.writer(csvfile)
-                    if is_new:
-                        writer.writerow(headers)
-                    writer.writerow(csv_data)
-            else:
-                with open(log_fp) as csvfile:
-                    file_content = csvfile.read()
-                    file_content = replace_flag_at_index(file_content)
-                with open(log_fp, "w", newline="") as csvfile:  # newline parameter needed for Windows
-                    csvfile.write(file_content)
+            with open(log_fp) as csvfile:
+                file_content = csvfile.read()
+                file_content = replace_flag_at_index(file_content)
+            with open(log_fp, "w", newline="") as csvfile:  # newline parameter needed for Windows
+                csvfile.write(file_content)
         with open(log_fp, "r") as csvfile:
             line_count = len([None for row in csv.reader(csvfile)]) - 1
         return line_count
 
+    def flag_encrypted(self, log_fp, key, headers, csv_data, flag_option, flag_index):
+        """
+        Writes to an encrypted log, in which every CSV row is encrypted as a
+        separate record, so that only the new (or changed) row is encrypted
+        rather than the whole file. Returns the number of flagged samples.
+        """
+        row_count = 0
+        if os.path.exists(log_fp):
+            upgrade_encrypted_log(log_fp, key)
+            row_count = self.count_encrypted_rows(log_fp)
+        if flag_index is None:
+            with open(log_fp, "ab") as log:
+                if headers is not None:
+                    log.write(ENCRYPTED_LOG_HEADER)
+                    log.write(encryptor.encrypt_record(key, encode_csv_row(headers)))
+                log.write(encryptor.encrypt_record(key, encode_csv_row(csv_data)))
+        else:
+            with open(log_fp, "r+b") as log:
+                log.seek(len(ENCRYPTED_LOG_HEADER))
+                records = encryptor.read_records(log)
+                _, header_record = next(records)
+                header = decode_csv_row(encryptor.decrypt_record(key, header_record))
+                for index, (offset, record) in enumerate(records, start=1):
+                    if index == flag_index:
+                        break
+                else:
+                    raise IndexError("No flagged sample at index {}".format(flag_index))
+                row = decode_csv_row(encryptor.decrypt_record(key, record))
+                row[header.index("flag")] = flag_option
+                # Only the records after the changed one have to be moved.
+                log.seek(offset + encryptor.RECORD_LENGTH_BYTES + len(record))
+                rest = log.read()
+                log.seek(offset)
+                log.write(encryptor.encrypt_record(key, encode_csv_row(row)))
+                log.write(rest)
+                log.truncate()
+        if flag_index is None:
+            row_count += 1
+        self.encrypted_row_count = (os.path.getsize(log_fp), row_count)
+        return row_count
+
+    def count_encrypted_rows(self, log_fp):
+        """
+        Returns the number of flagged samples in an encrypted log. The count is
+        kept in memory along with the size of the log, so the log is only 
+        scanned again if it was changed by something else.
+        """
+        size = os.path.getsize(log_fp)
+        if self.encrypted_row_count is None or self.encrypted_row_count[0] != size:
+            self.encrypted_row_count = (size, count_encrypted_rows(log_fp))
+        return self.encrypted_row_count[1]
+
+    def get_flag_count(self, interface):
+        log_fp = "{}/log.csv".format(self.flagging_dir)
+        if not os.path.exists(log_fp):
+            return 0
+        if interface.encrypt:
+            upgrade_encrypted_log(log_fp, interface.encryption_key)
+            return self.count_encrypted_rows(log_fp)
+        with open(log_fp, "r") as csvfile:
+            return len([None for row in csv.reader(csvfile)]) - 1
+
+
+class SQLiteLogger(FlaggingCallback):
+    """
+    Logs the input and output data to a SQLite database in the flagging 
+    directory. Unlike CSVLogger, the cost of flagging a sample or changing its 
+    flag option doesn't grow with the number of flagged samples. If the 
+    interface is encrypted, each row is encrypted separately. Use export_csv() 
+    to get the same CSV file that CSVLogger would write.
+    """
+    def setup(self, flagging_dir):
+        self.flagging_dir = flagging_dir
+        os.makedirs(flagging_dir, exist_ok=True)
+        self.db_file = os.path.join(flagging_dir, "log.db")
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS flags (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    row BLOB
+                );""")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS headers (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    row TEXT
+                );""")
+            result = self.conn.execute(
+                "SELECT row FROM headers WHERE id = 0").fetchone()
+        self.headers = None if result is None else json.loads(result[0])
+
+    def flag(self, interface, input_data, output_data, flag_option=None, flag_index=None, username=None):
+        return self.flag_batch(interface, [{
+            "input_data": input_data, "output_data": output_data, 
+            "flag_option": flag_option, "flag_index": flag_index, 
+            "username": username}])[0]
+
+    def flag_batch(self, interface, samples):
+        with self.lock, self.conn:  # All samples are written in one transaction
+            return [self.write_sample(interface, **sample) 
+                    for sample in samples]
+
+    def get_flag_count(self, interface):
+        with self.lock:
+            return self.conn.execute(
+                "SELECT MAX(id) FROM flags").fetchone()[0] or 0
+
+    def write_sample(self, interface, input_data, output_data, flag_option=None, flag_index=None, username=None):
+        # Called with the lock held, inside a transaction.
+        encryption_key = interface.encryption_key if interface.encrypt else None
+        if flag_index is None:
+            row = get_flagged_row(
+                interface, self.flagging_dir, input_data, output_data, 
+                flag_option, username, encryption_key)
+            if self.headers is None:
+                self.headers = get_flagged_headers(
+                    interface, input_data is None, username)
+                self.conn.execute(
+                    "INSERT INTO headers (id, row) VALUES (0, ?)", 
+                    (json.dumps(self.headers),))
+            cursor = self.conn.execute(
+                "INSERT INTO flags (row) VALUES (?)", 
+                (self.encode_row(row, encryption_key),))
+            return cursor.lastrowid
+        result = self.conn.execute(
+            "SELECT row FROM flags WHERE id = ?", (flag_index,)).fetchone()
+        if result is None:
+            raise ValueError("No flagged sample with index {}".format(
+                flag_index))
+        row = self.decode_row(result[0], encryption_key)
+        row[self.headers.index("flag")] = flag_option
+        self.conn.execute("UPDATE flags SET row = ? WHERE id = ?", 
+                          (self.encode_row(row, encryption_key), flag_index))
+        return self.conn.execute("SELECT MAX(id) FROM flags").fetchone()[0]
+
+    def export_csv(self, csv_file, encryption_key=None):
+        """
+        Writes all of the flagged samples to a CSV file, in the format used by 
+        CSVLogger.
+        Parameters:
+        csv_file (str): path of the CSV file to write.
+        encryption_key (bytes): the key the rows were encrypted with, if any.
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT row FROM flags ORDER BY id").fetchall()
+        with open(csv_file, "w", newline="") as csvfile:
+            writer = csv.writer(csvfile)
+            if self.headers is not None:
+                writer.writerow(self.headers)
+            for (row,) in rows:
+                writer.writerow(self.decode_row(row, encryption_key))
+
+    @staticmethod
+    def encode_row(row, encryption_key):
+        data = json.dumps(row).encode("utf-8")
+        if encryption_key is not None:
+            data = encryptor.encrypt(encryption_key, data)
+        return data
+
+    @staticmethod
+    def decode_row(data, encryption_key):
+        if encryption_key is not None:
+            data = encryptor.decrypt(encryption_key, data)
+        return json.loads(data)
+
 
 class HuggingFaceDatasetSaver(FlaggingCallback):
     """
@@ -217,6 +380,34 @@ class HuggingFaceDatasetSaver(FlaggingCallback):
     def flag(self, interface, input_data, output_data, flag_option=None, 
              flag_index=None, username=None, path=None):
         # Note flag_index, username, path are not currently used 
+        self.write_sample(interface, input_data, output_data, flag_option)
+        line_count = self.get_flag_count(interface)
+
+        # push the repo 
+        self.repo.push_to_hub(
+            commit_message="Flagged sample #{}".format(line_count))
+        
+        return line_count
+
+    def flag_batch(self, interface, samples):
+        for sample in samples:
+            self.write_sample(interface, sample["input_data"], 
+                              sample["output_data"], sample.get("flag_option"))
+        line_count = self.get_flag_count(interface)
+
+        # push all of the samples in a single commit
+        self.repo.push_to_hub(commit_message="Flagged samples #{}-{}".format(
+            line_count - len(samples) + 1, line_count))
+        
+        return list(range(line_count - len(samples) + 1, line_count + 1))
+
+    def get_flag_count(self, interface):
+        if not os.path.exists(self.log_file):
+            return 0
+        with open(self.log_file, "r") as csvfile:
+            return len([None for row in csv.reader(csvfile)]) - 1
+
+    def write_sample(self, interface, input_data, output_data, flag_option=None):
         is_new = not os.path.exists(self.log_file)
         with open(self.log_file, "a", newline="") as csvfile:
             writer = csv.writer(csvfile)
@@ -242,13 +433,198 @@ class HuggingFaceDatasetSaver(FlaggingCallback):
             # Write the rows
             writer.writerow(csv_data)
 
-        # return number of samples in dataset
-        with open(self.log_file, "r") as csvfile:
-            line_count = len([None for row in csv.reader(csvfile)]) - 1
 
-        # push the repo 
-        self.repo.push_to_hub(
-            commit_message="Flagged sample #{}".format(line_count))
-        
-        return line_count
 
+class FlagWriter():
+    """
+    Flags samples in a background thread, so that flagging doesn't add to the 
+    latency of requests. Samples wait in a bounded queue and are passed to the 
+    callback's flag_batch() once `batch_size` of them are waiting, or 
+    `batch_delay` seconds after the first of them was queued. 
+    """
+    FLUSH = object()
+    STOP = object()
+
+    def __init__(
+        self, 
+        callback: FlaggingCallback, 
+        interface, 
+        batch_size: int = 10, 
+        batch_delay: float = 5, 
+        max_queue_size: int = 1000
+    ):
+        self.callback = callback
+        self.interface = interface
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.queue = queue.Queue(max_queue_size)
+        self.lock = threading.Lock()
+        # The number of samples flagged once the queue has been written, used to
+        # return the index a sample will have before it is written.
+        self.flag_count: Optional[int] = callback.get_flag_count(interface)
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def flag(self, interface, input_data, output_data, flag_option=None, flag_index=None, username=None):
+        """
+        Queues a sample to be flagged. Blocks if the queue is full.
+        Returns:
+        (int) The total number of samples that will have been flagged once 
+        this sample is written, or None if the callback cannot count them.
+        """
+        with self.lock:
+            if self.flag_count is not None and flag_index is None:
+                self.flag_count += 1
+            self.queue.put({
+                "input_data": input_data, "output_data": output_data, 
+                "flag_option": flag_option, "flag_index": flag_index, 
+                "username": username})
+            return self.flag_count
+
+    def flush(self):
+        """
+        Blocks until all of the queued samples have been written.
+        """
+        self.queue.put(self.FLUSH)
+        self.queue.join()
+
+    def close(self):
+        """
+        Writes all of the queued samples and stops the background thread.
+        """
+        if self.thread.is_alive():
+            self.queue.put(self.STOP)
+            self.thread.join()
+        atexit.unregister(self.close)
+
+    def run(self):
+        stopped = False
+        while not stopped:
+            batch: List[Dict[str, Any]] = []
+            num_items = 0
+            deadline = None
+            while len(batch) < self.batch_size:
+                timeout = None
+                if deadline is not None:
+                    timeout = max(deadline - time.time(), 0)
+                try:
+                    item = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                num_items += 1
+                if item is self.FLUSH:
+                    break
+                elif item is self.STOP:
+                    stopped = True
+                    break
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.time() + self.batch_delay
+            if batch:
+                try:
+                    self.callback.flag_batch(self.interface, batch)
+                except Exception:
+                    traceback.print_exc()
+            for _ in range(num_items):
+                self.queue.task_done()
+
+
+def get_flagged_row(interface, flagging_dir, input_data, output_data, 
+                    flag_option=None, username=None, encryption_key=None):
+    """
+    Saves the flagged components and returns the row that logs them. Only the 
+    output components are logged if input_data is None.
+    """
+    output_only_mode = input_data is None
+    row = []
+    if not output_only_mode:
+        for i, input in enumerate(interface.input_components):
+            row.append(input.save_flagged(
+                flagging_dir, interface.config["input_components"][i]["label"], input_data[i], encryption_key))
+    for i, output in enumerate(interface.output_components):
+        row.append(output.save_flagged(
+            flagging_dir, interface.config["output_components"][i]["label"], output_data[i], encryption_key) if
+                        output_data[i] is not None else "")
+    if not output_only_mode:
+        if flag_option is not None:
+            row.append(flag_option)
+        if username is not None:
+            row.append(username)
+        row.append(str(datetime.datetime.now()))
+    return row
+
+
+def get_flagged_headers(interface, output_only_mode=False, username=None):
+    headers = []
+    if not output_only_mode:
+        headers += [component["label"]
+                    for component in interface.config["input_components"]]
+    headers += [component["label"]
+                for component in interface.config["output_components"]]
+    if not output_only_mode:
+        if interface.flagging_options is not None:
+            headers.append("flag")
+        if username is not None:
+            headers.append("username")
+        headers.append("timestamp")
+    return headers
+
+
+# Starts an encrypted log.csv written by CSVLogger, followed by one encrypted 
+# record per CSV row (see encryptor.encrypt_record()). Encrypted logs without 
+# it are single encrypted blobs, written by older versions.
+ENCRYPTED_LOG_HEADER = b"GRADIO-ENCRYPTED-LOG-1\n"
+
+
+def encode_csv_row(row):
+    output = io.StringIO()
+    csv.writer(output).writerow(row)
+    return output.getvalue().encode("utf-8")
+
+
+def decode_csv_row(data):
+    return next(csv.reader(io.StringIO(data.decode("utf-8"))))
+
+
+def read_encrypted_log(log_fp, key):
+    """
+    Decrypts an encrypted log written by CSVLogger one row at a time.
+    Parameters:
+    log_fp (str): path to the encrypted log.
+    key (bytes): the encryption key of the interface.
+    Returns:
+    (Iterator[List[str]]): the rows of the log, starting with the headers.
+    """
+    upgrade_encrypted_log(log_fp, key)
+    with open(log_fp, "rb") as log:
+        log.seek(len(ENCRYPTED_LOG_HEADER))
+        for _, record in encryptor.read_records(log):
+            yield decode_csv_row(encryptor.decrypt_record(key, record))
+
+
+def count_encrypted_rows(log_fp):
+    """
+    Returns the number of flagged samples in an encrypted log, without 
+    decrypting it.
+    """
+    with open(log_fp, "rb") as log:
+        log.seek(len(ENCRYPTED_LOG_HEADER))
+        return sum(1 for _ in encryptor.read_records(log)) - 1
+
+
+def upgrade_encrypted_log(log_fp, key):
+    """
+    Rewrites an encrypted log that was encrypted as a single blob as one 
+    record per row. Does nothing if the log is already in that format.
+    """
+    with open(log_fp, "rb") as log:
+        if log.read(len(ENCRYPTED_LOG_HEADER)) == ENCRYPTED_LOG_HEADER:
+            return
+        log.seek(0)
+        file_content = encryptor.decrypt(key, log.read()).decode()
+    with open(log_fp + ".tmp", "wb") as log:
+        log.write(ENCRYPTED_LOG_HEADER)
+        for row in csv.reader(io.StringIO(file_content)):
+            log.write(encryptor.encrypt_record(key, encode_csv_row(row)))
+    os.replace(log_fp + ".tmp", log_fp)
@@ -12,11 +12,10 @@ from numbers import Number
 import numpy as np
 import pandas as pd
 import PIL
-import tempfile
 from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
 import warnings
 
-from gradio import processing_utils, test_data
+from gradio import processing_utils, temp_files, test_data
 from gradio.component import Component
 
 if TYPE_CHECKING:  # Only import for type checking (is False at runtime).
@@ -46,6 +45,19 @@ class InputComponent(Component):
         """
         return x
 
+    def preprocess_upload(
+        self, 
+        x: Any, 
+        files: List[Tuple[str, bytes]]) -> Any:
+        """
+        Replaces the data of the input with files uploaded as raw bytes in a multipart/form-data request, so that it can be passed to preprocess() without being encoded as base64.
+        Parameters:
+        x (Any): the input as sent in the JSON part of the request, if any
+        files (List[Tuple[str, bytes]]): the name and contents of each file uploaded for this input
+        """
+        raise ValueError("{} does not accept file uploads.".format(
+            self.__class__.__name__))
+
     def serialize(
         self, 
         x: Any, 
@@ -770,6 +782,7 @@ class Image(InputComponent):
     Input type: Union[numpy.array, PIL.Image, file-object]
     Demos: image_classifier, image_mod, webcam, digit_classifier
     """
+    thumbnail_kind = "image"
 
     def __init__(
         self, 
@@ -825,13 +838,16 @@ class Image(InputComponent):
     def preprocess(self, x):
         """
         Parameters:
-        x (str): base64 url data
+        x (Union[str, numpy.array]): base64 url data, or an already decoded image (as produced by tokenize() and get_masked_inputs() during interpretation)
         Returns:
         (Union[numpy.array, PIL.Image, file-object]): image in requested format
         """
         if x is None:
             return x
-        im = processing_utils.decode_base64_to_image(x)
+        if isinstance(x, np.ndarray):
+            im = PIL.Image.fromarray(x)
+        else:
+            im = processing_utils.decode_base64_to_image(x)
         fmt = im.format
         with warnings.catch_warnings():
             warnings.simplefilter("ignore")
@@ -845,7 +861,7 @@ class Image(InputComponent):
         elif self.type == "numpy":
             return np.array(im)
         elif self.type == "file" or self.type == "filepath":
-            file_obj = tempfile.NamedTemporaryFile(delete=False, suffix=(
+            file_obj = temp_files.create_file(suffix=(
                 "."+fmt.lower() if fmt is not None else ".png"))
             im.save(file_obj.name)
             if self.type == "file":
@@ -861,6 +877,13 @@ class Image(InputComponent):
     def preprocess_example(self, x):
         return processing_utils.encode_file_to_base64(x)
 
+    def preprocess_upload(self, x, files):
+        """
+        Returns:
+        (bytes): the uploaded image file, which preprocess() opens directly
+        """
+        return files[0][1]
+
     def serialize(self, x, called_directly=False):
         # if called directly, can assume it's a URL or filepath
         if self.type == "filepath" or called_directly:
@@ -871,7 +894,7 @@ class Image(InputComponent):
             if self.type == "numpy":
                 x = PIL.Image.fromarray(np.uint8(x)).convert('RGB')
             fmt = x.format
-            file_obj = tempfile.NamedTemporaryFile(delete=False, suffix=(
+            file_obj = temp_files.create_file(suffix=(
                 "."+fmt.lower() if fmt is not None else ".png"))
             x.save(file_obj.name)
             return processing_utils.encode_url_or_file_to_base64(file_obj.name)
@@ -919,33 +942,35 @@ class Image(InputComponent):
         Parameters:
         x: base64 representation of an image
         Returns:
-        tokens: list of tokens, used by the get_masked_input() method
+        tokens: list of (image, segment map, segment index) tuples, one per segment, used by the get_masked_input() method. The image and segment map are shared by all tokens.
         leave_one_out_tokens: list of left-out tokens, used by the get_interpretation_neighbors() method
-        masks: list of masks, used by the get_interpretation_neighbors() method
+        masks: None, since the segment map in the tokens is used instead
         """
         segments_slic, resized_and_cropped_image = self._segment_by_slic(x)
-        tokens, masks, leave_one_out_tokens = [], [], []
+        # Labels each pixel with the index of its segment (0, 1, ...)
+        segment_values, segment_map = np.unique(segments_slic, return_inverse=True)
+        segment_map = segment_map.reshape(segments_slic.shape)
+        tokens, leave_one_out_tokens = [], []
         replace_color = np.mean(resized_and_cropped_image, axis=(0, 1))
-        for (i, segment_value) in enumerate(np.unique(segments_slic)):
-            mask = (segments_slic == segment_value)
+        for i in range(len(segment_values)):
             image_screen = np.copy(resized_and_cropped_image)
-            image_screen[segments_slic == segment_value] = replace_color
-            leave_one_out_tokens.append(
-                processing_utils.encode_array_to_base64(image_screen))
-            token = np.copy(resized_and_cropped_image)
-            token[segments_slic != segment_value] = 0
-            tokens.append(token)
-            masks.append(mask)
-        return tokens, leave_one_out_tokens, masks
+            image_screen[segment_map == i] = replace_color
+            # Kept as arrays rather than base64, since they are only passed
+            # to preprocess() and never sent to the frontend
+            leave_one_out_tokens.append(image_screen)
+            tokens.append((resized_and_cropped_image, segment_map, i))
+        return tokens, leave_one_out_tokens, None
 
     def get_masked_inputs(self, tokens, binary_mask_matrix):
+        image, segment_map, _ = tokens[0]
         masked_inputs = []
         for binary_mask_vector in binary_mask_matrix:
-            masked_input = np.zeros_like(tokens[0], dtype=int)
-            for token, b in zip(tokens, binary_mask_vector):
-                masked_input = masked_input + token*int(b)
+            # Looks up whether each pixel's segment is kept
+            pixel_mask = np.asarray(binary_mask_vector, dtype=bool)[segment_map]
+            if image.ndim == 3:
+                pixel_mask = pixel_mask[..., np.newaxis]
             masked_inputs.append(
-                processing_utils.encode_array_to_base64(masked_input))
+                np.where(pixel_mask, image, 0).astype(np.uint8, copy=False))
         return masked_inputs
 
     def get_interpretation_scores(self, x, neighbors, scores, masks, tokens=None):
@@ -953,14 +978,8 @@ class Image(InputComponent):
         Returns:
         (List[List[float]]): A 2D array representing the interpretation score of each pixel of the image.
         """
-        x = processing_utils.decode_base64_to_image(x)
-        if self.shape is not None:
-            x = processing_utils.resize_and_crop(x, self.shape)
-        x = np.array(x)
-        output_scores = np.zeros((x.shape[0], x.shape[1]))
-
-        for score, mask in zip(scores, masks):
-            output_scores += score * mask
+        _, segment_map, _ = tokens[0]
+        output_scores = np.asarray(scores, dtype=float)[segment_map]
 
         max_val, min_val = np.max(output_scores), np.min(output_scores)
         if max_val > 0:
@@ -983,6 +1002,7 @@ class Video(InputComponent):
     Input type: filepath
     Demos: video_flip
     """
+    thumbnail_kind = "video"
 
     def __init__(
         self, 
@@ -1047,6 +1067,14 @@ class Video(InputComponent):
         else:
             return file_name
 
+    def preprocess_upload(self, x, files):
+        """
+        Returns:
+        (Dict[name: str, data: bytes]): JSON object with the uploaded filename as 'name' property and its contents as 'data' property
+        """
+        file_name, file_data = files[0]
+        return dict(x or {}, name=file_name, data=file_data)
+
     def serialize(self, x, called_directly):
         raise NotImplementedError()
 
@@ -1109,22 +1137,25 @@ class Audio(InputComponent):
     def preprocess(self, x):
         """
         Parameters:
-        x (Dict[name: str, data: str]): JSON object with filename as 'name' property and base64 data as 'data' property  
+        x (Union[Dict[name: str, data: str], Tuple[int, numpy.array]]): JSON object with filename as 'name' property and base64 data as 'data' property, or an already decoded (sample_rate, data) tuple (as produced by tokenize() and get_masked_inputs() during interpretation)
         Returns:
         (Union[Tuple[int, numpy.array], file-object, numpy.array]): audio in requested format
         """
         if x is None:
             return x
-        file_name, file_data, is_example = x["name"], x["data"], x.get("is_example", False)
-        crop_min, crop_max = x.get("crop_min", 0), x.get("crop_max", 100)
-        if is_example:
-            file_obj = processing_utils.create_tmp_copy_of_file(file_name)
-        else:
-            file_obj = processing_utils.decode_base64_to_file(
-                file_data, file_path=file_name)
-        if crop_min != 0 or crop_max != 100:
-            sample_rate, data = processing_utils.audio_from_file(file_obj.name, crop_min=crop_min, crop_max=crop_max)
+        if isinstance(x, tuple):
+            sample_rate, data = x
+            if self.type == "numpy":
+                return sample_rate, data
+            # Only written to a file if the function needs one
+            file_obj = temp_files.create_file(suffix=".wav")
             processing_utils.audio_to_file(sample_rate, data, file_obj.name)
+        else:
+            file_obj = self._decode_to_file(x)
+            crop_min, crop_max = x.get("crop_min", 0), x.get("crop_max", 100)
+            if crop_min != 0 or crop_max != 100:
+                sample_rate, data = processing_utils.audio_from_file(file_obj.name, crop_min=crop_min, crop_max=crop_max)
+                processing_utils.audio_to_file(sample_rate, data, file_obj.name)
         if self.type == "file":
             warnings.warn(
                 "The 'file' type has been deprecated. Set parameter 'type' to 'filepath' instead.", DeprecationWarning)
@@ -1137,6 +1168,20 @@ class Audio(InputComponent):
             raise ValueError("Unknown type: " + str(self.type) +
                              ". Please choose from: 'numpy', 'filepath'.")
 
+    def _decode_to_file(self, x):
+        file_name, file_data, is_example = x["name"], x["data"], x.get("is_example", False)
+        if is_example:
+            return processing_utils.create_tmp_copy_of_file(file_name)
+        return processing_utils.decode_base64_to_file(file_data, file_path=file_name)
+
+    def preprocess_upload(self, x, files):
+        """
+        Returns:
+        (Dict[name: str, data: bytes]): JSON object with the uploaded filename as 'name' property and its contents as 'data' property
+        """
+        file_name, file_data = files[0]
+        return dict(x or {}, name=file_name, data=file_data)
+
     def serialize(self, x, called_directly):
         if x is None:
             return None
@@ -1147,7 +1192,7 @@ class Audio(InputComponent):
                 "The 'file' type has been deprecated. Set parameter 'type' to 'filepath' instead.", DeprecationWarning)
             name = x.name
         elif self.type == "numpy":
-            file = tempfile.NamedTemporaryFile(delete=False)
+            file = temp_files.create_file()
             name = file.name
             processing_utils.audio_to_file(x[0], x[1], name)
         else:
@@ -1167,8 +1212,20 @@ class Audio(InputComponent):
         return self
 
     def tokenize(self, x):
-        file_obj = processing_utils.decode_base64_to_file(x)
-        sample_rate, data = processing_utils.audio_from_file(x)
+        """
+        Segments audio into tokens, masks, and leave-one-out-tokens
+        Parameters:
+        x (Dict[name: str, data: str]): JSON object with filename as 'name' property and base64 data as 'data' property
+        Returns:
+        tokens: list of (sample_rate, data, start, stop) tuples, one per segment, used by the get_masked_input() method. The data is shared by all tokens.
+        leave_one_out_tokens: list of (sample_rate, data) tuples in which one segment is silenced, used by the get_interpretation_neighbors() method
+        masks: list of (start, stop) sample ranges of the segments
+        """
+        # The audio is decoded once; the perturbations are kept in memory
+        with temp_files.scope():
+            file_obj = self._decode_to_file(x)
+            sample_rate, data = processing_utils.audio_from_file(
+                file_obj.name, crop_min=x.get("crop_min", 0), crop_max=x.get("crop_max", 100))
         leave_one_out_sets = []
         tokens = []
         masks = []
@@ -1179,45 +1236,21 @@ class Audio(InputComponent):
         for index in range(len(boundaries) - 1):
             start, stop = boundaries[index], boundaries[index + 1]
             masks.append((start, stop))
-            # Handle the leave one outs
             leave_one_out_data = np.copy(data)
             leave_one_out_data[start:stop] = 0
-            file = tempfile.NamedTemporaryFile(delete=False)
-            processing_utils.audio_to_file(sample_rate, leave_one_out_data, file.name)
-            out_data = processing_utils.encode_file_to_base64(file.name)
-            leave_one_out_sets.append(out_data)
-            # Handle the tokens
-            token = np.copy(data)
-            token[0:start] = 0
-            token[stop:] = 0
-            file = tempfile.NamedTemporaryFile(delete=False)
-            processing_utils.audio_to_file(sample_rate, token, file.name)
-            token_data = processing_utils.encode_file_to_base64(file.name)
-            tokens.append(token_data)
+            leave_one_out_sets.append((sample_rate, leave_one_out_data))
+            tokens.append((sample_rate, data, start, stop))
         return tokens, leave_one_out_sets, masks
 
     def get_masked_inputs(self, tokens, binary_mask_matrix):
-        # create a "zero input" vector and get sample rate
-        x = tokens[0]
-        file_obj = processing_utils.decode_base64_to_file(x)
-        sample_rate, data = processing_utils.audio_from_file(file_obj.name)
-        zero_input = np.zeros_like(data, dtype=int)
-        # decode all of the tokens
-        token_data = []
-        for token in tokens:
-            file_obj = processing_utils.decode_base64_to_file(token)
-            _, data = processing_utils.audio_from_file(file_obj.name)
-            token_data.append(data)
-        # construct the masked version
+        sample_rate, data, _, _ = tokens[0]
         masked_inputs = []
         for binary_mask_vector in binary_mask_matrix:
-            masked_input = np.copy(zero_input)
-            for t, b in zip(token_data, binary_mask_vector):
-                masked_input = masked_input + t*int(b)
-            file = tempfile.NamedTemporaryFile(delete=False)
-            processing_utils.audio_to_file(sample_rate, masked_input, file_obj.name)
-            masked_data = processing_utils.encode_file_to_base64(file.name)
-            masked_inputs.append(masked_data)
+            masked_input = np.zeros_like(data)
+            for (_, _, start, stop), b in zip(tokens, binary_mask_vector):
+                if b:
+                    masked_input[start:stop] = data[start:stop]
+            masked_inputs.append((sample_rate, masked_input))
         return masked_inputs
 
     def get_interpretation_scores(self, x, neighbors, scores, masks=None, tokens=None):
@@ -1316,6 +1349,14 @@ class File(InputComponent):
         else:
             return [process_single_file(f) for f in x]
 
+    def preprocess_upload(self, x, files):
+        """
+        Returns:
+        (List[Dict[name: str, data: bytes]]): List of JSON objects with the uploaded filename as 'name' property and its contents as 'data' property
+        """
+        return [{"name": file_name, "data": file_data} 
+                for file_name, file_data in files]
+
     def save_flagged(self, dir, label, data, encryption_key):
         """
         Returns: (str) path to file
@@ -5,24 +5,31 @@ including various methods for constructing an interface and then launching it.
 
 from __future__ import annotations
 import copy
+import functools
 import getpass
 from logging import warning
 import markdown2  # type: ignore
 import os
 import random
 import sys
+import threading
 import time
 from typing import Callable, Any, List, Optional, Tuple, TYPE_CHECKING
 import warnings
 import webbrowser
 import weakref
 
-from gradio import encryptor, interpretation, networking, queueing, strings, utils  # type: ignore
+from gradio import encryptor, file_store, interpretation, networking, queueing, strings, utils  # type: ignore
+from gradio.batching import Batcher
+from gradio.example_pages import ExamplePages
 from gradio.external import load_interface, load_from_pipeline  # type: ignore
-from gradio.flagging import FlaggingCallback, CSVLogger  # type: ignore
+from gradio.flagging import FlaggingCallback, FlagWriter, CSVLogger  # type: ignore
 from gradio.inputs import get_input_instance, InputComponent, State as i_State  # type: ignore
 from gradio.outputs import get_output_instance, OutputComponent, State as o_State  # type: ignore
-from gradio.process_examples import cache_interface_examples
+from gradio.prediction_cache import (
+    get_interface_version, get_prediction_cache, PredictionCache)
+from gradio.process_examples import cache_interface_examples, ExampleCache
+from gradio.worker_pool import WorkerPool
 
 if TYPE_CHECKING:  # Only import for type checking (is False at runtime).
     import transformers
@@ -121,7 +128,17 @@ class Interface:
         server_port=None,
         enable_queue=None, 
         api_mode=None,
-        flagging_callback: FlaggingCallback = CSVLogger()):
+        flagging_callback: FlaggingCallback = CSVLogger(),
+        batch: bool = False,
+        max_batch_size: int = 32,
+        max_batch_delay_ms: float = 10,
+        num_processes: Optional[int] = None,
+        process_initializer: Optional[Callable] = None,
+        process_initargs: Tuple = (),
+        cache: Optional[bool | int | PredictionCache] = None,
+        flag_in_background: bool = False,
+        flagging_batch_size: int = 10,
+        flagging_batch_delay: float = 5):
         """
         Parameters:
         fn (Union[Callable, List[Callable]]): the function to wrap an interface around.
@@ -151,6 +168,17 @@ class Interface:
         api_mode (bool): DEPRECATED. If True, will skip preprocessing steps when the Interface is called() as a function (should remain False unless the Interface is loaded from an external repo)
         server_name (str): DEPRECATED. Name of the server to use for serving the interface - pass in launch() instead.
         server_port (int): DEPRECATED. Port of the server to use for serving the interface - pass in launch() instead.
+        flagging_callback (FlaggingCallback): An instance of a subclass of FlaggingCallback which will be called when a sample is flagged.
+        batch (bool): if True, concurrent predictions are collected into batches and fn is called once per batch. fn then receives a list of values for each input component and must return a list with one output per input (or, with several output components, one such list per output component).
+        max_batch_size (int): the largest number of predictions to run in a single batch. Only applies if batch is True.
+        max_batch_delay_ms (float): how long to wait for more predictions to fill a batch before running it, in milliseconds. Only applies if batch is True.
+        num_processes (int): if provided, fn runs in this many worker processes instead of the server process, so that CPU-bound functions that hold the GIL can use all cores. Inputs and outputs of fn must be picklable.
+        process_initializer (Callable): if provided, called once in each worker process when it starts, e.g. to load a model. Only applies if num_processes is provided.
+        process_initargs (Tuple): the arguments passed to process_initializer.
+        cache (Union[bool, int, PredictionCache]): if provided, outputs are cached by input, and inputs that were already processed return the cached output without running fn. Pass True to cache the 128 most recently used inputs, an int to cache that many, or a PredictionCache to also set a TTL or a cache directory. Outputs served by URL (see the serve_files parameter of launch()) are not cached.
+        flag_in_background (bool): if True, flagged samples are queued and written by flagging_callback in a background thread, so that flagging (e.g. with allow_flagging="auto") doesn't slow down predictions. Queued samples are written when the interface is closed. Not supported with allow_flagging="auto" and the "process" executor.
+        flagging_batch_size (int): if flag_in_background is True, the number of queued samples that are written together.
+        flagging_batch_delay (float): if flag_in_background is True, the longest time in seconds that a flagged sample waits for others to be written with it.
         """
         if not isinstance(fn, list):
             fn = [fn]
@@ -179,6 +207,10 @@ class Interface:
             if state.default is None:
                 default = utils.get_default_args(fn[0])[state_param_index]
                 state.default = default
+            if batch:
+                raise ValueError("State cannot be used with batch.")
+            if cache:
+                raise ValueError("State cannot be used with cache.")
 
         if interpretation is None or isinstance(interpretation, list) or callable(interpretation):
             self.interpretation = interpretation
@@ -190,6 +222,28 @@ class Interface:
         self.predict = fn
         self.predict_durations = [[0, 0]] * len(fn)
         self.function_names = [func.__name__ for func in fn]
+        if num_processes is not None:
+            self.worker_pool = WorkerPool(
+                fn, num_processes, process_initializer, process_initargs)
+            run_fns = [functools.partial(self.worker_pool.run, i)
+                       for i in range(len(fn))]
+        else:
+            self.worker_pool = None
+            run_fns = fn
+        self.batch = batch
+        self.cache = get_prediction_cache(cache)
+        if self.cache is not None:
+            self.cache_version = get_interface_version(self)
+            if self.cache_version is None and self.cache.cache_dir is not None:
+                warnings.warn("The prediction function depends on objects "
+                              "that can't be hashed, so outputs are only "
+                              "cached in memory. Set a `__version__` "
+                              "attribute on it to cache them on disk.")
+        if self.batch:
+            num_outputs = len(self.output_components) // len(fn)
+            self.batchers = [
+                Batcher(func, max_batch_size, max_batch_delay_ms, num_outputs)
+                for func in run_fns]
         self.__name__ = ", ".join(self.function_names)
 
         if verbose:
@@ -265,6 +319,9 @@ class Interface:
                 "list, where each sublist represents a set of inputs.")
         self.num_shap = num_shap
         self.examples_per_page = examples_per_page
+        self.example_pages = ExamplePages(self) \
+            if isinstance(self.examples, str) else None
+        self.example_cache = ExampleCache(self)
 
         self.simple_server = None
         self.allow_screenshot = allow_screenshot
@@ -297,6 +354,10 @@ class Interface:
         self.flagging_options = flagging_options
         self.flagging_callback = flagging_callback
         self.flagging_dir = flagging_dir
+        self.flag_in_background = flag_in_background
+        self.flagging_batch_size = flagging_batch_size
+        self.flagging_batch_delay = flagging_batch_delay
+        self.flagger = flagging_callback
 
         self.save_to = None  # Used for selenium tests
         self.share = None
@@ -406,15 +467,23 @@ class Interface:
         durations = []
         output_component_counter = 0
 
-        for predict_fn in self.predict:
+        for i, predict_fn in enumerate(self.predict):
             start = time.time()
-            if self.capture_session and self.session is not None:  # For TF 1.x
+            if self.batch:  # Duration is amortized over the batch
+                prediction, batch_duration, batch_size = self.batchers[
+                    i].submit(processed_input)
+                duration = batch_duration / batch_size
+            elif self.worker_pool is not None:
+                prediction = self.worker_pool.run(i, *processed_input)
+                duration = time.time() - start
+            elif self.capture_session and self.session is not None:  # For TF 1.x
                 graph, sess = self.session
                 with graph.as_default(), sess.as_default():
                     prediction = predict_fn(*processed_input)
+                duration = time.time() - start
             else:
                 prediction = predict_fn(*processed_input)
-            duration = time.time() - start
+                duration = time.time() - start
 
             if len(self.output_components) == len(self.predict):
                 prediction = [prediction]
@@ -434,6 +503,36 @@ class Interface:
         else:
             return predictions
 
+    def run_predictions(
+        self, 
+        processed_inputs: List[List[Any]]
+    ) -> List[List[Any]]:
+        """
+        Runs the prediction function on several (already processed) inputs, 
+        e.g. the perturbed inputs of an interpretation. If the interface is 
+        batched, the inputs are submitted together, so that they are run in 
+        batches of up to `max_batch_size`. Otherwise, they are run one by one.
+        Parameters:
+        processed_inputs (list): A list of lists of processed inputs.
+        Returns:
+        predictions (list): A list of predictions for each input (not post-processed).
+        """
+        if not self.batch or self.api_mode:
+            return [self.run_prediction(processed_input) 
+                    for processed_input in processed_inputs]
+        outputs = [batcher.submit_many(processed_inputs) 
+                   for batcher in self.batchers]
+        all_predictions = []
+        for j in range(len(processed_inputs)):
+            predictions = []
+            for fn_outputs in outputs:
+                prediction = fn_outputs[j][0]
+                if len(self.output_components) == len(self.predict):
+                    prediction = [prediction]
+                predictions.extend(prediction)
+            all_predictions.append(predictions)
+        return all_predictions
+
     def process(
         self, 
         raw_input: List[Any]
@@ -447,6 +546,12 @@ class Interface:
         processed output: a list of processed  outputs to return as the prediction(s).
         duration: a list of time deltas measuring inference time for each prediction fn.
         """
+        if self.cache is not None:
+            persist = self.cache_version is not None
+            cache_key = self.cache.get_key(raw_input, self.cache_version or "")
+            cached_output = self.cache.get(cache_key, persist)
+            if cached_output is not None:
+                return cached_output, [0] * len(self.predict)
         processed_input = [input_component.preprocess(raw_input[i])
                            for i, input_component in enumerate(
                                self.input_components)]
@@ -463,6 +568,8 @@ class Interface:
                 / self.predict_durations[i][1])
         if hasattr(self, "config"):
             self.config["avg_durations"] = avg_durations
+        if self.cache is not None and file_store.store is None:
+            self.cache.put(cache_key, processed_output, persist)
         
         return processed_output, durations
     
@@ -515,10 +622,21 @@ class Interface:
         server_port: Optional[int] = None, 
         show_tips: bool = False, 
         enable_queue: bool = False,
+        queue_backend: Optional[str | queueing.QueueBackend] = None,
+        queue_concurrency: int = 1,
+        max_threads: int = 40,
+        executor: str = "thread",
+        max_backlog: Optional[int] = None,
+        serve_files: bool = False,
+        file_ttl: float = 3600,
+        temp_file_max_bytes: Optional[int] = None,
+        temp_file_max_age: Optional[float] = None,
         height: int = 500, 
         width: int = 900, 
         encrypt: bool = False,
         cache_examples: bool = False,
+        cache_examples_in_background: bool = False,
+        cache_examples_workers: int = 1,
         favicon_path: Optional[str] = None,
     ) -> Tuple[flask.Flask, str, str]:
         """
@@ -537,16 +655,29 @@ class Interface:
         server_name (str): to make app accessible on local network, set this to "0.0.0.0". Can be set by environment variable GRADIO_SERVER_NAME.
         show_tips (bool): if True, will occasionally show tips about new Gradio features
         enable_queue (bool): if True, inference requests will be served through a queue instead of with parallel threads. Required for longer inference times (> 1min) to prevent timeout.  
+        queue_backend (Union[str, QueueBackend]): where queued jobs are stored if enable_queue is True. "memory" (default) keeps them in process, "sqlite" stores them in a database file on disk. A custom QueueBackend instance can also be provided.
+        queue_concurrency (int): if enable_queue is True, the number of queued jobs that can be processed at the same time. Useful if the prediction function releases the GIL (e.g. NumPy, ONNX or torch models).
+        max_threads (int): the maximum number of predictions and interpretations that can run at the same time outside of the queue, so that slow functions don't block the server.
+        executor (str): what runs predictions and interpretations outside of the queue: "thread" (default) uses a pool of threads, "process" uses a pool of forked processes, which is useful for CPU-bound functions that hold the GIL. State and prediction statistics are not shared between processes.
+        max_backlog (int): if provided, the number of requests that can wait for a free thread or process. Further requests are rejected with a 503 error until the backlog clears.
+        serve_files (bool): if True, image, audio, video and file outputs are returned as URLs to files served by the app (with support for range requests), rather than as base64 data in the response. Not supported with the "process" executor.
+        file_ttl (float): if serve_files is True, the number of seconds that an output file can be fetched for. Temporary files created for outputs are deleted once they expire.
+        temp_file_max_bytes (int): if provided, the oldest temporary files created while processing inputs and outputs are deleted in the background whenever together they hold more than this many bytes.
+        temp_file_max_age (float): if provided, temporary files created while processing inputs and outputs are deleted in the background once they are older than this many seconds. Temporary files that are only needed during a request are always deleted at the end of it.
         width (int): The width in pixels of the <iframe> element containing the interface (used if inline=True)
         height (int): The height in pixels of the <iframe> element containing the interface (used if inline=True)
         encrypt (bool): If True, flagged data will be encrypted by key provided by creator at launch
         cache_examples (bool): If True, examples outputs will be processed and cached in a folder, and will be used if a user uses an example input.
+        cache_examples_in_background (bool): If True (and cache_examples is True), the examples are cached in a background thread while the interface is already running. Until then, selected examples are processed like any other input.
+        cache_examples_workers (int): The number of threads that process examples while caching them. Only increase it if the prediction functions are thread-safe.
         favicon_path (str): If a path to an file (.png, .gif, or .ico) is provided, it will be used as the favicon for the web page.
         Returns:
         app (flask.Flask): Flask app object
         path_to_local_server (str): Locally accessible link
         share_url (str): Publicly accessible link (if share=True)
         """
+        if self.example_pages is not None:
+            self.example_pages.clear()  # The examples may have changed
         self.config = self.get_config_file()        
         self.cache_examples = cache_examples
         if auth and not callable(auth) and not isinstance(
@@ -568,14 +699,67 @@ class Interface:
 
         if self.enable_queue is None:
             self.enable_queue = enable_queue
+        self.queue_backend = queue_backend
+        if queue_concurrency < 1:
+            raise ValueError("`queue_concurrency` must be at least 1.")
+        self.queue_concurrency = queue_concurrency
+        if max_threads < 1:
+            raise ValueError("`max_threads` must be at least 1.")
+        self.max_threads = max_threads
+        if executor not in ("thread", "process"):
+            raise ValueError("Invalid executor: {}. Please choose from: "
+                             "'thread', 'process'.".format(executor))
+        if executor == "process" and self.batch:
+            raise ValueError("Cannot batch predictions in a process executor.")
+        if executor == "process" and self.worker_pool is not None:
+            raise ValueError("Cannot use a process executor when the "
+                             "interface runs in worker processes.")
+        if executor == "process" and serve_files:
+            # Output files would be registered in the worker's file store,
+            # which the server can't see
+            raise ValueError("Cannot serve output files by URL from a "
+                             "process executor.")
+        if (executor == "process" and self.flag_in_background 
+                and self.allow_flagging == "auto"):
+            # Samples would be queued in the workers, which have no writer 
+            # thread
+            raise ValueError("Cannot flag automatically in the background "
+                             "from a process executor.")
+        self.executor = executor
+        if max_backlog is not None and max_backlog < 0:
+            raise ValueError("`max_backlog` cannot be negative.")
+        self.max_backlog = max_backlog
+        self.serve_files = serve_files
+        self.file_ttl = file_ttl
+        self.temp_file_max_bytes = temp_file_max_bytes
+        self.temp_file_max_age = temp_file_max_age
         if self.allow_flagging:
             self.flagging_callback.setup(self.flagging_dir)
+            if self.flag_in_background:
+                if isinstance(self.flagger, FlagWriter):
+                    self.flagger.close()
+                self.flagger = FlagWriter(
+                    self.flagging_callback, self, self.flagging_batch_size, 
+                    self.flagging_batch_delay)
 
         config = self.get_config_file()
         self.config = config
 
+        if self.worker_pool is not None:  # Start before any server threads
+            self.worker_pool.start()
         if self.cache_examples:
-            cache_interface_examples(self)
+            self.example_cache.ready = False
+
+            def cache_examples():
+                cache_interface_examples(
+                    self, max_workers=cache_examples_workers)
+                self.example_cache.clear()  # The cache may have been rewritten
+                self.example_cache.ready = True
+
+            if cache_examples_in_background:
+                threading.Thread(target=cache_examples, daemon=True).start()
+            else:
+                cache_examples()
 
         server_port, path_to_local_server, app, server = networking.start_server(
             self, server_name, server_port)
@@ -681,6 +865,10 @@ class Interface:
         """
         Closes the Interface that was launched and frees the port.
         """
+        if self.worker_pool is not None:
+            self.worker_pool.close()
+        if isinstance(self.flagger, FlagWriter):
+            self.flagger.close()
         try:
             self.server.close()
             if verbose:
@@ -20,18 +20,13 @@ def run_interpret(interface, raw_input):
         for i, (x, interp) in enumerate(zip(raw_input, interface.interpretation)):
             if interp == "default":
                 input_component = interface.input_components[i]
-                neighbor_raw_input = list(raw_input)
                 if input_component.interpret_by_tokens:
                     tokens, neighbor_values, masks = input_component.tokenize(
                         x)
                     interface_scores = []
                     alternative_output = []
-                    for neighbor_input in neighbor_values:
-                        neighbor_raw_input[i] = neighbor_input
-                        processed_neighbor_input = [input_component.preprocess(neighbor_raw_input[i])
-                                                    for i, input_component in enumerate(interface.input_components)]
-                        neighbor_output = interface.run_prediction(
-                            processed_neighbor_input)
+                    for neighbor_output in run_neighbors(
+                            interface, raw_input, processed_input, i, neighbor_values):
                         processed_neighbor_output = [output_component.postprocess(
                             neighbor_output[i]) for i, output_component in enumerate(interface.output_components)]
 
@@ -48,12 +43,8 @@ def run_interpret(interface, raw_input):
                         x)
                     interface_scores = []
                     alternative_output = []
-                    for neighbor_input in neighbor_values:
-                        neighbor_raw_input[i] = neighbor_input
-                        processed_neighbor_input = [input_component.preprocess(neighbor_raw_input[i])
-                                                    for i, input_component in enumerate(interface.input_components)]
-                        neighbor_output = interface.run_prediction(
-                            processed_neighbor_input)
+                    for neighbor_output in run_neighbors(
+                            interface, raw_input, processed_input, i, neighbor_values):
                         processed_neighbor_output = [output_component.postprocess(
                             neighbor_output[i]) for i, output_component in enumerate(interface.output_components)]
 
@@ -84,13 +75,8 @@ def run_interpret(interface, raw_input):
                     masked_xs = input_component.get_masked_inputs(
                         tokens, binary_mask)
                     preds = []
-                    for masked_x in masked_xs:
-                        processed_masked_input = copy.deepcopy(
-                            processed_input)
-                        processed_masked_input[i] = input_component.preprocess(
-                            masked_x)
-                        new_output = interface.run_prediction(
-                            processed_masked_input)
+                    for new_output in run_neighbors(
+                            interface, raw_input, processed_input, i, masked_xs):
                         pred = get_regression_or_classification_value(
                             interface, original_output, new_output)
                         preds.append(pred)
@@ -126,6 +112,40 @@ def run_interpret(interface, raw_input):
         return interpretation, []
 
 
+def run_neighbors(interface, raw_input, processed_input, i, neighbor_values):
+    """
+    Runs the prediction on each neighbor of the i-th input, i.e. on copies of 
+    the processed input in which only the i-th input is replaced (and 
+    preprocessed). If the interface is batched, the neighbors are submitted 
+    together in chunks of `max_batch_size`, otherwise they are run one by one.
+    Yields the predictions (not post-processed) of each neighbor in order.
+    """
+    input_component = interface.input_components[i]
+    uncopyable = set()
+
+    def copy_input(j):
+        # The other inputs are copied in case the function modifies them. 
+        # Inputs that can't be copied (e.g. file objects) are preprocessed 
+        # again instead.
+        if j not in uncopyable:
+            try:
+                return copy.deepcopy(processed_input[j])
+            except (TypeError, copy.Error):
+                uncopyable.add(j)
+        return interface.input_components[j].preprocess(raw_input[j])
+
+    chunk_size = interface.batchers[0].max_batch_size if interface.batch else 1
+    for start in range(0, len(neighbor_values), chunk_size):
+        processed_neighbor_inputs = []
+        for neighbor_input in neighbor_values[start:start + chunk_size]:
+            processed_neighbor_input = [
+                input_component.preprocess(neighbor_input) if j == i 
+                else copy_input(j)
+                for j in range(len(processed_input))]
+            processed_neighbor_inputs.append(processed_neighbor_input)
+        yield from interface.run_predictions(processed_neighbor_inputs)
+
+
 def diff(original, perturbed):
     try:  # try computing numerical difference
         score = float(original) - float(perturbed)
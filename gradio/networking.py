@@ -3,22 +3,25 @@ Defines helper methods useful for setting up ports, launching servers, and
 creating tunnels.
 """
 from __future__ import annotations
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 import fastapi
 import http
 import json
+import multiprocessing
 import os
 import requests
 import socket
 import threading
 import time
+import traceback
 from typing import Optional, Tuple, TYPE_CHECKING
 import urllib.parse
 import urllib.request
 import uvicorn
 
-from gradio import queueing
+from gradio import file_store, queueing, temp_files
 from gradio.tunneling import create_tunnel
-from gradio.app import app
+from gradio.app import app, run_interpret, run_predict
 
 if TYPE_CHECKING:  # Only import for type checking (to avoid circular imports).
     from gradio import Interface
@@ -30,9 +33,14 @@ INITIAL_PORT_VALUE = int(os.getenv('GRADIO_SERVER_PORT', "7860"))
 TRY_NUM_PORTS = int(os.getenv('GRADIO_NUM_PORTS', "100"))  
 LOCALHOST_NAME = os.getenv('GRADIO_SERVER_NAME', "127.0.0.1")
 GRADIO_API_SERVER = "https://api.gradio.app/v1/tunnel-request"
+# How long the queue worker waits for a job before checking the queue again.
+QUEUE_POLL_TIMEOUT = 1
 
 
 class Server(uvicorn.Server):
+    queue_threads = ()
+    executor = None
+
     def install_signal_handlers(self):
         pass
 
@@ -42,9 +50,27 @@ class Server(uvicorn.Server):
         while not self.started:
             time.sleep(1e-3)
 
+    def run_queue_in_thread(self, concurrency=1):
+        self.queue_worker_stats = []
+        self.queue_threads = []
+        for _ in range(concurrency):
+            worker_stats = {"started": time.time(), "busy_since": None, 
+                            "busy_time": 0, "jobs_processed": 0}
+            thread = threading.Thread(
+                target=queue_thread, args=(self, worker_stats), daemon=True)
+            thread.start()
+            self.queue_worker_stats.append(worker_stats)
+            self.queue_threads.append(thread)
+
     def close(self):
         self.should_exit = True
         self.thread.join()
+        for thread in self.queue_threads:
+            thread.join()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        file_store.stop()
+        temp_files.registry.stop_eviction()
 
 
 def get_first_available_port(
@@ -73,22 +99,63 @@ def get_first_available_port(
     )
 
 
-def queue_thread(path_to_local_server, test_mode=False):
-    while True:
+def create_executor(interface: Interface) -> Executor:
+    """
+    Creates the pool that runs predictions and interpretations outside of the 
+    queue, as configured by the `max_threads` and `executor` parameters of 
+    launch(). Worker processes are forked so that they inherit the launched 
+    interface.
+    """
+    if interface.executor == "process":
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise ValueError("The process executor is not supported on this "
+                             "platform. Please use executor='thread'.")
+        return ProcessPoolExecutor(
+            interface.max_threads, 
+            mp_context=multiprocessing.get_context("fork"))
+    return ThreadPoolExecutor(
+        interface.max_threads, thread_name_prefix="gradio-predict")
+
+
+def queue_thread(server=None, worker_stats=None, test_mode=False):
+    """
+    Processes queued jobs by running them directly on the launched interface.
+    Waits for new jobs to be pushed when the queue is empty, and stops once 
+    the server is closed. Several of these may consume the queue at once.
+    Parameters:
+    server (Server): the server whose queue is being processed.
+    worker_stats (Dict[str, Any]): if provided, updated with the number of jobs processed and the time spent processing them.
+    """
+    if worker_stats is None:
+        worker_stats = {"started": time.time(), "busy_since": None, 
+                        "busy_time": 0, "jobs_processed": 0}
+    while server is None or not server.should_exit:
         try:
-            next_job = queueing.pop()
+            next_job = queueing.pop(block=True, timeout=QUEUE_POLL_TIMEOUT)
             if next_job is not None:
                 _, hash, input_data, task_type = next_job
                 queueing.start_job(hash)
-                response = requests.post(
-                    path_to_local_server + "/api/" + task_type + "/", 
-                    json=input_data)
-                if response.status_code == 200:
-                    queueing.pass_job(hash, response.json())
+                worker_stats["busy_since"] = time.time()
+                error_message = None
+                try:
+                    if task_type == "predict":
+                        output = run_predict(input_data)
+                    elif task_type == "interpret":
+                        output = run_interpret(input_data)
+                    else:
+                        raise ValueError(
+                            "Unknown queue action: {}".format(task_type))
+                except Exception as error:
+                    traceback.print_exc()
+                    error_message = str(error)
+                worker_stats["busy_time"] += (
+                    time.time() - worker_stats["busy_since"])
+                worker_stats["jobs_processed"] += 1
+                worker_stats["busy_since"] = None
+                if error_message is None:
+                    queueing.pass_job(hash, output)
                 else:
-                    queueing.fail_job(hash, response.text)
-            else:
-                time.sleep(1)
+                    queueing.fail_job(hash, error_message)
         except Exception as e:
             time.sleep(1)
             pass
@@ -137,20 +204,32 @@ def start_server(
     app.cwd = os.getcwd()
     app.favicon_path = interface.favicon_path
     app.tokens = {}
+    app.queue_worker_stats = []
+    app.max_backlog = interface.max_backlog
+    app.backlog = 0
     
     if app.interface.enable_queue:
         if auth is not None or app.interface.encrypt:
             raise ValueError("Cannot queue with encryption or authentication enabled.")
-        queueing.init()
-        app.queue_thread = threading.Thread(
-            target=queue_thread, args=(path_to_local_server,))
-        app.queue_thread.start()
     if interface.save_to is not None:  # Used for selenium tests
         interface.save_to["port"] = port
                 
     config = uvicorn.Config(app=app, port=port, host=server_name, 
                             log_level="warning")
     server = Server(config=config)
+    app.executor = server.executor = create_executor(interface)
+    if interface.serve_files:
+        file_store.start(interface.file_ttl)
+    else:
+        file_store.stop()
+    if (interface.temp_file_max_bytes is not None 
+            or interface.temp_file_max_age is not None):
+        temp_files.registry.start_eviction(
+            interface.temp_file_max_bytes, interface.temp_file_max_age)
+    if app.interface.enable_queue:
+        queueing.init(interface.queue_backend, interface.queue_concurrency)
+        server.run_queue_in_thread(interface.queue_concurrency)
+        app.queue_worker_stats = server.queue_worker_stats
     server.run_in_thread()
     return port, path_to_local_server, app, server 
 
@@ -13,12 +13,11 @@ import operator
 import os
 import pandas as pd
 import PIL
-import tempfile
 from types import ModuleType
 from typing import Callable, Any, List, Optional, Tuple, Dict, TYPE_CHECKING
 import warnings
 
-from gradio import processing_utils
+from gradio import processing_utils, temp_files
 from gradio.component import Component
 
 if TYPE_CHECKING:  # Only import for type checking (is False at runtime).
@@ -188,6 +187,7 @@ class Image(OutputComponent):
     Output type: Union[numpy.array, PIL.Image, str, matplotlib.pyplot, Tuple[Union[numpy.array, PIL.Image, str], List[Tuple[str, float, float, float, float]]]]
     Demos: image_mod, webcam
     '''
+    thumbnail_kind = "image"
 
     def __init__(
         self, 
@@ -221,7 +221,7 @@ class Image(OutputComponent):
         Parameters:
         y (Union[numpy.array, PIL.Image, str, matplotlib.pyplot, Tuple[Union[numpy.array, PIL.Image, str], List[Tuple[str, float, float, float, float]]]]): image in specified format 
         Returns:
-        (str): base64 url data
+        (str): base64 url data, or URL of the image file if the interface serves output files
         """
         if self.type == "auto":
             if isinstance(y, np.ndarray):
@@ -240,9 +240,9 @@ class Image(OutputComponent):
         if dtype in ["numpy", "pil"]:
             if dtype == "pil":
                 y = np.array(y)
-            out_y = processing_utils.encode_array_to_base64(y)
+            out_y = processing_utils.encode_array_to_url_or_base64(y)
         elif dtype == "file":
-            out_y = processing_utils.encode_url_or_file_to_base64(y)
+            out_y = processing_utils.encode_file_to_url_or_base64(y)
         elif dtype == "plot":
             out_y = processing_utils.encode_plot_to_base64(y)
         else:
@@ -267,6 +267,7 @@ class Video(OutputComponent):
     Output type: filepath
     Demos: video_flip
     '''
+    thumbnail_kind = "video"
 
     def __init__(
         self, 
@@ -292,7 +293,7 @@ class Video(OutputComponent):
         Parameters:
         y (str): path to video 
         Returns:
-        (str): base64 url data
+        (Dict[name: str, data: str]): JSON object with key 'name' for filename and 'data' for base64 url data, or the URL of the video file if the interface serves output files
         """
         returned_format = y.split(".")[-1].lower()
         if self.type is not None and returned_format != self.type:
@@ -306,7 +307,7 @@ class Video(OutputComponent):
             y = output_file_name
         return {
             "name": os.path.basename(y),
-            "data": processing_utils.encode_file_to_base64(y)
+            "data": processing_utils.encode_file_to_url_or_base64(y)
         }
 
     def deserialize(self, x):
@@ -451,16 +452,17 @@ class Audio(OutputComponent):
         Parameters:
         y (Union[Tuple[int, numpy.array], str]): audio data in requested format
         Returns:
-        (str): base64 url data
+        (str): base64 url data, or URL of the audio file if the interface serves output files
         """
         if self.type in ["numpy", "file", "auto"]:
             if self.type == "numpy" or (self.type == "auto" and isinstance(y, tuple)):
                 sample_rate, data = y
-                file = tempfile.NamedTemporaryFile(
-                    prefix="sample", suffix=".wav", delete=False)
+                file = temp_files.create_file(
+                    prefix="sample", suffix=".wav")
                 processing_utils.audio_to_file(sample_rate, data, file.name)
-                y = file.name
-            return processing_utils.encode_url_or_file_to_base64(y)
+                return processing_utils.encode_file_to_url_or_base64(
+                    file.name, owned=True)
+            return processing_utils.encode_file_to_url_or_base64(y)
         else:
             raise ValueError("Unknown type: " + self.type +
                              ". Please choose from: 'numpy', 'file'.")
@@ -575,12 +577,12 @@ class File(OutputComponent):
         Parameters:
         y (str): file path
         Returns:
-        (Dict[name: str, size: number, data: str]): JSON object with key 'name' for filename, 'data' for base64 url, and 'size' for filesize in bytes 
+        (Dict[name: str, size: number, data: str]): JSON object with key 'name' for filename, 'data' for base64 url (or URL of the file if the interface serves output files), and 'size' for filesize in bytes 
         """
         return {
             "name": os.path.basename(y),
             "size": os.path.getsize(y),
-            "data": processing_utils.encode_file_to_base64(y)
+            "data": processing_utils.encode_file_to_url_or_base64(y)
         }
 
     def save_flagged(self, dir, label, data, encryption_key):
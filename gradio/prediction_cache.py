@@ -0,0 +1,172 @@
+"""
+Implements a cache of prediction results, so that interfaces which receive
+the same inputs over and over don't have to process them again.
+"""
+from __future__ import annotations
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+from typing import Any, Optional, Tuple
+
+from gradio.process_examples import get_function_fingerprint
+
+
+class PredictionCache():
+    """
+    Stores the processed outputs of an interface, keyed by a hash of the raw
+    inputs. At most `max_size` entries are kept in memory, evicting the least
+    recently used one first. If `ttl` is provided, entries expire after that
+    many seconds. If `cache_dir` is provided, entries are also written to that
+    directory, so that they outlive eviction from memory and server restarts.
+    """
+    def __init__(
+        self,
+        max_size: int = 128,
+        ttl: Optional[float] = None,
+        cache_dir: Optional[str] = None
+    ):
+        if max_size < 1:
+            raise ValueError("`max_size` must be at least 1.")
+        self.max_size = max_size
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+        self.lock = threading.Lock()
+        # key -> (time stored, output), least recently used first
+        self.entries: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_key(raw_input: Any, version: str = "") -> str:
+        """
+        Hashes the raw (JSON-serializable) input of an interface. Raw bytes,
+        such as uploaded files, are hashed as well. The version identifies 
+        what the outputs were computed with (see get_interface_version).
+        """
+        def hash_bytes(obj):
+            if isinstance(obj, bytes):
+                return hashlib.sha256(obj).hexdigest()
+            raise TypeError("Cannot hash input of type {}".format(type(obj)))
+        serialized = json.dumps([version, raw_input], sort_keys=True, 
+                                default=hash_bytes)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, persist: bool = True) -> Optional[Any]:
+        """
+        Returns the output stored for the key, or None if there is none. If 
+        `persist` is False, only the entries in memory are looked up.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+        if entry is None and self.cache_dir is not None and persist:
+            entry = self.read_entry(key)
+            if entry is not None:
+                self.store_in_memory(key, entry)
+        if entry is not None and self.is_expired(entry):
+            self.remove(key)
+            entry = None
+        with self.lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, output: Any, persist: bool = True):
+        """
+        Stores the output for the key. If `persist` is False, it is only 
+        kept in memory, even if the cache has a `cache_dir`.
+        """
+        entry = (time.time(), output)
+        self.store_in_memory(key, entry)
+        if self.cache_dir is not None and persist:
+            self.write_entry(key, entry)
+
+    def remove(self, key: str):
+        with self.lock:
+            self.entries.pop(key, None)
+        if self.cache_dir is not None:
+            try:
+                os.remove(self.get_entry_path(key))
+            except OSError:
+                pass
+
+    def clear(self):
+        with self.lock:
+            keys = list(self.entries)
+            self.entries.clear()
+        if self.cache_dir is not None:
+            keys = [file_name[:-len(".pkl")]
+                    for file_name in os.listdir(self.cache_dir)
+                    if file_name.endswith(".pkl")]
+        for key in keys:
+            self.remove(key)
+
+    def is_expired(self, entry: Tuple[float, Any]) -> bool:
+        return self.ttl is not None and time.time() - entry[0] > self.ttl
+
+    def store_in_memory(self, key: str, entry: Tuple[float, Any]):
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def get_entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".pkl")
+
+    def read_entry(self, key: str) -> Optional[Tuple[float, Any]]:
+        try:
+            with open(self.get_entry_path(key), "rb") as entry_file:
+                return pickle.load(entry_file)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def write_entry(self, key: str, entry: Tuple[float, Any]):
+        # Written to a temporary file first so that readers never see a
+        # partially written entry.
+        with tempfile.NamedTemporaryFile(
+                dir=self.cache_dir, suffix=".tmp", delete=False) as entry_file:
+            pickle.dump(entry, entry_file)
+        os.replace(entry_file.name, self.get_entry_path(key))
+
+
+def get_prediction_cache(
+    cache: Optional[bool | int | PredictionCache]
+) -> Optional[PredictionCache]:
+    if cache is None or cache is False:
+        return None
+    elif cache is True:
+        return PredictionCache()
+    elif isinstance(cache, PredictionCache):
+        return cache
+    elif isinstance(cache, int):
+        return PredictionCache(max_size=cache)
+    else:
+        raise ValueError("Invalid value for parameter: cache")
+
+
+def get_interface_version(interface) -> Optional[str]:
+    """
+    Hashes the prediction functions and the component configurations of an 
+    interface, so that outputs stored on disk are not served after either of 
+    them changes. Returns None if a prediction function can't be hashed (see 
+    process_examples.get_function_fingerprint).
+    """
+    fingerprints = [get_function_fingerprint(fn) for fn in interface.predict]
+    if None in fingerprints:
+        return None
+    components = [component.get_template_context() for component in 
+                  interface.input_components + interface.output_components]
+    serialized = json.dumps([fingerprints, components], sort_keys=True, 
+                            default=str)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
@@ -1,10 +1,20 @@
-import os, shutil
-from gradio.flagging import CSVLogger
-from typing import Any, List
+from concurrent.futures import as_completed, ThreadPoolExecutor
 import csv
+import functools
+import hashlib
+import json
+import os
+import threading
+from types import (BuiltinFunctionType, CodeType, FunctionType, 
+                   MethodDescriptorType, ModuleType, WrapperDescriptorType)
+from typing import Any, Callable, Dict, List, Optional
+
+from gradio.flagging import get_flagged_headers, get_flagged_row
 
 CACHED_FOLDER = "gradio_cached_examples"
 CACHE_FILE = os.path.join(CACHED_FOLDER, "log.csv")
+# The fingerprint of each row of CACHE_FILE, see get_example_fingerprint()
+FINGERPRINTS_FILE = os.path.join(CACHED_FOLDER, "fingerprints.json")
 
 def process_example(interface, example_id: int):
     example_set = interface.examples[example_id]
@@ -12,27 +22,237 @@ def process_example(interface, example_id: int):
     prediction, durations = interface.process(raw_input)
     return prediction, durations
 
-def cache_interface_examples(interface) -> None:
-    if os.path.exists(CACHE_FILE):
-        print(f"Using cache from '{os.path.abspath(CACHED_FOLDER)}/' directory. If method or examples have changed since last caching, delete this folder to clear cache.")
+class UnhashableError(Exception):
+    pass
+
+def get_function_fingerprint(fn: Callable) -> Optional[str]:
+    """
+    Hashes a prediction function, so that cached outputs are recomputed when 
+    it changes: its code, default arguments, closure variables and the globals 
+    it refers to, following any functions among them. functools.partial 
+    objects are hashed with their arguments. If the function depends on 
+    anything else (e.g. a model object), it can't be hashed and None is 
+    returned. A callable with a `__version__` attribute is identified by its 
+    name and version instead, which can be used to opt into caching.
+    """
+    seen = set()
+
+    def describe(value) -> str:
+        if value is None or isinstance(value, (bool, int, float, complex, str, bytes)):
+            return repr(value)
+        # The order of set elements depends on PYTHONHASHSEED, so they are 
+        # sorted to give the same description in every process.
+        if isinstance(value, (set, frozenset)):
+            return "{}({{{}}})".format(type(value).__name__, ", ".join(
+                sorted(describe(element) for element in value)))
+        if isinstance(value, (tuple, list)):
+            return "{}({})".format(type(value).__name__, ", ".join(
+                describe(element) for element in value))
+        if isinstance(value, dict):
+            return "dict({})".format(", ".join(sorted(
+                "{}: {}".format(describe(key), describe(item)) 
+                for key, item in value.items())))
+        if isinstance(value, ModuleType):
+            return "module {}".format(value.__name__)
+        if isinstance(value, CodeType):
+            return describe_code(value)
+        if hasattr(value, "__version__"):
+            return "{}.{}:{}".format(
+                getattr(value, "__module__", ""), 
+                getattr(value, "__qualname__", type(value).__qualname__),
+                value.__version__)
+        if isinstance(value, type) or isinstance(value, BuiltinFunctionType) \
+                and isinstance(value.__self__, (ModuleType, type(None))):
+            return "{} {}.{}".format(
+                type(value).__name__, value.__module__, value.__qualname__)
+        if isinstance(value, (MethodDescriptorType, WrapperDescriptorType)):
+            return "{} {}.{}".format(type(value).__name__, 
+                value.__objclass__.__module__, value.__qualname__)
+        if isinstance(value, functools.partial):
+            return "partial({}, {}, {})".format(describe(value.func), 
+                describe(value.args), describe(value.keywords))
+        if isinstance(value, FunctionType):
+            return describe_function(value)
+        raise UnhashableError(repr(value))
+
+    def describe_code(code: CodeType) -> str:
+        return "code({}, {})".format(code.co_code.hex(), ", ".join(
+            describe(const) for const in code.co_consts))
+
+    def get_names(code: CodeType):
+        yield from code.co_names
+        for const in code.co_consts:
+            if isinstance(const, CodeType):  # e.g. nested functions
+                yield from get_names(const)
+
+    def describe_function(fn: FunctionType) -> str:
+        if fn in seen:  # Recursive functions
+            return "function {}".format(fn.__qualname__)
+        seen.add(fn)
+        closure = [cell.cell_contents for cell in fn.__closure__ or []]
+        referenced_globals = {name: fn.__globals__[name] 
+                              for name in set(get_names(fn.__code__))
+                              if name in fn.__globals__}
+        return "function({}, {}, {}, {}, {})".format(
+            describe_code(fn.__code__), describe(fn.__defaults__), 
+            describe(fn.__kwdefaults__), describe(closure), 
+            describe(referenced_globals))
+
+    try:
+        description = describe(fn)
+    except UnhashableError:
+        return None
+    return hashlib.sha256(description.encode()).hexdigest()
+
+def get_example_fingerprint(example: List[Any], function_fingerprint: str) -> str:
+    """
+    Hashes the inputs of an example together with the fingerprint of the 
+    prediction functions. Example files are identified by their path, size 
+    and modification time.
+    """
+    def describe(value):
+        if isinstance(value, str) and os.path.isfile(value):
+            stat = os.stat(value)
+            return [value, stat.st_size, stat.st_mtime_ns]
+        return value
+    serialized = json.dumps([describe(value) for value in example], 
+                            sort_keys=True, default=str)
+    return hashlib.sha256(
+        (serialized + function_fingerprint).encode("utf-8")).hexdigest()
+
+def load_cached_rows() -> Dict[str, List[str]]:
+    """
+    Returns the rows of the existing cache, keyed by their fingerprint.
+    """
+    if not os.path.exists(CACHE_FILE) or not os.path.exists(FINGERPRINTS_FILE):
+        return {}
+    with open(CACHE_FILE) as cache:
+        rows = list(csv.reader(cache))[1:]  # remove header
+    with open(FINGERPRINTS_FILE) as fingerprints_file:
+        fingerprints = json.load(fingerprints_file)
+    return {fingerprint: row for fingerprint, row in zip(fingerprints, rows)
+            if fingerprint is not None}
+
+def cache_interface_examples(interface, max_workers: int = 1) -> None:
+    """
+    Processes the examples of an interface and saves their outputs in 
+    CACHED_FOLDER. Examples whose inputs and prediction functions haven't 
+    changed since they were last cached are not processed again. The other 
+    examples are processed by `max_workers` threads. If some examples fail, 
+    the others are still cached, and the first error is raised.
+    """
+    os.makedirs(CACHED_FOLDER, exist_ok=True)
+    function_fingerprints = [get_function_fingerprint(fn) 
+                             for fn in interface.predict]
+    if None in function_fingerprints:
+        print("The prediction function depends on objects that can't be "
+              "hashed, so all examples are processed again. Set a "
+              "`__version__` attribute on it to reuse cached outputs.")
+        fingerprints = [None] * len(interface.examples)
     else:
-        print(f"Cache at {os.path.abspath(CACHE_FILE)} not found. Caching now in '{CACHED_FOLDER}/' directory.")
-        cache_logger = CSVLogger()
-        cache_logger.setup(CACHED_FOLDER)
-        for example_id, _ in enumerate(interface.examples):
+        function_fingerprint = "".join(function_fingerprints)
+        fingerprints = [get_example_fingerprint(example, function_fingerprint)
+                        for example in interface.examples]
+    old_rows = load_cached_rows()
+    rows = [old_rows.get(fingerprint) for fingerprint in fingerprints]
+    missing = [example_id for example_id, row in enumerate(rows) if row is None]
+    if not missing:
+        print(f"Using cache from '{os.path.abspath(CACHED_FOLDER)}/' directory.")
+        return
+    print(f"Caching {len(missing)} of {len(rows)} examples in '{os.path.abspath(CACHED_FOLDER)}/' directory.")
+    encryption_key = interface.encryption_key if interface.encrypt else None
+
+    def cache_example(example_id):
+        prediction = process_example(interface, example_id)[0]
+        return get_flagged_row(interface, CACHED_FOLDER, None, prediction, 
+                               encryption_key=encryption_key)
+
+    errors = []
+    with ThreadPoolExecutor(max_workers) as executor:
+        futures = {executor.submit(cache_example, example_id): example_id
+                   for example_id in missing}
+        for num_done, future in enumerate(as_completed(futures), start=1):
+            example_id = futures[future]
             try:
-                prediction = process_example(interface, example_id)[0]
-                cache_logger.flag(interface, None, prediction)
+                rows[example_id] = future.result()
             except Exception as e:
-                shutil.rmtree(CACHED_FOLDER)
-                raise e
+                errors.append(e)
+                rows[example_id] = [""] * len(interface.output_components)
+                fingerprints[example_id] = None  # Retried on the next launch
+            print(f"Caching examples: {num_done}/{len(missing)}", end="\r")
+    print()
+    write_cache(interface, rows, fingerprints)
+    delete_unused_files(interface, old_rows.values(), rows)
+    if errors:
+        raise errors[0]
+
+def write_cache(interface, rows: List[List[str]], fingerprints: List[Optional[str]]):
+    # Written to temporary files first, so that an interrupted write doesn't 
+    # leave a cache whose rows and fingerprints don't match.
+    with open(CACHE_FILE + ".tmp", "w", newline="") as cache:
+        writer = csv.writer(cache)
+        writer.writerow(get_flagged_headers(interface, output_only_mode=True))
+        writer.writerows(rows)
+    with open(FINGERPRINTS_FILE + ".tmp", "w") as fingerprints_file:
+        json.dump(fingerprints, fingerprints_file)
+    os.replace(FINGERPRINTS_FILE + ".tmp", FINGERPRINTS_FILE)
+    os.replace(CACHE_FILE + ".tmp", CACHE_FILE)
+
+def delete_unused_files(interface, old_rows, rows: List[List[str]]):
+    """
+    Deletes the files saved for cached outputs that are no longer cached.
+    """
+    used_cells = {cell for row in rows for cell in row}
+    labels = ["".join(char for char in component["label"] 
+                      if char.isalnum() or char in "._- ")
+              for component in interface.config["output_components"]]
+    for row in old_rows:
+        for label, cell in zip(labels, row):
+            if cell in used_cells or not cell.startswith(label + "/"):
+                continue
+            path = os.path.join(CACHED_FOLDER, cell)
+            if os.path.isfile(path):
+                os.remove(path)
+
+class ExampleCache():
+    """
+    Indexes the cached outputs of an interface's examples, so that loading a 
+    cached example doesn't re-read CACHE_FILE. The rows are read once, and the 
+    restored outputs of each example are kept after it is first loaded.
+    """
+    def __init__(self, interface, cache_file: str = CACHE_FILE):
+        self.interface = interface
+        self.cache_file = cache_file
+        self.lock = threading.Lock()
+        self.rows: Optional[List[List[str]]] = None
+        self.outputs: Dict[int, List[Any]] = {}
+        # Set once the examples have been cached, which may happen in the 
+        # background while the interface is already running.
+        self.ready = False
+
+    def get(self, example_id: int) -> List[Any]:
+        with self.lock:
+            if example_id in self.outputs:
+                return list(self.outputs[example_id])
+            if self.rows is None:
+                with open(self.cache_file) as cache:
+                    self.rows = list(csv.reader(cache))[1:]  # remove header
+            example = self.rows[example_id]
+        cache_dir = os.path.dirname(self.cache_file)
+        encryption_key = self.interface.encryption_key \
+            if self.interface.encrypt else None
+        output = [component.restore_flagged(cache_dir, cell, encryption_key)
+                  for component, cell in zip(
+                      self.interface.output_components, example)]
+        with self.lock:
+            self.outputs[example_id] = output
+        return list(output)
+
+    def clear(self):
+        with self.lock:
+            self.rows = None
+            self.outputs.clear()
+
 
 def load_from_cache(interface, example_id: int) -> List[Any]:
-    with open(CACHE_FILE) as cache:
-        examples = list(csv.reader(cache))
-    example = examples[example_id + 1] # +1 to adjust for header
-    output = []
-    for component, cell in zip(interface.output_components, example):
-        output.append(component.restore_flagged(
-            CACHED_FOLDER, cell, interface.encryption_key if interface.encrypt else None))
-    return output
+    return interface.example_cache.get(example_id)
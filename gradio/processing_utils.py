@@ -2,11 +2,10 @@ from PIL import Image, ImageOps
 from io import BytesIO
 import base64
 import requests
-import tempfile
 import shutil
 import os
 import numpy as np
-from gradio import encryptor
+from gradio import encryptor, file_store, temp_files
 import warnings
 import mimetypes
 with warnings.catch_warnings():
@@ -17,6 +16,8 @@ with warnings.catch_warnings():
 # IMAGE PRE-PROCESSING
 #########################
 def decode_base64_to_image(encoding):
+    if isinstance(encoding, bytes):  # raw bytes from a multipart upload
+        return Image.open(BytesIO(encoding))
     content = encoding.split(';')[1]
     image_encoded = content.split(',')[1]
     return Image.open(BytesIO(base64.b64decode(image_encoded)))
@@ -53,13 +54,28 @@ def get_extension(encoding):
 
 def encode_file_to_base64(f, encryption_key=None):
     with open(f, "rb") as file:
-        encoded_string = base64.b64encode(file.read())
         if encryption_key:
-            encoded_string = encryptor.decrypt(encryption_key, encoded_string)
-        base64_str = str(encoded_string, 'utf-8')
+            base64_str = encode_chunks_to_base64(
+                encryptor.decrypt_stream(encryption_key, file))
+        else:
+            base64_str = str(base64.b64encode(file.read()), 'utf-8')
         mimetype = get_mimetype(f)
         return "data:" + (mimetype if mimetype is not None else "") + ";base64," + base64_str
 
+def encode_chunks_to_base64(chunks):
+    """
+    Base64-encodes binary data that is produced in chunks (e.g. by 
+    encryptor.decrypt_stream()), without first joining the chunks together.
+    """
+    encoded, remainder = [], b""
+    for chunk in chunks:
+        data = remainder + chunk
+        split = len(data) - len(data) % 3  # Each 3 bytes encode to 4 chars
+        encoded.append(str(base64.b64encode(data[:split]), 'utf-8'))
+        remainder = data[split:]
+    encoded.append(str(base64.b64encode(remainder), 'utf-8'))
+    return "".join(encoded)
+
 
 def encode_url_to_base64(url):
     encoded_string = base64.b64encode(requests.get(url).content)
@@ -84,6 +100,27 @@ def encode_array_to_base64(image_array):
     return "data:image/png;base64," + base64_str
 
 
+def encode_file_to_url_or_base64(path, owned=False):
+    """
+    Returns the URL that the file is served from if the launched interface 
+    serves output files by URL, or the file's base64 data otherwise. If owned,
+    the file is deleted once its URL expires.
+    """
+    if os.path.isfile(path):
+        if file_store.store is not None:
+            return file_store.store.add(path, owned)
+        return encode_file_to_base64(path)
+    return encode_url_or_file_to_base64(path)
+
+def encode_array_to_url_or_base64(image_array):
+    if file_store.store is None:
+        return encode_array_to_base64(image_array)
+    with temp_files.create_file(suffix=".png") as file:
+        PIL_image = Image.fromarray(_convert(image_array, np.uint8, force_copy=False))
+        PIL_image.save(file, 'PNG')
+    return file_store.store.add(file.name, owned=True)
+
+
 def resize_and_crop(img, size, crop_type='center'):
     """
     Resize and crop an image to fit the specified size.
@@ -133,6 +170,8 @@ def audio_to_file(sample_rate, data, filename):
 
 
 def decode_base64_to_binary(encoding):
+    if isinstance(encoding, bytes):  # raw bytes from a multipart upload
+        return encoding, None
     extension = get_extension(encoding)
     data = encoding.split(",")[1]
     return base64.b64decode(data), extension 
@@ -147,26 +186,32 @@ def decode_base64_to_file(encoding, encryption_key=None, file_path=None):
             prefix = filename[0: filename.index(".")]
             extension = filename[filename.index(".") + 1:]
     if extension is None:
-        file_obj = tempfile.NamedTemporaryFile(delete=False, prefix=prefix)
+        file_obj = temp_files.create_file(prefix=prefix)
     else:
-        file_obj = tempfile.NamedTemporaryFile(delete=False, prefix=prefix, suffix="."+extension)
+        file_obj = temp_files.create_file(prefix=prefix, suffix="."+extension)
     if encryption_key is not None:
-        data = encryptor.encrypt(encryption_key, data)
-    file_obj.write(data)
+        encryptor.encrypt_file(encryption_key, BytesIO(data), file_obj)
+    else:
+        file_obj.write(data)
     file_obj.flush()
     return file_obj
 
-def create_tmp_copy_of_file(file_path):
+def create_tmp_copy_of_file(file_path, encryption_key=None):
     file_name = os.path.basename(file_path)
     prefix, extension = file_name, None
     if "." in file_name:
         prefix = file_name[0: file_name.index(".")]
         extension = file_name[file_name.index(".") + 1:]
     if extension is None:
-        file_obj = tempfile.NamedTemporaryFile(delete=False, prefix=prefix)
+        file_obj = temp_files.create_file(prefix=prefix)
+    else:
+        file_obj = temp_files.create_file(prefix=prefix, suffix="."+extension)
+    if encryption_key is not None:
+        with open(file_path, "rb") as file:
+            encryptor.encrypt_file(encryption_key, file, file_obj)
+        file_obj.flush()
     else:
-        file_obj = tempfile.NamedTemporaryFile(delete=False, prefix=prefix, suffix="."+extension)
-    shutil.copy2(file_path, file_obj.name)
+        shutil.copy2(file_path, file_obj.name)
     return file_obj
 
 def _convert(image, dtype, force_copy=False, uniform=False):
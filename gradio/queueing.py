@@ -1,173 +1,517 @@
-import sqlite3
+"""
+Implements the job queue that is used when an Interface is launched with
+`enable_queue=True`. The queue is stored in a pluggable backend: an in-memory
+store by default, or a SQLite database if the jobs should be kept on disk.
+"""
+
+from __future__ import annotations
+from abc import ABC, abstractmethod
+import collections
+import itertools
+import json
 import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
 import uuid
-import json
 
 DB_FILE = "gradio_queue.db"
+# How long, in seconds, the result of a finished job is kept if no client
+# ever asks for it.
+FINISHED_JOB_TTL = 3600
 
-def generate_hash():
-    generate = True
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    while generate:
-        hash = uuid.uuid4().hex
-        c.execute("""
-            SELECT hash FROM queue
-            WHERE hash = ?;
-        """, (hash,))
-        generate = c.fetchone() is not None
-    conn.commit()
-    return hash
-
-def init():
-    if os.path.exists(DB_FILE):
-        os.remove(DB_FILE)
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute("""CREATE TABLE queue (
-            queue_index integer PRIMARY KEY,
-            hash text,
-            input_data text,
-            action text,
-            popped integer DEFAULT 0
-        );""")
-    c.execute("""
-        CREATE TABLE jobs (
-            hash text PRIMARY KEY,
-            status text,
-            output_data text,
-            error_message text
-        );
-    """)
-    conn.commit()
 
-def close():
-    if os.path.exists(DB_FILE):
-        os.remove(DB_FILE)
-
-def pop():
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute("BEGIN EXCLUSIVE")
-    c.execute("""
-        SELECT queue_index, hash, input_data, action FROM queue
-        WHERE popped = 0 ORDER BY queue_index ASC LIMIT 1;
-    """)
-    result = c.fetchone()
-    if result is None:
-        conn.commit()
+class QueueBackend(ABC):
+    """
+    An abstract class for defining the methods that any queue backend should have.
+    All methods may be called concurrently from the server and the queue worker.
+    """
+
+    @abstractmethod
+    def init(self, concurrency: int = 1) -> None:
+        """
+        Sets up an empty queue. Called once when the server is started.
+        Parameters:
+        concurrency (int): the number of workers that consume the queue, used to compute queue positions.
+        """
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        """
+        Releases any resources held by the queue.
+        """
+        pass
+
+    @abstractmethod
+    def push(self, input_data: Any, action: str) -> Tuple[str, int]:
+        """
+        Adds a job to the end of the queue.
+        Parameters:
+        input_data: the JSON-serializable payload of the job.
+        action: the API route that should process the job, e.g. "predict".
+        Returns:
+        hash (str): the unique identifier of the job.
+        queue_position (int): the number of jobs ahead of this one, or -1 if a worker is free to start it right away.
+        """
+        pass
+
+    @abstractmethod
+    def pop(
+        self,
+        block: bool = False,
+        timeout: Optional[float] = None
+    ) -> Optional[Tuple[int, str, Any, str]]:
+        """
+        Removes the job at the front of the queue.
+        Parameters:
+        block (bool): if True and the queue is empty, waits until a job is pushed.
+        timeout (float): if blocking, the maximum number of seconds to wait.
+        Returns:
+        (Tuple[int, str, Any, str]): the queue index, hash, input data and action of the job, or None if the queue is empty.
+        """
+        pass
+
+    @abstractmethod
+    def get_status(self, hash: str) -> Tuple[str, Any]:
+        """
+        Parameters:
+        hash (str): the identifier returned by push().
+        Returns:
+        status (str): one of "QUEUED", "PENDING", "FAILED", "COMPLETE" or "NOT FOUND".
+        data: the queue position if "QUEUED", the error message if "FAILED", the output data if "COMPLETE", otherwise None.
+        """
+        pass
+
+    def get_next_hashes(self, count: int) -> Optional[List[str]]:
+        """
+        Parameters:
+        count (int): the number of jobs to return.
+        Returns:
+        (List[str]): the hashes of the first `count` jobs in the queue, or None if the backend can't tell. Only these jobs can change position when a job starts or finishes.
+        """
         return None
-    queue_index = result[0]
-    c.execute("""
-        UPDATE queue SET popped = 1, input_data = '' WHERE queue_index = ?;
-    """, (queue_index,))
-    conn.commit()
-    return result[0], result[1], json.loads(result[2]), result[3]
 
+    @abstractmethod
+    def start_job(self, hash: str) -> None:
+        pass
 
-def push(input_data, action):
-    input_data = json.dumps(input_data)
-    hash = generate_hash()
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute("""
-        INSERT INTO queue (hash, input_data, action)
-        VALUES (?, ?, ?);
-    """, (hash, input_data, action))    
-    queue_index = c.lastrowid
-    c.execute("""
-        SELECT COUNT(*) FROM queue WHERE queue_index < ? and popped = 0;
-    """, (queue_index,))
-    queue_position = c.fetchone()[0]
-    if queue_position is None:
-        conn.commit()
-        raise ValueError("Hash not found.")
-    elif queue_position == 0:
-        c.execute("""
-            SELECT COUNT(*) FROM jobs WHERE status = "PENDING";
-        """)
-        result = c.fetchone()
-        if result[0] == 0:
-            queue_position -= 1
-    conn.commit()
-    return hash, queue_position
+    @abstractmethod
+    def fail_job(self, hash: str, error_message: str) -> None:
+        pass
 
-def get_status(hash):
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute("""
-        SELECT queue_index, popped FROM queue WHERE hash = ?;
-    """, (hash,))
-    result = c.fetchone()
-    if result is None:
-        conn.commit()
-        raise ValueError("Hash not found.")
-    if result[1] == 1: # in jobs
-        c.execute("""
-            SELECT status, output_data, error_message FROM jobs WHERE hash = ?;
-        """, (hash,))
-        result = c.fetchone()
-        if result is None:
-            conn.commit()
-            return "NOT FOUND", None
-        else:
+    @abstractmethod
+    def pass_job(self, hash: str, output_data: Any) -> None:
+        pass
+
+
+class MemoryQueue(QueueBackend):
+    """
+    The default queue backend. Keeps the queue in a deque and the job records
+    in a dictionary, guarded by a single lock. The record of a finished job is
+    removed once its result has been returned by get_status(), or after
+    FINISHED_JOB_TTL seconds if it is never requested.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.job_available = threading.Condition(self.lock)
+        self.init()
+
+    def init(self, concurrency=1):
+        with self.lock:
+            self.concurrency = concurrency
+            self.queue: collections.deque = collections.deque()
+            self.jobs: Dict[str, Dict[str, Any]] = {}
+            # (finish time, hash) of finished jobs, oldest first
+            self.finished_jobs: collections.deque = collections.deque()
+            self.next_index = 1
+            self.head_index = 1  # queue_index of the next job to be popped
+            self.pending_count = 0
+
+    def close(self):
+        self.init()
+
+    def _get_queue_position(self, hash):
+        queue_position = self.jobs[hash]["queue_index"] - self.head_index
+        if queue_position < self.concurrency - self.pending_count:
+            queue_position = -1
+        return queue_position
+
+    def _expire_finished_jobs(self):
+        expiry_time = time.time() - FINISHED_JOB_TTL
+        while self.finished_jobs and self.finished_jobs[0][0] < expiry_time:
+            _, hash = self.finished_jobs.popleft()
+            self.jobs.pop(hash, None)
+
+    def push(self, input_data, action):
+        with self.lock:
+            self._expire_finished_jobs()
+            hash = uuid.uuid4().hex
+            while hash in self.jobs:
+                hash = uuid.uuid4().hex
+            self.jobs[hash] = {
+                "hash": hash,
+                "queue_index": self.next_index,
+                "input_data": input_data,
+                "action": action,
+                "popped": False,
+                "status": None,
+                "output_data": None,
+                "error_message": None
+            }
+            self.next_index += 1
+            self.queue.append(hash)
+            self.job_available.notify()
+            return hash, self._get_queue_position(hash)
+
+    def pop(self, block=False, timeout=None):
+        with self.lock:
+            if block:
+                self.job_available.wait_for(lambda: self.queue, timeout)
+            if not self.queue:
+                return None
+            hash = self.queue.popleft()
+            job = self.jobs[hash]
+            job["popped"] = True
+            self.head_index = job["queue_index"] + 1
+            input_data, job["input_data"] = job["input_data"], None
+            return job["queue_index"], hash, input_data, job["action"]
+
+    def get_status(self, hash):
+        with self.lock:
+            job = self.jobs.get(hash)
+            if job is None:
+                raise ValueError("Hash not found.")
+            if not job["popped"]:
+                return "QUEUED", self._get_queue_position(hash)
+            status = job["status"]
+            if status is None:
+                return "NOT FOUND", None
+            elif status == "PENDING":
+                return "PENDING", None
+            elif status == "FAILED":
+                del self.jobs[hash]
+                return "FAILED", job["error_message"]
+            elif status == "COMPLETE":
+                del self.jobs[hash]
+                return "COMPLETE", job["output_data"]
+
+    def get_next_hashes(self, count):
+        with self.lock:
+            return list(itertools.islice(self.queue, count))
+
+    def start_job(self, hash):
+        with self.lock:
+            job = self.jobs[hash]
+            job["popped"] = True
+            if job["status"] != "PENDING":
+                self.pending_count += 1
+            job["status"] = "PENDING"
+
+    def _finish_job(self, job, status):
+        if job["status"] == "PENDING":
+            self.pending_count -= 1
+        job["status"] = status
+        self.finished_jobs.append((time.time(), job["hash"]))
+
+    def fail_job(self, hash, error_message):
+        with self.lock:
+            job = self.jobs[hash]
+            self._finish_job(job, "FAILED")
+            job["error_message"] = error_message
+
+    def pass_job(self, hash, output_data):
+        with self.lock:
+            job = self.jobs[hash]
+            self._finish_job(job, "COMPLETE")
+            job["output_data"] = output_data
+
+
+class SQLiteQueue(QueueBackend):
+    """
+    A durable queue backend that stores the queue and jobs in a SQLite
+    database. A single connection in WAL mode is shared by all threads. The
+    head of the queue and the number of pending jobs are tracked in memory so
+    that queue positions do not require a table scan.
+    """
+    def __init__(self, db_file: str = DB_FILE):
+        """
+        Parameters:
+        db_file (str): path of the database file. Any existing file is deleted when the queue is initialized.
+        """
+        self.db_file = db_file
+        self.conn = None
+        self.lock = threading.Lock()
+        self.job_available = threading.Condition(self.lock)
+        self.head_index = 1
+        self.pending_count = 0
+
+    def init(self, concurrency=1):
+        with self.lock:
+            self.concurrency = concurrency
+            if self.conn is not None:
+                self.conn.close()
+            if os.path.exists(self.db_file):
+                os.remove(self.db_file)
+            self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+            c = self.conn.cursor()
+            c.execute("PRAGMA journal_mode=WAL;")
+            c.execute("PRAGMA synchronous=NORMAL;")
+            c.execute("""CREATE TABLE queue (
+                    queue_index integer PRIMARY KEY,
+                    hash text,
+                    input_data text,
+                    action text,
+                    popped integer DEFAULT 0
+                );""")
+            c.execute("""
+                CREATE TABLE jobs (
+                    hash text PRIMARY KEY,
+                    status text,
+                    output_data text,
+                    error_message text
+                );
+            """)
+            c.execute("CREATE INDEX queue_hash ON queue (hash);")
+            c.execute("CREATE INDEX jobs_status ON jobs (status);")
+            self.conn.commit()
+            self.head_index = 1
+            self.pending_count = 0
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+            if os.path.exists(self.db_file):
+                os.remove(self.db_file)
+
+    def _generate_hash(self, c):
+        generate = True
+        while generate:
+            hash = uuid.uuid4().hex
+            c.execute("""
+                SELECT hash FROM queue
+                WHERE hash = ?;
+            """, (hash,))
+            generate = c.fetchone() is not None
+        return hash
+
+    def _get_queue_position(self, queue_index):
+        queue_position = queue_index - self.head_index
+        if queue_position < self.concurrency - self.pending_count:
+            queue_position = -1
+        return queue_position
+
+    def push(self, input_data, action):
+        input_data = json.dumps(input_data)
+        with self.lock, self.conn:
+            c = self.conn.cursor()
+            hash = self._generate_hash(c)
+            c.execute("""
+                INSERT INTO queue (hash, input_data, action)
+                VALUES (?, ?, ?);
+            """, (hash, input_data, action))
+            queue_position = self._get_queue_position(c.lastrowid)
+            self.job_available.notify()
+        return hash, queue_position
+
+    def _pop(self):
+        with self.conn:
+            c = self.conn.cursor()
+            c.execute("""
+                SELECT queue_index, hash, input_data, action FROM queue
+                WHERE queue_index >= ? AND popped = 0
+                ORDER BY queue_index ASC LIMIT 1;
+            """, (self.head_index,))
+            result = c.fetchone()
+            if result is None:
+                return None
+            queue_index = result[0]
+            c.execute("""
+                UPDATE queue SET popped = 1, input_data = '' WHERE queue_index = ?;
+            """, (queue_index,))
+            self.head_index = queue_index + 1
+        return result[0], result[1], json.loads(result[2]), result[3]
+
+    def pop(self, block=False, timeout=None):
+        with self.lock:
+            result = self._pop()
+            if result is None and block:
+                self.job_available.wait(timeout)
+                result = self._pop()
+            return result
+
+    def get_status(self, hash):
+        with self.lock, self.conn:
+            c = self.conn.cursor()
+            c.execute("""
+                SELECT queue_index, popped FROM queue WHERE hash = ?;
+            """, (hash,))
+            result = c.fetchone()
+            if result is None:
+                raise ValueError("Hash not found.")
+            queue_index, popped = result
+            if not popped:
+                return "QUEUED", self._get_queue_position(queue_index)
+            c.execute("""
+                SELECT status, output_data, error_message FROM jobs WHERE hash = ?;
+            """, (hash,))
+            result = c.fetchone()
+            if result is None:
+                return "NOT FOUND", None
             status, output_data, error_message = result
             if status == "PENDING":
-                conn.commit()
                 return "PENDING", None
             elif status == "FAILED":
-                conn.commit()
                 return "FAILED", error_message
             elif status == "COMPLETE":
                 c.execute("""
                     UPDATE jobs SET output_data = '' WHERE hash = ?;
                 """, (hash,))
-                conn.commit()
-                output_data = json.loads(output_data)
-                return "COMPLETE", output_data
-    else: # in queue
-        queue_index = result[0]
-        c.execute("""
-            SELECT COUNT(*) FROM queue WHERE queue_index < ? and popped = 0;
-        """, (queue_index,))
-        result = c.fetchone()
-        queue_position = result[0]
-        if queue_position == 0:
+                return "COMPLETE", json.loads(output_data)
+
+    def get_next_hashes(self, count):
+        with self.lock, self.conn:
+            c = self.conn.cursor()
             c.execute("""
-                SELECT COUNT(*) FROM jobs WHERE status = "PENDING";
-            """)
-            result = c.fetchone()
-            if result[0] == 0:
-                queue_position -= 1
-        conn.commit()
-        return "QUEUED", queue_position
+                SELECT hash FROM queue
+                WHERE queue_index >= ? AND popped = 0
+                ORDER BY queue_index ASC LIMIT ?;
+            """, (self.head_index, count))
+            return [row[0] for row in c.fetchall()]
+
+    def start_job(self, hash):
+        with self.lock, self.conn:
+            c = self.conn.cursor()
+            c.execute("""
+                UPDATE queue SET popped = 1 WHERE hash = ?;
+            """, (hash,))
+            c.execute("""
+                INSERT INTO jobs (hash, status) VALUES (?, 'PENDING');
+            """, (hash,))
+            self.pending_count += 1
+
+    def fail_job(self, hash, error_message):
+        with self.lock, self.conn:
+            c = self.conn.cursor()
+            c.execute("""
+                UPDATE jobs SET status = 'FAILED', error_message = ?
+                WHERE hash = ? AND status = 'PENDING';
+            """, (error_message, hash,))
+            self.pending_count -= c.rowcount
+
+    def pass_job(self, hash, output_data):
+        output_data = json.dumps(output_data)
+        with self.lock, self.conn:
+            c = self.conn.cursor()
+            c.execute("""
+                UPDATE jobs SET status = 'COMPLETE', output_data = ?
+                WHERE hash = ? AND status = 'PENDING';
+            """, (output_data, hash,))
+            self.pending_count -= c.rowcount
+
+
+def get_queue_backend_instance(queue_backend: Optional[str | QueueBackend]) -> QueueBackend:
+    if queue_backend is None or queue_backend == "memory":
+        return MemoryQueue()
+    elif queue_backend == "sqlite":
+        return SQLiteQueue()
+    elif isinstance(queue_backend, QueueBackend):
+        return queue_backend
+    else:
+        raise ValueError("Invalid queue backend: {}. Please choose from: "
+                         "'memory', 'sqlite', or pass a QueueBackend "
+                         "instance.".format(queue_backend))
+
+
+backend: QueueBackend = MemoryQueue()
+queue_concurrency = 1
+# Callbacks that are run whenever the status of a queued job may have
+# changed, by the hash of the job
+listeners: Dict[str, List[Callable[[], None]]] = {}
+# Hashes in `listeners` of jobs that have left the queue, whose position no
+# longer changes
+popped_hashes: Set[str] = set()
+listeners_lock = threading.Lock()
+
+
+def add_listener(hash: str, listener: Callable[[], None]):
+    with listeners_lock:
+        listeners.setdefault(hash, []).append(listener)
+
+def remove_listener(hash: str, listener: Callable[[], None]):
+    with listeners_lock:
+        hash_listeners = listeners.get(hash, [])
+        if listener in hash_listeners:
+            hash_listeners.remove(listener)
+        if not hash_listeners:
+            listeners.pop(hash, None)
+            popped_hashes.discard(hash)
+
+def notify_listeners(hashes: Iterable[str]):
+    with listeners_lock:
+        callbacks = [listener for hash in set(hashes)
+                     for listener in listeners.get(hash, [])]
+    for listener in callbacks:
+        listener()
+
+def get_queued_listened_hashes() -> List[str]:
+    with listeners_lock:
+        return [hash for hash in listeners if hash not in popped_hashes]
+
+def notify_job_listeners(hash: str):
+    """
+    Notifies the listeners of a job that has started or finished. Since the
+    number of running jobs changed, the listeners of the jobs at the front of
+    the queue are notified as well.
+    """
+    next_hashes = backend.get_next_hashes(queue_concurrency)
+    if next_hashes is None:
+        next_hashes = get_queued_listened_hashes()
+    notify_listeners([hash, *next_hashes])
+
+def init(
+    queue_backend: Optional[str | QueueBackend] = None,
+    concurrency: int = 1
+):
+    global backend, queue_concurrency
+    backend = get_queue_backend_instance(queue_backend)
+    backend.init(concurrency)
+    queue_concurrency = concurrency
+
+def close():
+    backend.close()
+
+def pop(block=False, timeout=None):
+    job = backend.pop(block, timeout)
+    if job is not None:
+        hash = job[1]
+        with listeners_lock:
+            if hash in listeners:
+                popped_hashes.add(hash)
+        # Every job still in the queue moved forward by one position
+        notify_listeners([hash, *get_queued_listened_hashes()])
+    return job
+
+def push(input_data, action):
+    return backend.push(input_data, action)
+
+def get_status(hash):
+    return backend.get_status(hash)
 
 def start_job(hash):
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute("BEGIN EXCLUSIVE")
-    c.execute("""
-        UPDATE queue SET popped = 1 WHERE hash = ?;
-    """, (hash,))
-    c.execute("""
-        INSERT INTO jobs (hash, status) VALUES (?, 'PENDING');
-    """, (hash,))
-    conn.commit()
+    backend.start_job(hash)
+    with listeners_lock:
+        if hash in listeners:
+            popped_hashes.add(hash)
+    notify_job_listeners(hash)
 
 def fail_job(hash, error_message):
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute("""
-        UPDATE jobs SET status = 'FAILED', error_message = ? WHERE hash = ?;
-    """, (error_message, hash,))
-    conn.commit()
+    backend.fail_job(hash, error_message)
+    notify_job_listeners(hash)
 
 def pass_job(hash, output_data):
-    output_data = json.dumps(output_data)
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute("""
-        UPDATE jobs SET status = 'COMPLETE', output_data = ? WHERE hash = ?;
-    """, (output_data, hash,))
-    conn.commit()
-
+    backend.pass_job(hash, output_data)
+    notify_job_listeners(hash)
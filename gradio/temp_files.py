@@ -0,0 +1,173 @@
+"""
+Keeps track of the temporary files that gradio creates while processing
+inputs and outputs, so that they are deleted once they are no longer needed.
+"""
+from __future__ import annotations
+import atexit
+from collections import OrderedDict
+from contextlib import contextmanager
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Optional, Set
+
+
+# How often, in seconds, the background eviction thread checks the limits.
+EVICTION_INTERVAL = 60
+
+
+class TempFileRegistry():
+    """
+    Records every temporary file created through create_file(). Files created
+    inside a scope() are deleted when the scope exits (e.g. at the end of a
+    request), unless they are kept with keep(). Other files are deleted when
+    they exceed the age or size limits passed to evict(), or at exit.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        # path -> creation time, oldest first
+        self.files: OrderedDict[str, float] = OrderedDict()
+        self.local = threading.local()
+        self.stop_eviction_event: Optional[threading.Event] = None
+
+    def create_file(self, **kwargs) -> tempfile._TemporaryFileWrapper:
+        """
+        Creates a temporary file that is not deleted when closed, with the same
+        arguments as tempfile.NamedTemporaryFile, and registers it.
+        """
+        file = tempfile.NamedTemporaryFile(delete=False, **kwargs)
+        self.register(file.name)
+        return file
+
+    def register(self, path: str):
+        with self.lock:
+            self.files[path] = time.time()
+        scopes = getattr(self.local, "scopes", None)
+        if scopes:
+            scopes[-1].add(path)
+
+    def keep(self, path: str):
+        """
+        Prevents a file from being deleted when the current scope exits, e.g.
+        because it is still needed after the request.
+        """
+        for scope in getattr(self.local, "scopes", []):
+            scope.discard(path)
+
+    @contextmanager
+    def scope(self):
+        """
+        Deletes the files created in the current thread while in this context.
+        """
+        if not hasattr(self.local, "scopes"):
+            self.local.scopes = []
+        scope: Set[str] = set()
+        self.local.scopes.append(scope)
+        try:
+            yield
+        finally:
+            self.local.scopes.pop()
+            for path in scope:
+                self.delete(path)
+
+    def delete(self, path: str):
+        with self.lock:
+            self.files.pop(path, None)
+        try:
+            os.remove(path)
+        except OSError:  # Already deleted or moved elsewhere
+            pass
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Returns:
+        (Dict[str, int]): the number of temporary files that currently exist,
+        and how many bytes they hold.
+        """
+        with self.lock:
+            paths = list(self.files)
+        num_files, num_bytes = 0, 0
+        for path in paths:
+            try:
+                num_bytes += os.path.getsize(path)
+                num_files += 1
+            except OSError:
+                pass
+        return {"files": num_files, "bytes": num_bytes}
+
+    def evict(
+        self,
+        max_bytes: Optional[int] = None,
+        max_age: Optional[float] = None
+    ):
+        """
+        Deletes files older than `max_age` seconds, then the oldest files until
+        the remaining ones hold at most `max_bytes` bytes.
+        """
+        with self.lock:
+            files = list(self.files.items())
+        now = time.time()
+        sizes = []
+        for path, created in files:
+            if max_age is not None and now - created > max_age:
+                self.delete(path)
+                continue
+            try:
+                sizes.append((path, os.path.getsize(path)))
+            except OSError:  # Moved elsewhere, e.g. when flagged
+                with self.lock:
+                    self.files.pop(path, None)
+        if max_bytes is not None:
+            total_bytes = sum(size for _, size in sizes)
+            for path, size in sizes:
+                if total_bytes <= max_bytes:
+                    break
+                self.delete(path)
+                total_bytes -= size
+
+    def start_eviction(
+        self,
+        max_bytes: Optional[int] = None,
+        max_age: Optional[float] = None,
+        interval: float = EVICTION_INTERVAL
+    ):
+        """
+        Starts a background thread that calls evict() every `interval` seconds.
+        """
+        self.stop_eviction()
+        stop_event = self.stop_eviction_event = threading.Event()
+
+        def run():
+            while not stop_event.wait(interval):
+                self.evict(max_bytes, max_age)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def stop_eviction(self):
+        if self.stop_eviction_event is not None:
+            self.stop_eviction_event.set()
+            self.stop_eviction_event = None
+
+    def clear(self):
+        with self.lock:
+            paths = list(self.files)
+        for path in paths:
+            self.delete(path)
+
+
+registry = TempFileRegistry()
+atexit.register(registry.clear)
+
+
+def create_file(**kwargs) -> tempfile._TemporaryFileWrapper:
+    return registry.create_file(**kwargs)
+
+def keep(path: str):
+    registry.keep(path)
+
+def scope():
+    return registry.scope()
+
+def get_stats() -> Dict[str, int]:
+    return registry.get_stats()
@@ -0,0 +1,103 @@
+"""
+Generates small previews of example images and videos, so that example
+galleries don't have to load every example at full size.
+"""
+from __future__ import annotations
+import hashlib
+import os
+import re
+import tempfile
+from typing import Optional, Tuple
+
+from ffmpy import FFmpeg
+from PIL import Image
+
+
+THUMBNAIL_SIZE = (256, 256)
+# Thumbnails are named after the contents of the file they preview, so they
+# never change and browsers can cache them indefinitely.
+THUMBNAIL_MAX_AGE = 365 * 24 * 3600
+THUMBNAIL_URL_PREFIX = "thumbnail/"
+THUMBNAIL_NAME_PATTERN = re.compile(r"^[0-9a-f]{64}\.(png|jpg)$")
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+class ThumbnailCache():
+    """
+    Stores thumbnails of images and poster frames of videos in `cache_dir`,
+    keyed by a hash of the contents of the original file and the thumbnail
+    size. Each thumbnail is generated once, the first time it is requested.
+    """
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        size: Tuple[int, int] = THUMBNAIL_SIZE
+    ):
+        self.cache_dir = cache_dir or os.path.join(
+            tempfile.gettempdir(), "gradio_thumbnails")
+        self.size = size
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get_thumbnail(self, path: str, kind: str) -> Optional[str]:
+        """
+        Parameters:
+        path (str): path to the image or video file.
+        kind (str): "image" or "video".
+        Returns:
+        (str): the URL of the thumbnail, relative to the root of the app, or
+        None if no thumbnail could be generated from the file.
+        """
+        hasher = hashlib.sha256("{}x{}".format(*self.size).encode())
+        try:
+            with open(path, "rb") as file:
+                for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+                    hasher.update(chunk)
+        except OSError:
+            return None
+        extension = "png" if kind == "image" else "jpg"
+        name = hasher.hexdigest() + "." + extension
+        thumbnail_path = os.path.join(self.cache_dir, name)
+        if not os.path.exists(thumbnail_path):
+            # Written to a temporary file first so that concurrent requests
+            # never serve a partially written thumbnail.
+            temp_path = os.path.join(
+                self.cache_dir, "{}.{}.tmp.{}".format(
+                    hasher.hexdigest(), os.getpid(), extension))
+            try:
+                if kind == "image":
+                    self.create_image_thumbnail(path, temp_path)
+                else:
+                    self.create_video_thumbnail(path, temp_path)
+                os.replace(temp_path, thumbnail_path)
+            except Exception:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                return None
+        return THUMBNAIL_URL_PREFIX + name
+
+    def get_path(self, name: str) -> Optional[str]:
+        """
+        Returns the path of the thumbnail with the given name, or None if there
+        is no such thumbnail.
+        """
+        if not THUMBNAIL_NAME_PATTERN.match(name):
+            return None
+        path = os.path.join(self.cache_dir, name)
+        return path if os.path.isfile(path) else None
+
+    def create_image_thumbnail(self, path: str, thumbnail_path: str):
+        with Image.open(path) as image:
+            image.thumbnail(self.size)
+            if image.mode not in ("1", "L", "LA", "P", "RGB", "RGBA"):
+                image = image.convert("RGB")
+            image.save(thumbnail_path, format="PNG")
+
+    def create_video_thumbnail(self, path: str, thumbnail_path: str):
+        scale = "scale={}:{}:force_original_aspect_ratio=decrease".format(
+            *self.size)
+        ff = FFmpeg(
+            global_options="-loglevel error",
+            inputs={path: None},
+            outputs={thumbnail_path: "-vframes 1 -vf {} -f image2".format(scale)}
+        )
+        ff.run()
@@ -3,7 +3,6 @@
 from __future__ import annotations
 import aiohttp
 import analytics
-import csv
 from distutils.version import StrictVersion
 import inspect
 import json
@@ -219,26 +218,9 @@ def get_config_file(interface: Interface) -> Dict[str, Any]:
         pass
     if interface.examples is not None:
         if isinstance(interface.examples, str):
-            if not os.path.exists(interface.examples):
-                raise FileNotFoundError(
-                    "Could not find examples directory: " + interface.examples)
-            log_file = os.path.join(interface.examples, "log.csv")
-            if not os.path.exists(log_file):
-                if len(interface.input_components) == 1:
-                    examples = [[os.path.join(interface.examples, item)]
-                                for item in os.listdir(interface.examples)]
-                else:
-                    raise FileNotFoundError(
-                        "Could not find log file (required for multiple inputs): " + log_file)
-            else:
-                with open(log_file) as logs:
-                    examples = list(csv.reader(logs))
-                    examples = examples[1:]  # remove header
-            for i, example in enumerate(examples):
-                for j, (component, cell) in enumerate(zip(interface.input_components + interface.output_components, example)):
-                    examples[i][j] = component.restore_flagged(
-                        interface.flagging_dir, cell, interface.encryption_key if interface.encrypt else None)
-            config["examples"] = examples
+            # Served page by page from /api/examples/ instead
+            config["examples"] = None
+            config["examples_count"] = interface.example_pages.get_count()
             config["examples_dir"] = interface.examples
         else:
             config["examples"] = interface.examples
@@ -0,0 +1,102 @@
+"""
+Implements a pool of worker processes that run an interface's prediction
+functions, so that CPU-bound functions that hold the GIL can use all cores.
+"""
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import multiprocessing.synchronize
+import threading
+from typing import Any, Callable, List, Optional, Tuple
+
+
+# The prediction functions of the interface, set in each worker process.
+worker_fns: List[Callable] = []
+# Shared by the workers of a pool, to wait until all of them are initialized.
+worker_barrier: Optional[multiprocessing.synchronize.Barrier] = None
+
+
+def init_worker(
+    fns: List[Callable],
+    barrier: multiprocessing.synchronize.Barrier,
+    initializer: Optional[Callable],
+    initargs: Tuple
+):
+    global worker_fns, worker_barrier
+    worker_fns = fns
+    worker_barrier = barrier
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def wait_for_workers():
+    # A worker only runs tasks once it is initialized, and blocks here until
+    # every other worker has picked up one of these tasks too.
+    worker_barrier.wait()
+
+
+def run_in_worker(fn_index: int, *args) -> Any:
+    return worker_fns[fn_index](*args)
+
+
+class WorkerPool():
+    """
+    Runs prediction functions in a pool of forked worker processes. Since the
+    workers are forked, the functions themselves don't need to be picklable,
+    but their inputs and outputs are pickled to be sent between processes.
+    The pool is started on first use (or by calling start()), at which point
+    `initializer(*initargs)` runs once in every worker, e.g. to load a model.
+    """
+    def __init__(
+        self,
+        fns: List[Callable],
+        num_processes: int,
+        initializer: Optional[Callable] = None,
+        initargs: Tuple = ()
+    ):
+        if num_processes < 1:
+            raise ValueError("`num_processes` must be at least 1.")
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise ValueError("Running prediction functions in worker "
+                             "processes is not supported on this platform.")
+        self.fns = fns
+        self.num_processes = num_processes
+        self.initializer = initializer
+        self.initargs = initargs
+        self.lock = threading.Lock()
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+    def start(self) -> ProcessPoolExecutor:
+        """
+        Starts the worker processes if they are not running yet, and waits
+        until they have been initialized.
+        """
+        with self.lock:
+            if self.executor is None:
+                context = multiprocessing.get_context("fork")
+                # Passed to the forked workers with initargs, since barriers
+                # can't be pickled along with tasks.
+                barrier = context.Barrier(self.num_processes)
+                self.executor = ProcessPoolExecutor(
+                    self.num_processes, mp_context=context,
+                    initializer=init_worker, initargs=(
+                        self.fns, barrier, self.initializer, self.initargs))
+                warmups = [self.executor.submit(wait_for_workers)
+                           for _ in range(self.num_processes)]
+                for warmup in warmups:
+                    warmup.result()
+            return self.executor
+
+    def run(self, fn_index: int, *args) -> Any:
+        """
+        Runs the prediction function at `fn_index` on the given arguments in
+        a worker process, and returns its output.
+        """
+        executor = self.executor or self.start()
+        return executor.submit(run_in_worker, fn_index, *args).result()
+
+    def close(self):
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown(cancel_futures=True)
+                self.executor = None
@@ -0,0 +1,66 @@
+"""
+Benchmarks queue status polling with a long queue and many concurrent pollers.
+Run from the repository root with: python -m test.benchmark_queueing
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+from gradio import queueing
+
+
+NUM_JOBS = 10000
+NUM_POLLERS = 1000
+POLLS_PER_POLLER = 10
+
+
+def benchmark(queue):
+    queue.init()
+    start = time.time()
+    hashes = [queue.push({"data": [i]}, "predict")[0] for i in range(NUM_JOBS)]
+    push_time = time.time() - start
+
+    # Pollers are spread evenly over the queue while a worker drains it.
+    polled_hashes = hashes[::NUM_JOBS // NUM_POLLERS]
+    barrier = threading.Barrier(NUM_POLLERS + 1)
+    poll_counts = []
+
+    def poll(hash):
+        barrier.wait()
+        for num_polls in range(1, POLLS_PER_POLLER + 1):
+            status, _ = queue.get_status(hash)
+            if status == "COMPLETE":  # output is only returned once
+                break
+        poll_counts.append(num_polls)
+
+    def work():
+        barrier.wait()
+        for _ in range(NUM_POLLERS):
+            _, hash, _, _ = queue.pop()
+            queue.start_job(hash)
+            queue.pass_job(hash, {"data": [None]})
+
+    threads = [threading.Thread(target=poll, args=(hash,))
+               for hash in polled_hashes[:NUM_POLLERS - 1]]
+    threads.append(threading.Thread(target=work))
+    for thread in threads:
+        thread.start()
+    start = time.time()
+    barrier.wait()
+    for thread in threads:
+        thread.join()
+    poll_time = time.time() - start
+    queue.close()
+
+    num_polls = sum(poll_counts)
+    print("{}: {} pushes in {:.3f}s, {} polls in {:.3f}s ({:.1f} us/poll)".format(
+        type(queue).__name__, NUM_JOBS, push_time, num_polls, poll_time,
+        1e6 * poll_time / num_polls))
+
+
+if __name__ == "__main__":
+    benchmark(queueing.MemoryQueue())
+    with tempfile.TemporaryDirectory() as tmpdir:
+        benchmark(queueing.SQLiteQueue(os.path.join(tmpdir, "queue.db")))
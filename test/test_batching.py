@@ -0,0 +1,65 @@
+"""Contains tests for batching.py"""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+import unittest
+
+from gradio import Interface
+from gradio.batching import Batcher
+
+
+os.environ["GRADIO_ANALYTICS_ENABLED"] = "False"
+
+
+class TestBatcher(unittest.TestCase):
+    def test_concurrent_calls_are_batched(self):
+        batch_sizes = []
+        def double(xs):
+            batch_sizes.append(len(xs))
+            return [2 * x for x in xs]
+        batcher = Batcher(double, max_batch_size=4, max_batch_delay_ms=1000)
+        with ThreadPoolExecutor(4) as executor:
+            results = list(executor.map(lambda x: batcher.submit([x]),
+                                        range(4)))
+        self.assertEqual([output for output, _, _ in results], [0, 2, 4, 6])
+        self.assertEqual(batch_sizes, [4])
+        self.assertTrue(all(batch_size == 4 for _, _, batch_size in results))
+
+    def test_multiple_inputs_and_outputs(self):
+        def add_and_subtract(xs, ys):
+            return ([x + y for x, y in zip(xs, ys)],
+                    [x - y for x, y in zip(xs, ys)])
+        batcher = Batcher(add_and_subtract, num_outputs=2)
+        output, _, batch_size = batcher.submit([3, 1])
+        self.assertEqual(output, [4, 2])
+        self.assertEqual(batch_size, 1)
+
+    def test_errors_are_raised_for_each_call(self):
+        batcher = Batcher(lambda xs: xs[:-1])
+        with self.assertRaises(ValueError):
+            batcher.submit(["test"])
+        batcher = Batcher(lambda xs: 1 / 0)
+        with self.assertRaises(ZeroDivisionError):
+            batcher.submit(["test"])
+
+
+class TestBatchedInterface(unittest.TestCase):
+    def test_batched_process(self):
+        io = Interface(lambda xs: [x[::-1] for x in xs], "text", "text",
+                       batch=True, max_batch_size=8, max_batch_delay_ms=200)
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(
+                lambda x: io.process([x]), ["a" + str(i) for i in range(8)]))
+        self.assertEqual([output[0] for output, _ in results],
+                         [str(i) + "a" for i in range(8)])
+        self.assertLess(io.batchers[0].num_batches, 8)
+        self.assertEqual(io.batchers[0].num_calls, 8)
+
+    def test_batch_with_state_raises(self):
+        with self.assertRaises(ValueError):
+            Interface(lambda xs, states: (xs, states), ["text", "state"],
+                      ["text", "state"], batch=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""Contains tests for file_store.py"""
+
+import os
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+import gradio as gr
+from gradio import file_store
+from gradio.file_store import FileStore
+
+
+os.environ["GRADIO_ANALYTICS_ENABLED"] = "False"
+
+
+class TestFileStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "test.txt")
+        with open(self.path, "w") as f:
+            f.write("test")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_add_and_resolve(self):
+        store = FileStore()
+        url = store.add(self.path)
+        self.assertTrue(url.startswith(file_store.FILE_URL_PREFIX))
+        self.assertEqual(store.resolve_url(url), self.path)
+        self.assertIsNone(store.resolve_url("file/unknown"))
+        self.assertIsNone(store.resolve_url("data:image/png;base64,"))
+
+    def test_expired_files(self):
+        store = FileStore(ttl=0.01)
+        owned_path = os.path.join(self.tmpdir.name, "owned.txt")
+        with open(owned_path, "w") as f:
+            f.write("test")
+        url = store.add(self.path)
+        owned_url = store.add(owned_path, owned=True)
+        time.sleep(0.05)
+        self.assertIsNone(store.resolve_url(url))
+        self.assertIsNone(store.resolve_url(owned_url))
+        self.assertTrue(os.path.exists(self.path))
+        self.assertFalse(os.path.exists(owned_path))
+
+    def test_clear(self):
+        store = FileStore()
+        url = store.add(self.path, owned=True)
+        store.clear()
+        self.assertIsNone(store.resolve_url(url))
+        self.assertFalse(os.path.exists(self.path))
+
+
+class TestServedOutputs(unittest.TestCase):
+    def setUp(self):
+        file_store.start()
+
+    def tearDown(self):
+        file_store.stop()
+
+    def test_flag_served_file(self):
+        file_output = gr.outputs.File()
+        y = file_output.postprocess("test/test_data/test_image.png")
+        self.assertTrue(y["data"].startswith(file_store.FILE_URL_PREFIX))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            to_save = file_output.save_flagged(tmpdir, "file_output", y, None)
+            self.assertEqual(to_save, "file_output/0.png")
+            self.assertTrue(os.path.exists(os.path.join(tmpdir, to_save)))
+
+    def test_numpy_audio_is_owned(self):
+        audio_output = gr.outputs.Audio(type="numpy")
+        url = audio_output.postprocess((8000, np.zeros(100, dtype=np.int16)))
+        path = file_store.resolve_url(url)
+        self.assertTrue(os.path.exists(path))
+        file_store.stop()
+        self.assertFalse(os.path.exists(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,7 @@
+import csv
 import gradio as gr
-from gradio import flagging
+from gradio import encryptor, flagging
+import os
 import tempfile
 import unittest
 import unittest.mock as mock
@@ -26,6 +28,151 @@ class TestFlagging(unittest.TestCase):
             self.assertEqual(row_count, 1)  # no header
         io.close()
 
+    def test_sqlite_flagging_handler(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            io = gr.Interface(lambda x: x, "text", "text", flagging_dir=tmpdirname, 
+                              flagging_options=["good", "bad"],
+                              flagging_callback=flagging.SQLiteLogger())
+            io.launch(prevent_thread_lock=True)
+            row_count = io.flagging_callback.flag(io, ["test"], ["test"], flag_option="good")
+            self.assertEqual(row_count, 1)
+            row_count = io.flagging_callback.flag(io, ["test2"], ["test2"], flag_option="good")
+            self.assertEqual(row_count, 2)
+            row_count = io.flagging_callback.flag(io, None, None, flag_option="bad", flag_index=1)
+            self.assertEqual(row_count, 2)
+            csv_file = os.path.join(tmpdirname, "export.csv")
+            io.flagging_callback.export_csv(csv_file)
+            with open(csv_file) as f:
+                rows = list(csv.reader(f))
+            self.assertEqual(rows[0][:3], ["x", "Output", "flag"])
+            self.assertEqual(rows[1][:3], ["test", "test", "bad"])
+            self.assertEqual(rows[2][:3], ["test2", "test2", "good"])
+            io.close()
+            io.flagging_callback.conn.close()
+
+    def test_sqlite_flagging_handler_reopened(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            io = gr.Interface(lambda x: x, "text", "text")
+            io.config = io.get_config_file()
+            io.encrypt, io.encryption_key = True, encryptor.get_key("password")
+            callback = flagging.SQLiteLogger()
+            callback.setup(tmpdirname)
+            callback.flag(io, ["test"], ["test"])
+            callback.conn.close()
+            callback = flagging.SQLiteLogger()
+            callback.setup(tmpdirname)
+            self.assertEqual(callback.flag(io, ["test2"], ["test2"]), 2)
+            csv_file = os.path.join(tmpdirname, "export.csv")
+            callback.export_csv(csv_file, io.encryption_key)
+            with open(csv_file) as f:
+                rows = list(csv.reader(f))
+            self.assertEqual([row[0] for row in rows], ["x", "test", "test2"])
+            callback.conn.close()
+
+    def test_encrypted_csv_flagging_handler(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            io = gr.Interface(lambda x: x, "text", "text",
+                              flagging_options=["good", "bad"])
+            io.config = io.get_config_file()
+            io.encrypt, io.encryption_key = True, encryptor.get_key("password")
+            callback = flagging.CSVLogger()
+            callback.setup(tmpdirname)
+            self.assertEqual(callback.flag(io, ["a"], ["a"], "good"), 1)
+            self.assertEqual(callback.flag(io, ["b"], ["b"], "good"), 2)
+            self.assertEqual(callback.flag(io, ["c"], ["c"], "good"), 3)
+            self.assertEqual(
+                callback.flag(io, None, None, "bad", flag_index=2), 3)
+            self.assertEqual(callback.get_flag_count(io), 3)
+            log_fp = os.path.join(tmpdirname, "log.csv")
+            rows = list(flagging.read_encrypted_log(log_fp, io.encryption_key))
+            self.assertEqual([row[:3] for row in rows[1:]], [
+                ["a", "a", "good"], ["b", "b", "bad"], ["c", "c", "good"]])
+
+    def test_encrypted_log_is_not_rescanned(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            io = gr.Interface(lambda x: x, "text", "text",
+                              flagging_options=["good", "bad"])
+            io.config = io.get_config_file()
+            io.encrypt, io.encryption_key = True, encryptor.get_key("password")
+            callback = flagging.CSVLogger()
+            callback.setup(tmpdirname)
+            callback.flag(io, ["a"], ["a"], "good")
+            with mock.patch.object(flagging, "count_encrypted_rows",
+                                   wraps=flagging.count_encrypted_rows) as count:
+                self.assertEqual(callback.flag(io, ["b"], ["b"], "good"), 2)
+                self.assertEqual(
+                    callback.flag(io, None, None, "bad", flag_index=1), 2)
+                self.assertEqual(callback.get_flag_count(io), 2)
+                self.assertEqual(count.call_count, 0)
+                callback = flagging.CSVLogger()  # Nothing counted yet
+                callback.setup(tmpdirname)
+                self.assertEqual(callback.get_flag_count(io), 2)
+                self.assertEqual(callback.flag(io, ["c"], ["c"], "good"), 3)
+                self.assertEqual(count.call_count, 1)
+
+    def test_legacy_encrypted_log_is_upgraded(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            io = gr.Interface(lambda x: x, "text", "text")
+            io.config = io.get_config_file()
+            io.encrypt, io.encryption_key = True, encryptor.get_key("password")
+            log_fp = os.path.join(tmpdirname, "log.csv")
+            with open(log_fp, "wb") as log:
+                log.write(encryptor.encrypt(
+                    io.encryption_key, b"x,Output,timestamp\r\nold,old,0\r\n"))
+            callback = flagging.CSVLogger()
+            callback.setup(tmpdirname)
+            self.assertEqual(callback.get_flag_count(io), 1)
+            self.assertEqual(callback.flag(io, ["new"], ["new"]), 2)
+            rows = list(flagging.read_encrypted_log(log_fp, io.encryption_key))
+            self.assertEqual([row[0] for row in rows], ["x", "old", "new"])
+
+
+class TestFlagWriter(unittest.TestCase):
+    def test_flags_written_in_batches(self):
+        callback = flagging.CSVLogger()
+        callback.flag_batch = mock.MagicMock(side_effect=callback.flag_batch)
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            io = gr.Interface(lambda x: x, "text", "text", flagging_dir=tmpdirname,
+                              flagging_callback=callback, flag_in_background=True,
+                              flagging_batch_size=3, flagging_batch_delay=10)
+            io.launch(prevent_thread_lock=True)
+            row_counts = [io.flagger.flag(io, ["test"], ["test"]) for _ in range(3)]
+            self.assertEqual(row_counts, [1, 2, 3])
+            io.flagger.flush()
+            self.assertEqual(callback.flag_batch.call_count, 1)
+            self.assertEqual(callback.get_flag_count(io), 3)
+            io.flagger.flag(io, ["test"], ["test"])
+            io.close()  # writes the remaining sample
+            self.assertEqual(callback.get_flag_count(io), 4)
+
+    def test_close_unregisters_exit_handler(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            callback = flagging.CSVLogger()
+            callback.setup(tmpdirname)
+            io = gr.Interface(lambda x: x, "text", "text")
+            with mock.patch.object(flagging.atexit, "unregister") as unregister:
+                writer = flagging.FlagWriter(callback, io)
+                writer.close()
+            unregister.assert_called_once_with(writer.close)
+
+    def test_auto_flagging_in_process_executor(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            io = gr.Interface(lambda x: x, "text", "text", flagging_dir=tmpdirname,
+                              allow_flagging="auto", flag_in_background=True)
+            with self.assertRaises(ValueError):
+                io.launch(executor="process", prevent_thread_lock=True)
+
+    def test_sqlite_flag_batch(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            io = gr.Interface(lambda x: x, "text", "text")
+            io.config = io.get_config_file()
+            callback = flagging.SQLiteLogger()
+            callback.setup(tmpdirname)
+            samples = [{"input_data": ["test"], "output_data": ["test"]}] * 3
+            self.assertEqual(callback.flag_batch(io, samples), [1, 2, 3])
+            self.assertEqual(callback.get_flag_count(io), 3)
+            callback.conn.close()
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -349,6 +349,61 @@ class TestImage(unittest.TestCase):
         iface = gr.Interface(lambda x: np.sum(x), image_input, "textbox", interpretation="default")
         self.assertIsNotNone(iface.interpret([img]))
 
+    def test_interpretation_perturbations(self):
+        img = gr.test_data.BASE64_IMAGE
+        image_input = gr.inputs.Image(shape=(30, 10), type="pil")
+        image_input.set_interpret_parameters(segments=4)
+        tokens, leave_one_out_tokens, masks = image_input.tokenize(img)
+        self.assertIsInstance(leave_one_out_tokens[0], np.ndarray)
+        masked_inputs = image_input.get_masked_inputs(tokens, [[1] * len(tokens)])
+        self.assertEqual(masked_inputs[0].dtype, np.uint8)
+        encoded_input = gr.processing_utils.encode_array_to_base64(masked_inputs[0])
+        self.assertEqual(np.asarray(image_input.preprocess(masked_inputs[0])).tolist(),
+                         np.asarray(image_input.preprocess(encoded_input)).tolist())
+
+    def test_masks_from_segment_map(self):
+        img = gr.test_data.BASE64_IMAGE
+        image_input = gr.inputs.Image(shape=(30, 10))
+        image_input.set_interpret_parameters(segments=4)
+        tokens, _, _ = image_input.tokenize(img)
+        image, segment_map, _ = tokens[0]
+        binary_mask_matrix = np.random.RandomState(0).randint(2, size=(5, len(tokens)))
+        masked_inputs = image_input.get_masked_inputs(tokens, binary_mask_matrix)
+        for binary_mask_vector, masked_input in zip(binary_mask_matrix, masked_inputs):
+            expected = sum(np.where(segment_map == i, image, 0) * int(b)
+                           for i, b in enumerate(binary_mask_vector))
+            self.assertEqual(masked_input.tolist(), expected.tolist())
+        scores = image_input.get_interpretation_scores(img, None, list(range(len(tokens))), None, tokens=tokens)
+        self.assertEqual(np.array(scores).shape, segment_map.shape)
+        self.assertEqual(np.argmax(scores), np.argmax(segment_map))
+
+    def test_masks_from_segment_map_rgb(self):
+        rgb_image = np.zeros((20, 30, 3), dtype=np.uint8)
+        rgb_image[:10, :15], rgb_image[:10, 15:] = (255, 0, 0), (0, 255, 0)
+        rgb_image[10:, :15], rgb_image[10:, 15:] = (0, 0, 255), (255, 255, 0)
+        img = gr.processing_utils.encode_array_to_base64(rgb_image)
+        image_input = gr.inputs.Image()
+        image_input.set_interpret_parameters(segments=4)
+        tokens, _, _ = image_input.tokenize(img)
+        image, segment_map, _ = tokens[0]
+        self.assertEqual(image.shape, (20, 30, 3))
+        self.assertGreater(len(tokens), 1)
+        binary_mask_matrix = np.random.RandomState(1).randint(2, size=(5, len(tokens)))
+        masked_inputs = image_input.get_masked_inputs(tokens, binary_mask_matrix)
+        for binary_mask_vector, masked_input in zip(binary_mask_matrix, masked_inputs):
+            expected = sum(np.where(segment_map[..., None] == i, image, 0) * int(b)
+                           for i, b in enumerate(binary_mask_vector))
+            self.assertEqual(masked_input.shape, image.shape)
+            self.assertEqual(masked_input.tolist(), expected.tolist())
+
+
+class TestImageUpload(unittest.TestCase):
+    def test_preprocess_upload(self):
+        image_input = gr.inputs.Image()
+        with open("test/test_data/test_image.png", "rb") as f:
+            x = image_input.preprocess_upload(None, [("image.png", f.read())])
+        self.assertEqual(image_input.preprocess(x).shape, (68, 61, 3))
+
 
 class TestAudio(unittest.TestCase):
     def test_as_component(self):
@@ -395,6 +450,45 @@ class TestAudio(unittest.TestCase):
         self.assertIsInstance(audio_input.serialize(x_wav, False), dict)
 
 
+    def test_preprocess_upload(self):
+        audio_input = gr.inputs.Audio()
+        with open("test/test_files/audio_sample.wav", "rb") as f:
+            x = audio_input.preprocess_upload(
+                {"crop_min": 0}, [("audio_sample.wav", f.read())])
+        self.assertEqual(x["name"], "audio_sample.wav")
+        self.assertEqual(x["crop_min"], 0)
+        self.assertEqual(audio_input.preprocess(x)[0], 8000)
+
+    def test_interpretation_perturbations(self):
+        x_wav = dict(gr.test_data.BASE64_AUDIO, is_example=False, crop_min=0, crop_max=100)
+        audio_input = gr.inputs.Audio()
+        audio_input.set_interpret_parameters(segments=4)
+        with gr.temp_files.scope():
+            num_files = gr.temp_files.get_stats()["files"]
+            tokens, leave_one_out_tokens, masks = audio_input.tokenize(x_wav)
+            masked_inputs = audio_input.get_masked_inputs(tokens, [[1, 0, 1, 0]])
+            self.assertEqual(gr.temp_files.get_stats()["files"], num_files)
+        sample_rate, data = audio_input.preprocess(x_wav)
+        (start, stop), (neighbor_rate, neighbor_data) = masks[1], leave_one_out_tokens[1]
+        self.assertEqual(neighbor_rate, sample_rate)
+        self.assertFalse(neighbor_data[start:stop].any())
+        self.assertEqual(neighbor_data[stop:].tolist(), data[stop:].tolist())
+        _, masked_data = audio_input.preprocess(masked_inputs[0])
+        self.assertEqual(masked_data.dtype, data.dtype)
+        self.assertEqual(masked_data[:start].tolist(), data[:start].tolist())
+        self.assertFalse(masked_data[start:stop].any())
+        audio_input = gr.inputs.Audio(type="filepath")
+        _, file_data = gr.processing_utils.audio_from_file(audio_input.preprocess(masked_inputs[0]))
+        self.assertEqual(file_data.tolist(), masked_data.tolist())
+
+    def test_interpretation_in_interface(self):
+        x_wav = dict(gr.test_data.BASE64_AUDIO, is_example=False, crop_min=0, crop_max=100)
+        iface = gr.Interface(lambda x: np.abs(x[1]).sum(), gr.inputs.Audio(), "number",
+                             interpretation="default")
+        scores, _ = iface.interpret([x_wav])
+        self.assertEqual(len(scores[0]), 8)
+        self.assertTrue(all(score > 0 for score in scores[0]))
+
     # def test_in_interface(self):
     #     x_wav = gr.test_data.BASE64_AUDIO
     #     def max_amplitude_from_wav_file(wav_file):
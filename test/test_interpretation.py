@@ -3,6 +3,7 @@ import gradio.interpretation
 import gradio.test_data
 from gradio.processing_utils import decode_base64_to_image, encode_array_to_base64
 from gradio import Interface
+from gradio.inputs import File
 import numpy as np
 import os
 
@@ -14,7 +15,29 @@ class TestDefault(unittest.TestCase):
         text_interface = Interface(max_word_len, "textbox", "label", interpretation="default")
         interpretation = text_interface.interpret(["quickest brown fox"])[0][0]
         self.assertGreater(interpretation[0][1], 0)  # Checks to see if the first word has >0 score.
-        self.assertEqual(interpretation[-1][1], 0)  # Checks to see if the last word has 0 score.        
+        self.assertEqual(interpretation[-1][1], 0)  # Checks to see if the last word has 0 score.
+
+    def test_default_text_batched(self):
+        batch_sizes = []
+        def max_word_lens(texts):
+            batch_sizes.append(len(texts))
+            return [max([len(word) for word in text.split(" ")]) for text in texts]
+        text_interface = Interface(max_word_lens, "textbox", "label", interpretation="default",
+                                   batch=True, max_batch_size=8, max_batch_delay_ms=100)
+        interpretation = text_interface.interpret(["quickest brown fox"])[0][0]
+        self.assertGreater(interpretation[0][1], 0)
+        self.assertEqual(interpretation[-1][1], 0)
+        self.assertEqual(batch_sizes[1:], [3])  # All neighbors in one batch
+
+    def test_default_text_with_file_input(self):
+        def max_word_len_and_size(text, file):
+            return max([len(word) for word in text.split(" ")]) + len(file.read())
+        text_interface = Interface(max_word_len_and_size, ["textbox", File()], "label",
+                                   interpretation=["default", None])
+        interpretation = text_interface.interpret(
+            ["quickest brown fox", gradio.test_data.BASE64_FILE])[0][0]
+        self.assertGreater(interpretation[0][1], 0)  # Each neighbor reads the whole file
+        self.assertEqual(interpretation[-1][1], 0)
 
 class TestShapley(unittest.TestCase):
     def test_shapley_text(self):
@@ -2,13 +2,20 @@
 
 import aiohttp
 from fastapi.testclient import TestClient
+import json
 import os
+import requests
+import shutil
+import tempfile
+import threading
+import time
 import unittest
 import unittest.mock as mock
 import urllib.request
 import warnings
 
-from gradio import flagging,  Interface, networking, reset_all,  utils
+from gradio import flagging,  Interface, networking, queueing, reset_all,  utils
+from gradio.inputs import Image
 
 
 os.environ["GRADIO_ANALYTICS_ENABLED"] = "False"
@@ -68,6 +75,23 @@ class TestRoutes(unittest.TestCase):
         self.assertTrue("durations" in output) 
         self.assertTrue("avg_durations" in output) 
 
+    def test_predict_route_with_upload(self):
+        self.io.close()
+        self.io = Interface(lambda img, text: (img.size, text), 
+                            [Image(type="pil"), "text"], ["text", "text"]) 
+        self.app, _, _ = self.io.launch(prevent_thread_lock=True)
+        self.client = TestClient(self.app)
+        with open("test/test_data/test_image.png", "rb") as f:
+            response = self.client.post(
+                '/api/predict/', data={"data": json.dumps({"data": [None, "test"]})},
+                files={"0": ("test_image.png", f, "image/png")})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"], ["(61, 68)", "test"])
+        response = self.client.post(
+            '/api/predict/', data={"data": json.dumps({"data": [None, None]})},
+            files={"1": ("test.txt", b"test", "text/plain")})
+        self.assertEqual(response.status_code, 400)
+
     # def test_queue_push_route(self):
     #     networking.queue.push = mock.MagicMock(return_value=(None, None))
     #     response = self.client.post('/api/queue/push/', json={"data": "test", "action": "test"})
@@ -83,6 +107,94 @@ class TestRoutes(unittest.TestCase):
         reset_all()
 
 
+class TestFileRoutes(unittest.TestCase):
+    def setUp(self) -> None:
+        self.io = Interface(lambda x: x, "text", "file") 
+        self.app, _, _ = self.io.launch(serve_files=True, 
+                                        prevent_thread_lock=True)
+        self.client = TestClient(self.app)
+
+    def test_output_served_by_url(self):
+        path = "test/test_data/test_image.png"
+        response = self.client.post('/api/predict/', json={"data": [path]})
+        url = response.json()["data"][0]["data"]
+        self.assertTrue(url.startswith("file/"))
+        response = self.client.get('/' + url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "image/png")
+        with open(path, "rb") as f:
+            contents = f.read()
+        self.assertEqual(response.content, contents)
+        response = self.client.get('/' + url, headers={"Range": "bytes=2-5"})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content, contents[2:6])
+        self.assertEqual(response.headers["content-range"], 
+                         "bytes 2-5/{}".format(len(contents)))
+        response = self.client.get('/' + url, headers={"Range": "bytes=-4"})
+        self.assertEqual(response.content, contents[-4:])
+        response = self.client.get('/' + url, headers={
+            "Range": "bytes={}-".format(len(contents))})
+        self.assertEqual(response.status_code, 416)
+
+    def test_unknown_file(self):
+        response = self.client.get('/file/unknown')
+        self.assertEqual(response.status_code, 404)
+
+    def tearDown(self) -> None:
+        self.io.close()
+        reset_all()
+
+
+class TestExampleRoutes(unittest.TestCase):
+    def setUp(self) -> None:
+        self.examples_dir = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.examples_dir.name, "log.csv"), "w") as f:
+            f.write("x,y\na,1\nb,2\nc,3\n")
+        self.io = Interface(lambda x, y: x, ["text", "text"], "text",
+                            examples=self.examples_dir.name,
+                            examples_per_page=2)
+        self.app, _, _ = self.io.launch(prevent_thread_lock=True)
+        self.client = TestClient(self.app)
+
+    def test_examples_served_by_page(self):
+        self.assertIsNone(self.io.config["examples"])
+        self.assertEqual(self.io.config["examples_count"], 3)
+        response = self.client.get('/api/examples/?page=0')
+        self.assertEqual(response.json()["data"], [["a", "1"], ["b", "2"]])
+        self.assertEqual(response.json()["page_count"], 2)
+        response = self.client.get('/api/examples/?page=1')
+        self.assertEqual(response.json()["data"], [["c", "3"]])
+        response = self.client.get('/api/examples/?page=2')
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get('/api/examples/2/')
+        self.assertEqual(response.json()["data"], ["c", "3"])
+
+    def test_image_examples_served_as_thumbnails(self):
+        self.io.close()
+        image_path = os.path.join(self.examples_dir.name, "cheetah.jpg")
+        shutil.copy("test/test_data/cheetah1.jpg", image_path)
+        os.remove(os.path.join(self.examples_dir.name, "log.csv"))
+        self.io = Interface(lambda x: x, "image", "image",
+                            examples=self.examples_dir.name)
+        self.app, _, _ = self.io.launch(prevent_thread_lock=True)
+        self.client = TestClient(self.app)
+        response = self.client.get('/api/examples/?page=0')
+        thumbnail_url = response.json()["data"][0][0]
+        self.assertTrue(thumbnail_url.startswith("thumbnail/"))
+        response = self.client.get('/' + thumbnail_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("immutable", response.headers["cache-control"])
+        response = self.client.get('/api/examples/0/')
+        self.assertEqual(response.json()["data"], [image_path])
+        response = self.client.get('/thumbnail/unknown.png')
+        self.assertEqual(response.status_code, 404)
+
+    def tearDown(self) -> None:
+        self.io.close()
+        reset_all()
+        self.examples_dir.cleanup()
+
+
 class TestAuthenticatedRoutes(unittest.TestCase):
     def setUp(self) -> None:
         self.io = Interface(lambda x: x, "text", "text") 
@@ -150,6 +262,71 @@ class TestInterpretation(unittest.TestCase):
         io.close()
 
 
+class TestExecutor(unittest.TestCase):
+    def test_server_responsive_during_prediction(self):
+        started, release = threading.Event(), threading.Event()
+        def block(x):
+            started.set()
+            release.wait(10)
+            return x
+        io = Interface(block, "text", "text")
+        _, local_url, _ = io.launch(prevent_thread_lock=True)
+        thread = threading.Thread(target=requests.post, args=(
+            local_url + "api/predict/",), kwargs={"json": {"data": ["test"]}})
+        thread.start()
+        try:
+            self.assertTrue(started.wait(10))
+            response = requests.get(local_url + "config/", timeout=5)
+            self.assertEqual(response.status_code, 200)
+        finally:
+            release.set()
+            thread.join()
+            io.close()
+
+    def test_backlog_limit(self):
+        started, release = threading.Event(), threading.Event()
+        def block(x):
+            started.set()
+            release.wait(10)
+            return x
+        io = Interface(block, "text", "text")
+        _, local_url, _ = io.launch(max_threads=1, max_backlog=0, 
+                                    prevent_thread_lock=True)
+        thread = threading.Thread(target=requests.post, args=(
+            local_url + "api/predict/",), kwargs={"json": {"data": ["test"]}})
+        thread.start()
+        try:
+            self.assertTrue(started.wait(10))
+            response = requests.post(local_url + "api/predict/", 
+                                     json={"data": ["test"]}, timeout=5)
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response.headers["Retry-After"], "1")
+        finally:
+            release.set()
+            thread.join()
+            io.close()
+
+    def test_process_executor(self):
+        io = Interface(lambda x: x[::-1], "text", "text")
+        app, _, _ = io.launch(executor="process", max_threads=1,
+                              prevent_thread_lock=True)
+        client = TestClient(app)
+        response = client.post('/api/predict/', json={"data": ["test"]})
+        self.assertEqual(response.json()["data"], ["tset"])
+        io.close()
+
+    def test_invalid_executor(self):
+        io = Interface(lambda x: x, "text", "text")
+        with self.assertRaises(ValueError):
+            io.launch(executor="gpu", prevent_thread_lock=True)
+
+    def test_process_executor_cannot_serve_files(self):
+        io = Interface(lambda x: x, "text", "image")
+        with self.assertRaises(ValueError):
+            io.launch(executor="process", serve_files=True, 
+                      prevent_thread_lock=True)
+
+
 class TestURLs(unittest.TestCase):
     def test_url_ok(self):
         urllib.request.urlopen = mock.MagicMock(return_value="test")
@@ -166,25 +343,114 @@ class TestURLs(unittest.TestCase):
         self.assertTrue(res)
 
 
-# class TestQueuing(unittest.TestCase):
-#     def test_queueing(self):
-#         # mock queue methods and post method
-#         networking.queue.pop = mock.MagicMock(return_value=(None, None, None, 'predict'))
-#         networking.queue.pass_job = mock.MagicMock(return_value=(None, None))
-#         networking.queue.fail_job = mock.MagicMock(return_value=(None, None))
-#         networking.queue.start_job = mock.MagicMock(return_value=None)
-#         requests.post = mock.MagicMock(return_value=mock.MagicMock(status_code=200))
-#         # execute queue action successfully
-#         networking.queue_thread('test_path', test_mode=True)
-#         networking.queue.pass_job.assert_called_once()
-#         # execute queue action unsuccessfully
-#         requests.post = mock.MagicMock(return_value=mock.MagicMock(status_code=500))
-#         networking.queue_thread('test_path', test_mode=True)
-#         networking.queue.fail_job.assert_called_once()
-#         # no more things on the queue so methods shouldn't be called any more times
-#         networking.queue.pop = mock.MagicMock(return_value=None)
-#         networking.queue.pass_job.assert_called_once()
-#         networking.queue.fail_job.assert_called_once()
+class TestQueuing(unittest.TestCase):
+    def test_queue_thread(self):
+        io = Interface(lambda x: x[::-1], "text", "text")
+        app, _, _ = io.launch(prevent_thread_lock=True)
+        queueing.init()
+        hash, _ = queueing.push({"data": ["test"]}, "predict")
+        networking.queue_thread(test_mode=True)
+        status, output = queueing.get_status(hash)
+        self.assertEqual(status, "COMPLETE")
+        self.assertEqual(output["data"], ["tset"])
+        io.close()
+
+    def test_queue_thread_failure(self):
+        io = Interface(lambda x: x[::-1], "text", "text")
+        app, _, _ = io.launch(prevent_thread_lock=True)
+        queueing.init()
+        hash, _ = queueing.push({"data": ["test"]}, "unknown")
+        networking.queue_thread(test_mode=True)
+        status, _ = queueing.get_status(hash)
+        self.assertEqual(status, "FAILED")
+        io.close()
+
+    def test_queue_thread_propagates_interrupts(self):
+        io = Interface(lambda x: x[::-1], "text", "text")
+        app, _, _ = io.launch(prevent_thread_lock=True)
+        queueing.init()
+        queueing.push({"data": ["test"]}, "predict")
+        with mock.patch.object(networking, "run_predict",
+                               side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                networking.queue_thread(test_mode=True)
+        io.close()
+
+    def test_queue_routes(self):
+        io = Interface(lambda x: x[::-1], "text", "text")
+        app, _, _ = io.launch(enable_queue=True, prevent_thread_lock=True)
+        client = TestClient(app)
+        response = client.post(
+            '/api/queue/push/', json={"data": ["test"], "action": "predict"})
+        self.assertEqual(response.status_code, 200)
+        hash = response.json()["hash"]
+        for _ in range(100):
+            response = client.post('/api/queue/status/', json={"hash": hash})
+            if response.json()["status"] == "COMPLETE":
+                break
+            time.sleep(0.05)
+        self.assertEqual(response.json()["data"]["data"], ["tset"])
+        io.close()
+
+    def test_queue_events_route(self):
+        io = Interface(lambda x: x[::-1], "text", "text")
+        app, _, _ = io.launch(enable_queue=True, prevent_thread_lock=True)
+        client = TestClient(app)
+        response = client.post(
+            '/api/queue/push/', json={"data": ["test"], "action": "predict"})
+        hash = response.json()["hash"]
+        response = client.get('/api/queue/events/{}/'.format(hash))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(
+            response.headers["content-type"].startswith("text/event-stream"))
+        events = [json.loads(line[len("data: "):])
+                  for line in response.text.splitlines()
+                  if line.startswith("data: ")]
+        self.assertEqual(events[-1]["status"], "COMPLETE")
+        self.assertEqual(events[-1]["data"]["data"], ["tset"])
+        response = client.get('/api/queue/events/unknown/')
+        self.assertEqual(response.status_code, 404)
+        io.close()
+
+    def test_queue_events_for_pruned_job(self):
+        io = Interface(lambda x: x[::-1], "text", "text")
+        app, _, _ = io.launch(prevent_thread_lock=True)
+        client = TestClient(app)
+        statuses = [("QUEUED", 1), ValueError("Hash not found.")]
+        with mock.patch("gradio.app.QUEUE_EVENTS_KEEPALIVE", 0.01), \
+                mock.patch.object(queueing, "get_status", side_effect=statuses):
+            response = client.get('/api/queue/events/pruned/')
+        events = [json.loads(line[len("data: "):])
+                  for line in response.text.splitlines()
+                  if line.startswith("data: ")]
+        self.assertEqual(events, [
+            {"status": "QUEUED", "data": 1},
+            {"status": "FAILED", "data": "Hash not found."}])
+        io.close()
+
+    def test_queue_concurrency(self):
+        barrier = threading.Barrier(2, timeout=5)
+        def wait_for_other_job(x):
+            barrier.wait()  # only passes if both jobs run at the same time
+            return x
+        io = Interface(wait_for_other_job, "text", "text")
+        app, _, _ = io.launch(enable_queue=True, queue_concurrency=2, 
+                              prevent_thread_lock=True)
+        client = TestClient(app)
+        hashes = [queueing.push({"data": [str(i)]}, "predict")[0]
+                  for i in range(2)]
+        for hash in hashes:
+            for _ in range(100):
+                status, data = queueing.get_status(hash)
+                if status in ("COMPLETE", "FAILED"):
+                    break
+                time.sleep(0.05)
+            self.assertEqual(status, "COMPLETE")
+        response = client.get('/api/queue/workers/')
+        workers = response.json()["workers"]
+        self.assertEqual(len(workers), 2)
+        self.assertEqual(sum(w["jobs_processed"] for w in workers), 2)
+        io.close()
 
 
 if __name__ == '__main__':
@@ -17,6 +17,21 @@ class OutputComponent(unittest.TestCase):
         self.assertEqual(output.deserialize(1), 1)
 
 
+class TestFlaggedFileCounter(unittest.TestCase):
+    def test_continues_after_existing_files(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            os.makedirs(os.path.join(tmpdirname, "1"))
+            for file_name in ["0.png", "7.png", "1/1500.png"]:
+                open(os.path.join(tmpdirname, file_name), "w").close()
+            counter = gr.component.FlaggedFileCounter()
+            self.assertEqual(counter.reserve_file_name(tmpdirname, ".png"),
+                             "1/1501.png")
+            open(os.path.join(tmpdirname, "1", "1502"), "w").close()
+            self.assertEqual(counter.reserve_file_name(tmpdirname, ""),
+                             "1/1503")
+            self.assertTrue(os.path.exists(os.path.join(tmpdirname, "1/1503")))
+
+
 class TestTextbox(unittest.TestCase):
     def test_as_component(self):
         with self.assertRaises(ValueError):
@@ -293,6 +308,7 @@ class TestFile(unittest.TestCase):
             return "test.txt"
 
         iface = gr.Interface(write_file, "text", "file")
+        self.addCleanup(os.remove, "test.txt")
         self.assertDictEqual(iface.process(["hello world"])[0][0], {
             'name': 'test.txt', 'size': 11, 'data': 'data:text/plain;base64,aGVsbG8gd29ybGQ='
         })
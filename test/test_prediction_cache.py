@@ -0,0 +1,105 @@
+"""Contains tests for prediction_cache.py"""
+
+import os
+import tempfile
+import time
+import unittest
+
+from fastapi.testclient import TestClient
+
+from gradio import Interface
+from gradio.outputs import Textbox
+from gradio.prediction_cache import PredictionCache
+
+
+os.environ["GRADIO_ANALYTICS_ENABLED"] = "False"
+
+
+class TestPredictionCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = PredictionCache(max_size=2)
+        for i in range(2):
+            cache.put(cache.get_key([i]), [i])
+        cache.get(cache.get_key([0]))  # 1 is now least recently used
+        cache.put(cache.get_key([2]), [2])
+        self.assertEqual(cache.get(cache.get_key([0])), [0])
+        self.assertIsNone(cache.get(cache.get_key([1])))
+        self.assertEqual(cache.get(cache.get_key([2])), [2])
+        self.assertEqual((cache.hits, cache.misses), (3, 1))
+
+    def test_ttl(self):
+        cache = PredictionCache(ttl=0.01)
+        key = cache.get_key(["test"])
+        cache.put(key, ["output"])
+        time.sleep(0.05)
+        self.assertIsNone(cache.get(key))
+
+    def test_disk_tier(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = PredictionCache(max_size=1, cache_dir=tmpdir)
+            cache.put(cache.get_key([0]), [0])
+            cache.put(cache.get_key([1]), [1])  # evicts 0 from memory
+            self.assertEqual(cache.get(cache.get_key([0])), [0])
+            new_cache = PredictionCache(cache_dir=tmpdir)
+            self.assertEqual(new_cache.get(new_cache.get_key([1])), [1])
+            new_cache.clear()
+            self.assertEqual(os.listdir(tmpdir), [])
+
+    def test_key(self):
+        self.assertEqual(PredictionCache.get_key([{"a": 1, "b": b"data"}]),
+                         PredictionCache.get_key([{"b": b"data", "a": 1}]))
+        self.assertNotEqual(PredictionCache.get_key([b"data"]),
+                            PredictionCache.get_key([b"other data"]))
+
+
+class TestCachedInterface(unittest.TestCase):
+    def test_cached_process(self):
+        calls = []
+        def reverse(x):
+            calls.append(x)
+            return x[::-1]
+        io = Interface(reverse, "text", "text", cache=True)
+        app, _, _ = io.launch(prevent_thread_lock=True)
+        client = TestClient(app)
+        for _ in range(2):
+            response = client.post('/api/predict/', json={"data": ["test"]})
+            self.assertEqual(response.json()["data"], ["tset"])
+        self.assertEqual(calls, ["test"])
+        self.assertEqual(response.json()["cache_hits"], 1)
+        self.assertEqual(response.json()["cache_misses"], 1)
+        self.assertEqual(response.json()["durations"], [0])
+        io.close()
+
+    def test_disk_cache_is_invalidated_when_function_changes(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for fn, expected in [(str.upper, "TEST"), (str.lower, "test"),
+                                 (str.upper, "TEST")]:
+                io = Interface(lambda x: fn(x), "text", "text",
+                               cache=PredictionCache(cache_dir=tmpdir))
+                self.assertEqual(io.process(["Test"])[0], [expected])
+            self.assertEqual(len(os.listdir(tmpdir)), 2)
+            io = Interface(lambda x: x.upper(), "text", 
+                           Textbox(label="Upper"),
+                           cache=PredictionCache(cache_dir=tmpdir))
+            io.process(["Test"])
+            self.assertEqual(len(os.listdir(tmpdir)), 3)
+
+    def test_unhashable_function_is_cached_in_memory(self):
+        model = object()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with self.assertWarns(UserWarning):
+                io = Interface(lambda x: x + "!" if model else x, "text", "text",
+                               cache=PredictionCache(cache_dir=tmpdir))
+            for _ in range(2):
+                self.assertEqual(io.process(["Test"])[0], ["Test!"])
+            self.assertEqual(io.cache.hits, 1)
+            self.assertEqual(os.listdir(tmpdir), [])
+
+    def test_cache_with_state_raises(self):
+        with self.assertRaises(ValueError):
+            Interface(lambda x, state: (x, state), ["text", "state"],
+                      ["text", "state"], cache=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+"""Contains tests for process_examples.py"""
+
+import functools
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+import unittest.mock as mock
+
+from gradio import Interface, process_examples
+from gradio.flagging import CSVLogger
+from gradio.process_examples import ExampleCache
+
+
+os.environ["GRADIO_ANALYTICS_ENABLED"] = "False"
+
+
+class TestExampleCache(unittest.TestCase):
+    def test_outputs_loaded_once(self):
+        io = Interface(lambda x: x.upper(), "text", "text",
+                       examples=["a", "b"])
+        io.config = io.get_config_file()
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            logger = CSVLogger()
+            logger.setup(tmpdirname)
+            for output in ["A", "B"]:
+                logger.flag(io, None, [output])
+            cache_file = os.path.join(tmpdirname, "log.csv")
+            example_cache = ExampleCache(io, cache_file)
+            self.assertEqual(example_cache.get(1), ["B"])
+            os.remove(cache_file)
+            self.assertEqual(example_cache.get(0), ["A"])
+            example_cache.clear()
+            with self.assertRaises(FileNotFoundError):
+                example_cache.get(0)
+
+
+class TestFunctionFingerprint(unittest.TestCase):
+    def test_fingerprint_is_stable_across_processes(self):
+        script = textwrap.dedent("""
+            from gradio.process_examples import get_function_fingerprint
+            def f(x):
+                return x in {"cat", "dog", "bird", "fish", "horse"}
+            print(get_function_fingerprint(f))
+        """)
+        fingerprints = set()
+        for seed in ["1", "2"]:
+            env = dict(os.environ, PYTHONHASHSEED=seed)
+            fingerprints.add(subprocess.run(
+                [sys.executable, "-c", script], env=env, check=True,
+                capture_output=True, text=True).stdout)
+        self.assertEqual(len(fingerprints), 1)
+
+    def test_closure_and_defaults_are_hashed(self):
+        def make_predict(threshold, scale=1):
+            def predict(x, offset=scale):
+                return x * scale + offset > threshold
+            return predict
+
+        fingerprints = {
+            process_examples.get_function_fingerprint(fn) for fn in [
+                make_predict(0.5), make_predict(0.7), make_predict(0.5, 2)]}
+        self.assertEqual(len(fingerprints), 3)
+        self.assertEqual(
+            process_examples.get_function_fingerprint(make_predict(0.5)),
+            process_examples.get_function_fingerprint(make_predict(0.5)))
+
+    def test_partial_arguments_are_hashed(self):
+        def predict(x, scale):
+            return x * scale
+
+        self.assertNotEqual(
+            process_examples.get_function_fingerprint(
+                functools.partial(predict, scale=1)),
+            process_examples.get_function_fingerprint(
+                functools.partial(predict, scale=2)))
+
+    def test_referenced_globals_are_hashed(self):
+        script = textwrap.dedent("""
+            from gradio.process_examples import get_function_fingerprint
+            THRESHOLD = {}
+            def f(x):
+                return x > THRESHOLD
+            print(get_function_fingerprint(f))
+        """)
+        fingerprints = {
+            subprocess.run([sys.executable, "-c", script.format(threshold)],
+                           check=True, capture_output=True, text=True).stdout
+            for threshold in [1, 2]}
+        self.assertEqual(len(fingerprints), 2)
+
+    def test_unhashable_dependencies(self):
+        model = object()
+
+        def predict(x):
+            return model, x
+
+        self.assertIsNone(process_examples.get_function_fingerprint(predict))
+        predict.__version__ = "1.0"
+        self.assertIsNotNone(
+            process_examples.get_function_fingerprint(predict))
+
+
+class TestCacheInterfaceExamples(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        cache_file = os.path.join(self.cache_dir.name, "log.csv")
+        self.patches = [
+            mock.patch.object(process_examples, "CACHED_FOLDER", 
+                              self.cache_dir.name),
+            mock.patch.object(process_examples, "CACHE_FILE", cache_file),
+            mock.patch.object(process_examples, "FINGERPRINTS_FILE", 
+                              os.path.join(self.cache_dir.name, "fp.json"))]
+        for patch in self.patches:
+            patch.start()
+        self.calls, self.failing = [], set()
+
+        def upper(x):
+            self.calls.append(x)
+            if x in self.failing:
+                raise ValueError(x)
+            return x.upper()
+
+        upper.__version__ = "1"  # it depends on the test case's state
+        self.upper = upper
+
+    def cache_examples(self, examples):
+        io = Interface(self.upper, "text", "text", examples=examples)
+        io.config = io.get_config_file()
+        self.calls.clear()
+        process_examples.cache_interface_examples(io, max_workers=4)
+        return [ExampleCache(io, process_examples.CACHE_FILE).get(i)[0]
+                for i in range(len(examples))]
+
+    def test_only_changed_examples_are_processed(self):
+        self.assertEqual(self.cache_examples(["a", "b", "c"]), ["A", "B", "C"])
+        self.assertEqual(sorted(self.calls), ["a", "b", "c"])
+        self.assertEqual(self.cache_examples(["a", "b", "c"]), ["A", "B", "C"])
+        self.assertEqual(self.calls, [])
+        self.assertEqual(self.cache_examples(["c", "d"]), ["C", "D"])
+        self.assertEqual(self.calls, ["d"])
+
+    def test_failed_examples_are_retried(self):
+        self.failing.add("b")
+        with self.assertRaises(ValueError):
+            self.cache_examples(["a", "b"])
+        self.failing.clear()
+        self.assertEqual(self.cache_examples(["a", "b"]), ["A", "B"])
+        self.assertEqual(self.calls, ["b"])
+
+    def test_unhashable_function_is_always_processed(self):
+        del self.upper.__version__
+        self.cache_examples(["a", "b"])
+        self.assertEqual(self.cache_examples(["a", "b"]), ["A", "B"])
+        self.assertEqual(sorted(self.calls), ["a", "b"])
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        self.cache_dir.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
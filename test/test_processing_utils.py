@@ -17,6 +17,11 @@ class ImagePreprocessing(unittest.TestCase):
             gr.test_data.BASE64_IMAGE)
         self.assertIsInstance(output_image, Image.Image)
 
+    def test_decode_bytes_to_image(self):
+        with open("test/test_data/test_image.png", "rb") as f:
+            output_image = gr.processing_utils.decode_base64_to_image(f.read())
+        self.assertIsInstance(output_image, Image.Image)
+
     def test_encode_url_or_file_to_base64(self):
         output_base64 = gr.processing_utils.encode_url_or_file_to_base64(
             "test/test_data/test_image.png")
@@ -80,9 +85,27 @@ class OutputPreprocessing(unittest.TestCase):
 
     def test_create_tmp_copy_of_file(self):
         temp_file = gr.processing_utils.create_tmp_copy_of_file(
-            "test.txt")
+            "test/test_data/flagged_no_log/a.txt")
         self.assertIsInstance(temp_file, tempfile._TemporaryFileWrapper)
 
+    def test_encrypted_file_round_trip(self):
+        key = gr.encryptor.get_key("password")
+        temp_file = gr.processing_utils.decode_base64_to_file(
+            gr.test_data.BASE64_IMAGE, encryption_key=key)
+        with open(temp_file.name, "rb") as f:
+            self.assertNotEqual(f.read(), gr.test_data.BINARY_IMAGE[0])
+        self.assertEqual(
+            gr.processing_utils.encode_file_to_base64(
+                temp_file.name, encryption_key=key).split(",")[1],
+            gr.test_data.BASE64_IMAGE.split(",")[1])
+        image_file = gr.processing_utils.decode_base64_to_file(
+            gr.test_data.BASE64_IMAGE)
+        temp_file = gr.processing_utils.create_tmp_copy_of_file(
+            image_file.name, encryption_key=key)
+        with open(temp_file.name, "rb") as f:
+            self.assertEqual(gr.encryptor.decrypt(key, f.read()),
+                             gr.test_data.BINARY_IMAGE[0])
+
     float_dtype_list = [float, float, np.double, np.single, np.float32,
                         np.float64, 'float32', 'float64']
 
@@ -0,0 +1,165 @@
+"""Contains tests for queueing.py"""
+
+import os
+import tempfile
+import threading
+import unittest
+import unittest.mock as mock
+
+from gradio import queueing
+
+
+os.environ["GRADIO_ANALYTICS_ENABLED"] = "False"
+
+
+class QueueBackendTests:
+    def test_push_and_pop(self):
+        hash, queue_position = self.queue.push({"data": ["test"]}, "predict")
+        self.assertEqual(queue_position, -1)
+        _, popped_hash, input_data, action = self.queue.pop()
+        self.assertEqual(popped_hash, hash)
+        self.assertEqual(input_data, {"data": ["test"]})
+        self.assertEqual(action, "predict")
+        self.assertIsNone(self.queue.pop())
+
+    def test_queue_positions(self):
+        first_hash, _ = self.queue.push({"data": [1]}, "predict")
+        second_hash, queue_position = self.queue.push({"data": [2]}, "predict")
+        self.assertEqual(queue_position, 1)
+        self.queue.pop()
+        self.queue.start_job(first_hash)
+        self.assertEqual(self.queue.get_status(first_hash), ("PENDING", None))
+        self.assertEqual(self.queue.get_status(second_hash), ("QUEUED", 0))
+        self.queue.pass_job(first_hash, {"data": [1]})
+        self.assertEqual(self.queue.get_status(second_hash), ("QUEUED", -1))
+
+    def test_queue_positions_with_concurrency(self):
+        self.queue.init(concurrency=2)
+        hashes = [self.queue.push({"data": [i]}, "predict")[0]
+                  for i in range(3)]
+        self.assertEqual(self.queue.get_status(hashes[1]), ("QUEUED", -1))
+        self.assertEqual(self.queue.get_status(hashes[2]), ("QUEUED", 2))
+        self.queue.pop()
+        self.queue.start_job(hashes[0])
+        self.assertEqual(self.queue.get_status(hashes[1]), ("QUEUED", -1))
+        self.assertEqual(self.queue.get_status(hashes[2]), ("QUEUED", 1))
+
+    def test_job_lifecycle(self):
+        hash, _ = self.queue.push({"data": ["test"]}, "predict")
+        self.queue.pop()
+        self.assertEqual(self.queue.get_status(hash), ("NOT FOUND", None))
+        self.queue.start_job(hash)
+        self.queue.pass_job(hash, {"data": ["output"]})
+        self.assertEqual(self.queue.get_status(hash),
+                         ("COMPLETE", {"data": ["output"]}))
+
+    def test_failed_job(self):
+        hash, _ = self.queue.push({"data": ["test"]}, "predict")
+        self.queue.pop()
+        self.queue.start_job(hash)
+        self.queue.fail_job(hash, "error")
+        self.assertEqual(self.queue.get_status(hash), ("FAILED", "error"))
+
+    def test_blocking_pop(self):
+        self.assertIsNone(self.queue.pop(block=True, timeout=0.01))
+        pusher = threading.Timer(
+            0.05, self.queue.push, args=({"data": ["test"]}, "predict"))
+        pusher.start()
+        job = self.queue.pop(block=True, timeout=5)
+        pusher.join()
+        self.assertEqual(job[2], {"data": ["test"]})
+
+    def test_unknown_hash(self):
+        with self.assertRaises(ValueError):
+            self.queue.get_status("unknown")
+
+
+class TestMemoryQueue(QueueBackendTests, unittest.TestCase):
+    def setUp(self):
+        self.queue = queueing.MemoryQueue()
+        self.queue.init()
+
+    def test_finished_jobs_are_pruned(self):
+        hashes = [self.queue.push({"data": [i]}, "predict")[0] for i in range(3)]
+        for hash in hashes:
+            self.queue.pop()
+            self.queue.start_job(hash)
+        self.queue.pass_job(hashes[0], {"data": ["output"]})
+        self.queue.fail_job(hashes[1], "error")
+        self.queue.pass_job(hashes[2], {"data": ["output"]})
+        self.assertEqual(self.queue.get_status(hashes[0])[0], "COMPLETE")
+        self.assertEqual(self.queue.get_status(hashes[1])[0], "FAILED")
+        self.assertEqual(list(self.queue.jobs), [hashes[2]])
+        with self.assertRaises(ValueError):
+            self.queue.get_status(hashes[0])
+        # The result of the last job is never requested, so it expires
+        with mock.patch.object(queueing, "FINISHED_JOB_TTL", -1):
+            new_hash, _ = self.queue.push({"data": [3]}, "predict")
+        self.assertEqual(list(self.queue.jobs), [new_hash])
+
+    def tearDown(self):
+        self.queue.close()
+
+
+class TestSQLiteQueue(QueueBackendTests, unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.queue = queueing.SQLiteQueue(
+            os.path.join(self.tmpdir.name, "queue.db"))
+        self.queue.init()
+
+    def tearDown(self):
+        self.queue.close()
+        self.tmpdir.cleanup()
+
+
+class TestQueueBackendInstance(unittest.TestCase):
+    def test_backend_shortcuts(self):
+        self.assertIsInstance(queueing.get_queue_backend_instance(None),
+                              queueing.MemoryQueue)
+        self.assertIsInstance(queueing.get_queue_backend_instance("sqlite"),
+                              queueing.SQLiteQueue)
+        with self.assertRaises(ValueError):
+            queueing.get_queue_backend_instance("redis")
+
+
+class TestQueueListeners(unittest.TestCase):
+    def test_listeners_notified_on_status_change(self):
+        queueing.init()
+        notifications = []
+        listener = lambda: notifications.append(None)
+        hash, _ = queueing.push({"data": ["test"]}, "predict")
+        queueing.add_listener(hash, listener)
+        try:
+            self.assertEqual(len(notifications), 0)
+            queueing.pop()
+            queueing.start_job(hash)
+            queueing.pass_job(hash, {"data": ["output"]})
+            self.assertEqual(len(notifications), 3)
+        finally:
+            queueing.remove_listener(hash, listener)
+            queueing.close()
+        self.assertEqual(queueing.listeners, {})
+
+    def test_only_affected_listeners_notified(self):
+        queueing.init()
+        hashes = [queueing.push({"data": [i]}, "predict")[0] for i in range(3)]
+        notifications = {hash: [] for hash in hashes}
+        listeners = {hash: (lambda hash=hash: notifications[hash].append(None))
+                     for hash in hashes}
+        for hash, listener in listeners.items():
+            queueing.add_listener(hash, listener)
+        try:
+            queueing.pop()  # Every queued job moves forward
+            self.assertEqual([len(n) for n in notifications.values()], [1, 1, 1])
+            queueing.start_job(hashes[0])  # Only the next job can change position
+            queueing.pass_job(hashes[0], {"data": ["output"]})
+            self.assertEqual([len(n) for n in notifications.values()], [3, 3, 1])
+        finally:
+            for hash, listener in listeners.items():
+                queueing.remove_listener(hash, listener)
+            queueing.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""Contains tests for temp_files.py"""
+
+import os
+import time
+import unittest
+
+from fastapi.testclient import TestClient
+
+import gradio as gr
+from gradio.temp_files import TempFileRegistry
+
+
+os.environ["GRADIO_ANALYTICS_ENABLED"] = "False"
+
+
+class TestTempFileRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = TempFileRegistry()
+
+    def tearDown(self):
+        self.registry.clear()
+
+    def create_file(self, num_bytes):
+        with self.registry.create_file() as file:
+            file.write(b"0" * num_bytes)
+        return file.name
+
+    def test_scope(self):
+        with self.registry.scope():
+            path = self.create_file(10)
+            kept_path = self.create_file(10)
+            self.registry.keep(kept_path)
+        self.assertFalse(os.path.exists(path))
+        self.assertTrue(os.path.exists(kept_path))
+
+    def test_stats(self):
+        self.create_file(10)
+        self.create_file(20)
+        self.assertEqual(self.registry.get_stats(), {"files": 2, "bytes": 30})
+        self.registry.clear()
+        self.assertEqual(self.registry.get_stats(), {"files": 0, "bytes": 0})
+
+    def test_evict_by_size(self):
+        paths = [self.create_file(10) for _ in range(3)]
+        self.registry.evict(max_bytes=20)
+        self.assertFalse(os.path.exists(paths[0]))
+        self.assertTrue(os.path.exists(paths[1]))
+        self.assertTrue(os.path.exists(paths[2]))
+
+    def test_evict_by_age(self):
+        old_path = self.create_file(10)
+        time.sleep(0.05)
+        new_path = self.create_file(10)
+        self.registry.evict(max_age=0.04)
+        self.assertFalse(os.path.exists(old_path))
+        self.assertTrue(os.path.exists(new_path))
+
+    def test_background_eviction(self):
+        path = self.create_file(10)
+        self.registry.start_eviction(max_bytes=0, interval=0.01)
+        try:
+            for _ in range(100):
+                if not os.path.exists(path):
+                    break
+                time.sleep(0.01)
+            self.assertFalse(os.path.exists(path))
+        finally:
+            self.registry.stop_eviction()
+
+
+class TestRequestScope(unittest.TestCase):
+    def test_input_files_deleted_after_request(self):
+        paths = []
+        def get_path(path):
+            paths.append(path)
+            return os.path.exists(path)
+        io = gr.Interface(get_path, gr.inputs.Image(type="filepath"), "text")
+        app, _, _ = io.launch(prevent_thread_lock=True)
+        client = TestClient(app)
+        response = client.post(
+            '/api/predict/', json={"data": [gr.test_data.BASE64_IMAGE]})
+        self.assertEqual(response.json()["data"], ["True"])
+        self.assertFalse(os.path.exists(paths[0]))
+        response = client.get('/api/temp_files/')
+        self.assertIn("bytes", response.json())
+        io.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+"""Contains tests for thumbnails.py"""
+
+import os
+import tempfile
+import unittest
+
+from PIL import Image
+
+from gradio.thumbnails import ThumbnailCache, THUMBNAIL_URL_PREFIX
+
+
+os.environ["GRADIO_ANALYTICS_ENABLED"] = "False"
+
+
+class TestThumbnailCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.cache = ThumbnailCache(self.cache_dir.name, size=(16, 16))
+
+    def test_image_thumbnail(self):
+        url = self.cache.get_thumbnail("test/test_data/cheetah1.jpg", "image")
+        self.assertTrue(url.startswith(THUMBNAIL_URL_PREFIX))
+        path = self.cache.get_path(url[len(THUMBNAIL_URL_PREFIX):])
+        with Image.open(path) as image:
+            self.assertLessEqual(max(image.size), 16)
+        self.assertEqual(
+            self.cache.get_thumbnail("test/test_files/cheetah1.jpg", "image"),
+            url)  # Same contents, so the thumbnail is reused
+        self.assertEqual(len(os.listdir(self.cache_dir.name)), 1)
+
+    def test_invalid_files(self):
+        self.assertIsNone(self.cache.get_thumbnail("missing.png", "image"))
+        self.assertIsNone(
+            self.cache.get_thumbnail("test/test_data/flagged_no_log/a.txt",
+                                     "image"))
+        self.assertEqual(os.listdir(self.cache_dir.name), [])
+        self.assertIsNone(self.cache.get_path("../log.csv"))
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
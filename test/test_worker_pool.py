@@ -0,0 +1,84 @@
+"""Contains tests for worker_pool.py"""
+
+import multiprocessing
+import os
+import time
+import unittest
+
+from gradio import Interface
+from gradio.worker_pool import WorkerPool
+
+
+os.environ["GRADIO_ANALYTICS_ENABLED"] = "False"
+
+model = None
+
+
+def load_model(value):
+    global model
+    model = value
+
+
+def count_worker(counter):
+    time.sleep(0.1)
+    with counter.get_lock():
+        counter.value += 1
+
+
+class TestWorkerPool(unittest.TestCase):
+    def test_runs_in_worker_process(self):
+        pool = WorkerPool([lambda: os.getpid()], num_processes=2)
+        try:
+            self.assertNotEqual(pool.run(0), os.getpid())
+        finally:
+            pool.close()
+
+    def test_initializer(self):
+        pool = WorkerPool([lambda x: model + x], num_processes=1, 
+                          initializer=load_model, initargs=("model-",))
+        try:
+            self.assertEqual(pool.run(0, "test"), "model-test")
+            self.assertIsNone(model)  # only loaded in the worker
+        finally:
+            pool.close()
+
+    def test_start_waits_for_every_worker(self):
+        counter = multiprocessing.get_context("fork").Value("i", 0)
+        pool = WorkerPool([int], num_processes=3, 
+                          initializer=count_worker, initargs=(counter,))
+        try:
+            pool.start()
+            self.assertEqual(counter.value, 3)
+        finally:
+            pool.close()
+
+    def test_errors_are_raised(self):
+        pool = WorkerPool([lambda x: 1 / x], num_processes=1)
+        try:
+            with self.assertRaises(ZeroDivisionError):
+                pool.run(0, 0)
+        finally:
+            pool.close()
+
+
+class TestInterfaceWorkerProcesses(unittest.TestCase):
+    def test_process(self):
+        io = Interface(lambda x: x[::-1], "text", "text", num_processes=2)
+        try:
+            output, _ = io.process(["test"])
+            self.assertEqual(output, ["tset"])
+        finally:
+            io.worker_pool.close()
+
+    def test_batched_process(self):
+        io = Interface(lambda xs: [x.upper() for x in xs], "text", "text", 
+                       num_processes=1, batch=True)
+        try:
+            output, _ = io.process(["test"])
+            self.assertEqual(output, ["TEST"])
+        finally:
+            io.worker_pool.close()
+
+
+if __name__ == '__main__':
+    unittest.main()